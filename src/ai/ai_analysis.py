@@ -8,54 +8,147 @@ from sklearn.preprocessing import StandardScaler
 import joblib
 import smtplib
 from email.mime.text import MIMEText
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class TransactionAnalyzer:
-    def __init__(self, model=None):
-        self.model = model if model else IsolationForest(contamination=0.1)  # Default model
+FEATURE_COLUMNS = ['amount', 'transaction_type', 'timestamp']
+
+class FeaturePipeline:
+    """Turns transaction frames into scaled feature matrices with encoders fitted once.
+
+    fit() learns a code for every transaction type and the scaler's mean and
+    variance; transform() only applies them, so scoring data never shifts
+    the features the model was trained on. Codes are assigned in order of
+    first appearance and kept across refits, so a type's code never changes
+    once learned; types first seen at scoring time get -1.
+    """
+
+    def __init__(self):
+        self.categories: Dict[str, int] = {}
+        self.scaler = StandardScaler()
+        self.fitted = False
+
+    def encode(self, data: pd.DataFrame) -> np.ndarray:
+        """Unscaled features: amount, transaction type code and timestamp in epoch seconds."""
+        features = np.empty((len(data), len(FEATURE_COLUMNS)), dtype=float)
+        features[:, 0] = data['amount'].to_numpy(dtype=float)
+        features[:, 1] = data['transaction_type'].astype(object).map(self.categories).fillna(-1).to_numpy(dtype=float)
+        timestamps = pd.to_datetime(data['timestamp']).to_numpy(dtype='datetime64[s]')
+        features[:, 2] = timestamps.astype('int64')
+        return features
+
+    def fit(self, data: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> "FeaturePipeline":
+        """Learn category codes and scaling from a frame or an iterable of frames."""
+        frames = [data] if isinstance(data, pd.DataFrame) else data
         self.scaler = StandardScaler()
-        self.transaction_data = pd.DataFrame()
+        rows = 0
+        for frame in frames:
+            for category in frame['transaction_type'].unique():
+                self.categories.setdefault(category, len(self.categories))
+            self.scaler.partial_fit(self.encode(frame))
+            rows += len(frame)
+        if not rows:
+            raise ValueError("No transaction data to fit the feature pipeline.")
+        self.fitted = True
+        return self
+
+    def transform(self, data: pd.DataFrame) -> np.ndarray:
+        if not self.fitted:
+            raise ValueError("Feature pipeline has not been fitted.")
+        features = self.encode(data)
+        unknown = int((features[:, 1] == -1).sum())
+        if unknown:
+            logging.warning(f"{unknown} transactions have a transaction type unseen during training.")
+        return self.scaler.transform(features)
+
+def iter_chunks(data: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start:start + chunk_size]
+
+class TransactionAnalyzer:
+    def __init__(self, model=None, chunk_size: int = 50000):
+        self.model = model if model is not None else IsolationForest(contamination=0.1)  # Default model
+        self.pipeline = FeaturePipeline()
+        self.chunk_size = chunk_size
+        self._frames: List[pd.DataFrame] = []
+
+    @property
+    def scaler(self) -> StandardScaler:
+        return self.pipeline.scaler
+
+    @property
+    def transaction_data(self) -> pd.DataFrame:
+        # Appended frames are concatenated once, on first access
+        if len(self._frames) != 1:
+            self._frames = [pd.concat(self._frames, ignore_index=True) if self._frames else pd.DataFrame()]
+        return self._frames[0]
+
+    @transaction_data.setter
+    def transaction_data(self, data: pd.DataFrame) -> None:
+        self._frames = [data]
 
     def ingest_data(self, data: pd.DataFrame) -> None:
-        """Ingest transaction data."""
+        """Ingest transaction data, replacing anything ingested before."""
         self.transaction_data = data
         logging.info(f"Data ingested: {len(data)} transactions.")
 
-    def preprocess_data(self) -> pd.DataFrame:
-        """Preprocess the transaction data for analysis."""
-        if self.transaction_data.empty:
-            raise ValueError("No transaction data to preprocess.")
-
-        # Example feature extraction
-        features = self.transaction_data[['amount', 'transaction_type', 'timestamp']]
-        features['transaction_type'] = features['transaction_type'].astype('category').cat.codes  # Convert categorical to numeric
-        features['timestamp'] = pd.to_datetime(features['timestamp']).astype(int) // 10**9  # Convert to seconds since epoch
+    def append_data(self, data: pd.DataFrame) -> None:
+        """Add transactions to the ones already ingested."""
+        self._frames.append(data)
+        logging.info(f"Data appended: {len(data)} transactions.")
 
-        # Scale features
-        scaled_features = self.scaler.fit_transform(features)
+    def preprocess_data(self, data: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """Preprocess transaction data for analysis, fitting the feature pipeline only if it is not fitted yet."""
+        data = self.transaction_data if data is None else data
+        if data.empty:
+            raise ValueError("No transaction data to preprocess.")
+        if not self.pipeline.fitted:
+            self.pipeline.fit(data)
+        scaled_features = self.pipeline.transform(data)
         logging.info("Data preprocessed and features extracted.")
         return scaled_features
 
     def train_model(self) -> None:
-        """Train the anomaly detection model."""
+        """Fit the feature pipeline and train the anomaly detection model."""
         if self.transaction_data.empty:
             raise ValueError("No transaction data to train the model.")
 
-        X = self.preprocess_data()
-        self.model.fit(X)
+        self.pipeline.fit(self.transaction_data)
+        self.model.fit(self.pipeline.transform(self.transaction_data))
         logging.info("Anomaly detection model trained.")
 
-    def detect_anomalies(self) -> pd.DataFrame:
-        """Detect anomalies in the transaction data."""
-        if self.transaction_data.empty:
-            raise ValueError("No transaction data to analyze.")
+    def score_frames(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Score frames one chunk at a time, yielding each chunk with 'anomaly' and 'anomaly_score' columns.
 
-        X = self.preprocess_data()
-        predictions = self.model.predict(X)
-        self.transaction_data['anomaly'] = predictions
-        anomalies = self.transaction_data[self.transaction_data['anomaly'] == -1]
+        Accepts any iterable of frames, e.g. pd.read_csv(path, chunksize=...),
+        so only one chunk's features are held in memory at a time.
+        """
+        for frame in frames:
+            for chunk in iter_chunks(frame, self.chunk_size):
+                X = self.pipeline.transform(chunk)
+                yield chunk.assign(anomaly=self.model.predict(X), anomaly_score=self.model.decision_function(X))
+
+    def detect_anomalies(self, data: Optional[Iterable[pd.DataFrame]] = None) -> pd.DataFrame:
+        """Detect anomalies in the ingested data, or in a frame or iterable of frames.
+
+        Scoring the ingested data also records each transaction's label in
+        its 'anomaly' column. Only anomalous rows are kept from other input.
+        """
+        if not self.pipeline.fitted:
+            raise ValueError("Train the model before detecting anomalies.")
+        if data is None:
+            if self.transaction_data.empty:
+                raise ValueError("No transaction data to analyze.")
+            labels = np.concatenate([self.model.predict(self.pipeline.transform(chunk))
+                                     for chunk in iter_chunks(self.transaction_data, self.chunk_size)])
+            self.transaction_data['anomaly'] = labels
+            anomalies = self.transaction_data[labels == -1]
+        else:
+            frames = [data] if isinstance(data, pd.DataFrame) else data
+            found = [scored[scored['anomaly'] == -1] for scored in self.score_frames(frames)]
+            anomalies = pd.concat(found) if found else pd.DataFrame()
         logging.info(f"Detected {len(anomalies)} anomalies.")
         return anomalies
 
@@ -93,13 +186,18 @@ class TransactionAnalyzer:
         logging.info(f"Best model parameters: {grid_search.best_params_}")
 
     def save_model(self, filename: str) -> None:
-        """Save the trained model to a file."""
-        joblib.dump(self.model, filename)
+        """Save the trained model together with its fitted feature pipeline."""
+        joblib.dump({'model': self.model, 'pipeline': self.pipeline}, filename)
         logging.info(f"Model saved to {filename}.")
 
     def load_model(self, filename: str) -> None:
-        """Load a trained model from a file."""
-        self.model = joblib.load(filename)
+        """Load a model saved by save_model; files holding only a model are still accepted."""
+        saved = joblib.load(filename)
+        if isinstance(saved, dict) and 'model' in saved:
+            self.model = saved['model']
+            self.pipeline = saved['pipeline']
+        else:
+            self.model = saved
         logging.info(f"Model loaded from {filename}.")
 
     def send_alert(self, anomalies: pd.DataFrame) -> None:
@@ -135,7 +233,7 @@ if __name__ == "__main__":
         'transaction_id': range(1, 101),
         'amount': np.random.normal(100, 20, 100).tolist(),  # Normal distribution around 100
         'transaction_type': np.random.choice(['deposit', 'withdrawal'], 100),
-        'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='H')
+        'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='h')
     }
     df = pd.DataFrame(data)
 
@@ -1,19 +1,84 @@
+import asyncio
 import joblib
 import numpy as np
 import pandas as pd
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 
+TRANSACTION_TYPES = {'transfer': 0, 'withdrawal': 1, 'deposit': 2}
+
+def encode_transaction(transaction: Dict[str, Any]) -> Tuple[float, float]:
+    """(amount, transaction type code) for one transaction; raises ValueError if it cannot be encoded.
+
+    The type may be given by name or by its numeric code.
+    """
+    transaction_type = transaction.get('transaction_type')
+    code = TRANSACTION_TYPES.get(transaction_type) if isinstance(transaction_type, str) else transaction_type
+    if code not in TRANSACTION_TYPES.values() or isinstance(code, bool):
+        raise ValueError(f"Unknown transaction type: {transaction_type!r}")
+    try:
+        amount = float(transaction['amount'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid transaction amount: {transaction.get('amount')!r}")
+    return amount, float(code)
+
+def transaction_features(transactions: List[Dict[str, Any]]) -> np.ndarray:
+    """Feature matrix (amount, transaction type code) for a batch of transactions."""
+    features = np.empty((len(transactions), 2), dtype=float)
+    for row, transaction in enumerate(transactions):
+        features[row] = encode_transaction(transaction)
+    return features
+
 class AIFraudDetection:
-    def __init__(self):
-        self.model = self.load_fraud_detection_model()
-        self.transaction_history = []  # Store transaction history for analysis
+    """Fraud scoring with a random forest, one call per transaction or micro-batched.
+
+    The model is loaded (or trained, if `model_path` does not exist) on first
+    use; await start() to do that in a worker thread instead of on the event
+    loop. Concurrent score() calls are queued and predicted together once
+    `max_batch` are waiting or `max_delay` seconds after the first one was
+    queued, whichever comes first, since one forest prediction over many rows
+    costs about as much as one over a single row. A transaction that cannot be
+    encoded is rejected by score() before it is queued. Only the last
+    `history_size` transactions are kept in `transaction_history`.
+    """
+
+    def __init__(self, model_path: str = 'fraud_detection_model.pkl', model=None, max_batch: int = 1024,
+                 max_delay: float = 0.005, history_size: int = 10000):
+        self.model_path = model_path
+        self.model = model
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.transaction_history = deque(maxlen=history_size)  # Recent transactions for analysis
+        self.pending = []  # (transaction, features, future)
+        self.timer = None
+        self.inflight = set()
+        self.batches = 0
+        self.warmed = False
+        self._loading: Optional[asyncio.Task] = None
+
+    def ensure_model(self):
+        if self.model is None:
+            self.model = self.load_fraud_detection_model()
+        return self.model
+
+    async def start(self) -> "AIFraudDetection":
+        """Load or train the model in a worker thread and warm it with one prediction."""
+        if self.model is None:
+            if self._loading is None:
+                self._loading = asyncio.ensure_future(asyncio.to_thread(self.ensure_model))
+            await self._loading
+        if not self.warmed:
+            self.warmed = True
+            await asyncio.to_thread(self.model.predict, np.zeros((1, 2)))
+        return self
 
     def load_fraud_detection_model(self):
         """Load a pre-trained model for fraud detection or train a new one if not available."""
         try:
-            model = joblib.load('fraud_detection_model.pkl')  # Load the model from a file
+            model = joblib.load(self.model_path)  # Load the model from a file
             print("Fraud detection model loaded successfully.")
             return model
         except FileNotFoundError:
@@ -31,10 +96,10 @@ class AIFraudDetection:
         df = pd.DataFrame(data)
 
         # Convert categorical variable to numerical
-        df['transaction_type'] = df['transaction_type'].map({'transfer': 0, 'withdrawal': 1, 'deposit': 2})
+        df['transaction_type'] = df['transaction_type'].map(TRANSACTION_TYPES)
 
-        # Split the dataset into features and target
-        X = df[['amount', 'transaction_type']]
+        # Split the dataset into features and target; plain arrays match what detect_fraud passes
+        X = df[['amount', 'transaction_type']].to_numpy(dtype=float)
         y = df['is_fraud']
 
         # Split into training and testing sets
@@ -46,24 +111,79 @@ class AIFraudDetection:
 
         # Evaluate the model
         y_pred = model.predict(X_test)
-        print(classification_report(y_test, y_pred))
+        print(classification_report(y_test, y_pred, zero_division=0))
 
         # Save the trained model
-        joblib.dump(model, 'fraud_detection_model.pkl')
+        joblib.dump(model, self.model_path)
         print("New fraud detection model trained and saved.")
 
         return model
 
-    def detect_fraud(self, transaction):
-        """Analyze the transaction using the model."""
-        # Prepare the transaction data for prediction
-        transaction_data = np.array([[transaction['amount'], transaction['transaction_type']]])
-        prediction = self.model.predict(transaction_data)
+    def detect_fraud_batch(self, transactions: Iterable[Dict[str, Any]]) -> List[bool]:
+        """Score many transactions with one vectorized prediction."""
+        transactions = list(transactions)
+        if not transactions:
+            return []
+        return self._classify(transactions, transaction_features(transactions))
 
-        # Log the transaction for history
-        self.transaction_history.append(transaction)
+    def _classify(self, transactions: List[Dict[str, Any]], features: np.ndarray) -> List[bool]:
+        predictions = self.ensure_model().predict(features)
+        self.transaction_history.extend(transactions)
+        self.batches += 1
+        return [bool(prediction) for prediction in predictions]
 
-        return bool(prediction[0])  # Return True if fraud is detected
+    def detect_fraud(self, transaction):
+        """Analyze the transaction using the model."""
+        return self.detect_fraud_batch([transaction])[0]  # True if fraud is detected
+
+    async def score(self, transaction: Dict[str, Any]) -> bool:
+        """Queue a transaction for the next micro-batch and wait for its verdict.
+
+        Raises ValueError without queueing if the transaction cannot be encoded.
+        """
+        features = encode_transaction(transaction)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((transaction, features, future))
+        if len(self.pending) >= self.max_batch:
+            self._flush_pending()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self._flush_pending)
+        return await future
+
+    async def score_many(self, transactions: Iterable[Dict[str, Any]]) -> List[bool]:
+        return await asyncio.gather(*(self.score(transaction) for transaction in transactions))
+
+    def _flush_pending(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.pending:
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            task = asyncio.create_task(self._predict(batch))
+            self.inflight.add(task)
+            task.add_done_callback(self.inflight.discard)
+
+    async def flush(self) -> None:
+        """Score everything queued now and wait for it to finish."""
+        self._flush_pending()
+        if self.inflight:
+            await asyncio.gather(*self.inflight, return_exceptions=True)
+
+    async def _predict(self, batch: list) -> None:
+        try:
+            await self.start()
+            # Forest prediction releases the GIL for most of its work, so run it off the event loop
+            verdicts = await asyncio.to_thread(self._classify, [transaction for transaction, _, _ in batch],
+                                               np.array([features for _, features, _ in batch]))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), verdict in zip(batch, verdicts):
+            if not future.done():
+                future.set_result(verdict)
 
 # Example usage
 if __name__ == "__main__":
@@ -78,3 +198,12 @@ if __name__ == "__main__":
     # Detect fraud
     is_fraud = fraud_detector.detect_fraud(transaction)
     print(f"Fraud detected: {is_fraud}")
+
+    # Score a burst of concurrent transactions in micro-batches
+    async def score_burst():
+        await fraud_detector.start()
+        burst = [{'amount': amount, 'transaction_type': 'transfer'} for amount in np.random.uniform(1, 1000, 5000)]
+        verdicts = await fraud_detector.score_many(burst)
+        print(f"Flagged {sum(verdicts)} of {len(burst)} transactions in {fraud_detector.batches - 1} batches")
+
+    asyncio.run(score_burst())
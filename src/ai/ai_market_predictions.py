@@ -8,6 +8,7 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error
 import matplotlib.pyplot as plt
 from datetime import datetime
+from market_backtest import FEATURE_COLUMNS, WalkForwardBacktester, load_market_csv, sweep
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,6 +29,11 @@ class AIMarketPredictions:
             logging.error("Failed to fetch market data.")
             return None
 
+    def load_market_data(self, path):
+        """Load market data from a local CSV with Date, Open, High, Low, Close and Volume columns."""
+        self.data = load_market_csv(path).reset_index()
+        logging.info(f"Market data loaded from {path}: {len(self.data)} rows.")
+
     def preprocess_data(self):
         """Preprocess the market data for analysis."""
         if self.data is None:
@@ -45,10 +51,11 @@ class AIMarketPredictions:
         if self.data is None:
             logging.error("No data to train on.")
             return False
-        X = self.data[['Open', 'High', 'Low', 'Volume']]
+        X = self.data[FEATURE_COLUMNS]
         y = self.data['Close'].shift(-1).dropna()
         X = X[:-1]  # Align X with y
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        # Time series: test on the most recent rows rather than a shuffled sample
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
 
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
         self.model.fit(X_train, y_train)
@@ -82,21 +89,35 @@ class AIMarketPredictions:
         logging.info("Visualization displayed.")
         return True
 
-    def backtest_strategy(self, initial_investment=1000):
-        """Backtest a simple trading strategy based on predictions."""
+    def backtester(self, train_size=None, test_size=20, **kwargs):
+        """Walk-forward backtester over the loaded data; by default it trains on the first half's worth of rows."""
+        if train_size is None:
+            train_size = min(250, len(self.data) // 2)
+        return WalkForwardBacktester(self.data, train_size=train_size, test_size=test_size, **kwargs)
+
+    def backtest_strategy(self, initial_investment=1000, threshold=0.0, **kwargs):
+        """Backtest going long whenever the next close is predicted above the current one.
+
+        Predictions are walk-forward: each row is predicted by a model
+        trained only on earlier rows.
+        """
         if self.data is None:
             logging.error("No data to backtest.")
             return False
-        self.data['Predicted'] = self.model.predict(self.data[['Open', 'High', 'Low', 'Volume']])
-        self.data['Signal'] = np.where(self.data['Predicted'] > self.data['Close'], 1, 0)  # Buy signal
-        self.data['Position'] = self.data['Signal'].shift(1)  # Shift to avoid lookahead bias
-        self.data['Strategy_Returns'] = self.data['Returns'] * self.data['Position']
-        self.data['Cumulative_Strategy_Returns'] = (1 + self.data['Strategy_Returns']).cumprod()
-
-        total_return = initial_investment * self.data['Cumulative_Strategy_Returns'].iloc[-1]
+        results = self.backtester(**kwargs).run({'threshold': [{'threshold': threshold}]})
+        total_return = initial_investment * (1 + results['total_return'].iloc[0])
         logging.info(f"Backtest completed. Total return: ${total_return:.2f}")
         return total_return
 
+    def backtest_grid(self, strategies, configs=None, processes=None):
+        """Backtest every strategy parameter set under each walk-forward config; returns a metrics table."""
+        if self.data is None:
+            logging.error("No data to backtest.")
+            return None
+        if configs is None:
+            return self.backtester().run(strategies)
+        return sweep(self.data, configs, strategies, processes=processes)
+
 # Example usage
 if __name__ == "__main__":
     ai_market_predictions = AIMarketPredictions()
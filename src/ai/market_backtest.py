@@ -0,0 +1,182 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+FEATURE_COLUMNS = ['Open', 'High', 'Low', 'Volume']
+PERIODS_PER_YEAR = 252
+
+def load_market_csv(path: str) -> pd.DataFrame:
+    """Read OHLCV rows from a local CSV, indexed by Date in ascending order."""
+    data = pd.read_csv(path, parse_dates=['Date'])
+    return data.set_index('Date').sort_index()
+
+def walk_forward_splits(n: int, train_size: int, test_size: int,
+                        expanding: bool = False) -> Iterator[Tuple[slice, slice]]:
+    """(train, test) row slices that move forward `test_size` rows at a time.
+
+    Each test window starts right after its training window, so every row is
+    predicted by a model that only saw earlier rows. The training window is
+    rolling (`train_size` rows) or, with `expanding`, grows from row 0.
+    """
+    if train_size < 1 or test_size < 1:
+        raise ValueError("train_size and test_size must be positive.")
+    for test_start in range(train_size, n, test_size):
+        train_start = 0 if expanding else test_start - train_size
+        yield slice(train_start, test_start), slice(test_start, min(test_start + test_size, n))
+
+# Strategies map (context, parameter sets) to a positions matrix of shape
+# (rows, parameter sets): 1 long, -1 short, 0 flat, held from row t to t+1.
+
+def threshold_positions(context: Dict[str, np.ndarray], params: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Long while the predicted next return exceeds `threshold`."""
+    thresholds = np.array([p.get('threshold', 0.0) for p in params])
+    return (context['predicted_return'][:, None] > thresholds[None, :]).astype(float)
+
+def long_short_positions(context: Dict[str, np.ndarray], params: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Long above `threshold`, short below -`threshold`, flat in between."""
+    thresholds = np.array([p.get('threshold', 0.0) for p in params])[None, :]
+    predicted = context['predicted_return'][:, None]
+    return (predicted > thresholds).astype(float) - (predicted < -thresholds).astype(float)
+
+def momentum_positions(context: Dict[str, np.ndarray], params: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Model-free baseline: long while the trailing `lookback`-row return is positive."""
+    close = context['close']
+    positions = np.zeros((len(close), len(params)))
+    for column, p in enumerate(params):
+        lookback = p.get('lookback', 20)
+        positions[lookback:, column] = close[lookback:] > close[:-lookback]
+    return positions
+
+STRATEGIES: Dict[str, Callable[[Dict[str, np.ndarray], Sequence[Dict[str, Any]]], np.ndarray]] = {
+    'threshold': threshold_positions,
+    'long_short': long_short_positions,
+    'momentum': momentum_positions,
+}
+
+def evaluate_positions(positions: np.ndarray, returns: np.ndarray, cost: float = 0.0) -> Dict[str, np.ndarray]:
+    """Performance of every positions column at once; `returns[t]` is the return from row t to t+1.
+
+    `cost` is charged as a fraction of the traded amount on each position change.
+    """
+    changes = np.abs(np.diff(positions, axis=0, prepend=0.0))
+    strategy_returns = positions * returns[:, None] - cost * changes
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=0)
+    std = strategy_returns.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, strategy_returns.mean(axis=0) / std * np.sqrt(PERIODS_PER_YEAR), 0.0)
+    active = positions != 0
+    wins = (strategy_returns > 0) & active
+    return {
+        'total_return': equity[-1] - 1,
+        'sharpe': sharpe,
+        'max_drawdown': drawdown.max(axis=0),
+        'trades': changes.sum(axis=0),
+        'exposure': np.abs(positions).mean(axis=0),
+        'hit_rate': np.divide(wins.sum(axis=0), active.sum(axis=0),
+                              out=np.zeros(positions.shape[1]), where=active.any(axis=0)),
+    }
+
+class WalkForwardBacktester:
+    """Walk-forward backtests of many strategies over one set of out-of-sample predictions.
+
+    The model is refit once per walk-forward fold on `data` (OHLCV columns,
+    in time order) to predict the next row's Close. The resulting
+    predictions are shared by every strategy, and each strategy evaluates
+    all its parameter sets in one vectorized pass, so adding configurations
+    does not add model fits. Only rows with an out-of-sample prediction and
+    a following row are traded.
+    """
+
+    def __init__(self, data: pd.DataFrame, train_size: int = 250, test_size: int = 20, expanding: bool = False,
+                 feature_columns: Sequence[str] = FEATURE_COLUMNS, model_params: Optional[Dict[str, Any]] = None,
+                 cost: float = 0.0):
+        self.data = data
+        self.train_size = train_size
+        self.test_size = test_size
+        self.expanding = expanding
+        self.feature_columns = list(feature_columns)
+        self.model_params = dict(model_params or {'n_estimators': 100, 'random_state': 42})
+        self.cost = cost
+        self._predictions: Optional[np.ndarray] = None
+
+    def make_model(self):
+        return RandomForestRegressor(**self.model_params)
+
+    def predictions(self) -> np.ndarray:
+        """Out-of-sample predicted next Close per row; NaN where no fold covers the row."""
+        if self._predictions is None:
+            X = self.data[self.feature_columns].to_numpy(dtype=float)
+            close = self.data['Close'].to_numpy(dtype=float)
+            # Row t is labelled with the next Close, so the last row has no label
+            X, y = X[:-1], close[1:]
+            predictions = np.full(len(close), np.nan)
+            folds = 0
+            for train, test in walk_forward_splits(len(y), self.train_size, self.test_size, self.expanding):
+                model = self.make_model()
+                model.fit(X[train], y[train])
+                predictions[test] = model.predict(X[test])
+                folds += 1
+            logging.info(f"Walk-forward predictions from {folds} folds.")
+            self._predictions = predictions
+        return self._predictions
+
+    def context(self) -> Dict[str, np.ndarray]:
+        """Arrays for the tradable rows: close, predicted next close and return, and realized next return."""
+        close = self.data['Close'].to_numpy(dtype=float)
+        predicted = self.predictions()
+        tradable = ~np.isnan(predicted)
+        tradable[-1] = False
+        next_return = np.zeros(len(close))
+        next_return[:-1] = close[1:] / close[:-1] - 1
+        return {
+            'close': close,
+            'predicted': predicted,
+            'predicted_return': np.where(tradable, predicted / close - 1, 0.0),
+            'next_return': next_return,
+            'tradable': tradable,
+        }
+
+    def run(self, strategies: Dict[str, Iterable[Dict[str, Any]]]) -> pd.DataFrame:
+        """Evaluate every (strategy, parameter set); returns one row of metrics per combination."""
+        context = self.context()
+        tradable = context['tradable']
+        if not tradable.any():
+            raise ValueError("No rows fall in a walk-forward test window; reduce train_size.")
+        rows = []
+        for name, params in strategies.items():
+            params = list(params) or [{}]
+            positions = STRATEGIES[name](context, params)[tradable]
+            metrics = evaluate_positions(positions, context['next_return'][tradable], self.cost)
+            for column, p in enumerate(params):
+                rows.append(dict({'strategy': name, 'params': p},
+                                 **{metric: float(values[column]) for metric, values in metrics.items()}))
+        return pd.DataFrame(rows)
+
+def _run_config(data: pd.DataFrame, config: Dict[str, Any], strategies: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    results = WalkForwardBacktester(data, **config).run(strategies)
+    for key, value in config.items():
+        results[key] = [value] * len(results)
+    return results
+
+def sweep(data: pd.DataFrame, configs: Iterable[Dict[str, Any]], strategies: Dict[str, Iterable[Dict[str, Any]]],
+          processes: Optional[int] = None) -> pd.DataFrame:
+    """Backtest every walk-forward config (WalkForwardBacktester keyword arguments) against every strategy.
+
+    Each config needs its own model fits; with `processes` greater than one
+    the configs run in separate processes.
+    """
+    configs = list(configs)
+    strategies = {name: list(params) for name, params in strategies.items()}
+    if processes and processes > 1 and len(configs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(configs))) as executor:
+            results = list(executor.map(_run_config, [data] * len(configs), configs, [strategies] * len(configs)))
+    else:
+        results = [_run_config(data, config, strategies) for config in configs]
+    return pd.concat(results, ignore_index=True)
@@ -1,9 +1,12 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Security
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Security, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import List, Dict, Optional
 from wallet import Wallet  # Assumes wallet.py is compatible with Stellar
+from wallet_view import WalletView
+from horizon_client import get_horizon_client
+from response_cache import ResponseCache, InMemoryCacheBackend, RedisCacheBackend
 from stellar_sdk import Server, Keypair, TransactionBuilder, Network, Asset, Payment, ManageData
 import os
 import jwt
@@ -38,6 +41,14 @@ redis_client = redis.Redis(host="localhost", port=6379, decode_responses=True)
 limiter = Limiter(key="nexus-revoluter", default_limit="200/minute")
 app.add_middleware(FastAPILimiter, redis=redis_client)
 
+# Response cache: shared through redis by default, or per process with RESPONSE_CACHE=memory
+response_cache = ResponseCache(
+    InMemoryCacheBackend() if os.getenv("RESPONSE_CACHE") == "memory" else RedisCacheBackend(redis_client)
+)
+BALANCE_TTL = 10.0
+TRANSACTIONS_TTL = 10.0
+HEALTH_TTL = 5.0
+
 # Stellar configuration
 HORIZON_URL = os.getenv("HORIZON_URL", "https://horizon.stellar.org")
 PI_COIN_ISSUER = os.getenv("PI_COIN_ISSUER", "G...")  # Replace with actual issuer
@@ -105,6 +116,8 @@ fake_users_db: Dict[str, UserInDB] = {}
 
 # Stellar server
 stellar_server = Server(HORIZON_URL)
+# Concurrent, cached balance and history lookups shared across requests
+wallet_view = WalletView(get_horizon_client(HORIZON_URL, NETWORK_PASSPHRASE), PI_COIN)
 
 # Initialize nexus-revoluter modules
 empathy_processor = EmpathyProcessor()  # For empathetic UX (AHCEW-inspired)
@@ -210,33 +223,31 @@ async def submit_kyc(request: KYCRequest, current_user: User = Depends(get_curre
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/addresses", response_model=List[AddressResponse])
-async def get_addresses(current_user: User = Depends(get_current_user)):
-    """Get all wallet addresses and their Pi Coin balances."""
-    addresses = wallet.addresses
-    responses = []
-    for address in addresses:
-        try:
-            account = stellar_server.accounts().account_id(address).call()
-            pi_balance = next(
-                (float(bal["balance"]) for bal in account["balances"] if bal["asset_code"] == "PI"),
-                0.0
-            )
-            responses.append({
-                "address": address,
-                "balance": wallet.get_balance(address),
-                "pi_balance": pi_balance
-            })
-        except Exception as e:
-            logger.warning(f"Failed to fetch balance for {address}: {str(e)}")
-            responses.append({"address": address, "balance": 0.0, "pi_balance": 0.0})
+async def get_addresses(request: Request, cursor: Optional[str] = None, limit: int = 100,
+                        current_user: User = Depends(get_current_user)):
+    """Get wallet addresses and their Pi Coin balances, a page at a time (see the X-Next-Cursor header)."""
+    async def compute():
+        balances = await wallet_view.balances(wallet.addresses)
+        responses = []
+        for address, pi_balance in balances.items():
+            if pi_balance is None:
+                responses.append({"address": address, "balance": 0.0, "pi_balance": 0.0})
+            else:
+                responses.append({"address": address, "balance": pi_balance, "pi_balance": pi_balance})
+        return responses
+
     logger.info(f"User {current_user.username} requested addresses.")
-    return responses
+    return await response_cache.respond(
+        request, ResponseCache.key("addresses", current_user.username), compute,
+        ttl=BALANCE_TTL, tags=["wallet", "addresses", "balances"],
+        cursor=cursor, limit=limit, item_key=lambda item: item["address"]
+    )
 
 @app.post("/addresses", response_model=AddressResponse)
 async def create_address(current_user: User = Depends(get_current_user)):
     """Create a new Stellar-compatible wallet address."""
-    address = wallet.generate_address(len(wallet.addresses))
-    wallet.addresses[address] = 0.0
+    address = wallet.add_address()
+    await response_cache.invalidate("addresses")
     try:
         account = stellar_server.accounts().account_id(address).call()
         pi_balance = next(
@@ -249,21 +260,21 @@ async def create_address(current_user: User = Depends(get_current_user)):
     return {"address": address, "balance": 0.0, "pi_balance": pi_balance}
 
 @app.get("/balance/{address}", response_model=AddressResponse)
-async def get_balance(address: str, current_user: User = Depends(get_current_user)):
+async def get_balance(request: Request, address: str, current_user: User = Depends(get_current_user)):
     """Get the balance of a specific address, including Pi Coin."""
-    balance = wallet.get_balance(address)
-    if balance is None:
+    if address not in wallet.addresses:
         raise HTTPException(status_code=404, detail="Address not found")
-    try:
-        account = stellar_server.accounts().account_id(address).call()
-        pi_balance = next(
-            (float(bal["balance"]) for bal in account["balances"] if bal["asset_code"] == "PI"),
-            0.0
-        )
-    except Exception:
-        pi_balance = 0.0
+
+    async def compute():
+        pi_balance = await wallet_view.balance(address)
+        balance = wallet.addresses[address] if pi_balance is None else pi_balance
+        return {"address": address, "balance": balance, "pi_balance": pi_balance or 0.0}
+
     logger.info(f"User {current_user.username} requested balance for address: {address}.")
-    return {"address": address, "balance": balance, "pi_balance": pi_balance}
+    return await response_cache.respond(
+        request, ResponseCache.key("balance", current_user.username, address), compute,
+        ttl=BALANCE_TTL, tags=["wallet", "balances", f"address:{address}"]
+    )
 
 @app.post("/transactions", response_model=TransactionResponse)
 async def create_transaction(
@@ -312,6 +323,12 @@ async def create_transaction(
         
         # Update wallet and log
         wallet.create_transaction(transaction.from_address, transaction.to_address, transaction.amount)
+        # Drop cached Horizon balances first so recomputed responses see the transfer
+        wallet_view.invalidate(transaction.from_address)
+        wallet_view.invalidate(transaction.to_address)
+        await response_cache.invalidate(
+            "transactions", "addresses", f"address:{transaction.from_address}", f"address:{transaction.to_address}"
+        )
         background_tasks.add_task(
             compliance_analyzer.log_transaction,
             response["id"],
@@ -328,27 +345,29 @@ async def create_transaction(
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/transactions", response_model=List[Dict])
-async def get_transactions(current_user: User = Depends(get_current_user)):
-    """Get the list of transactions from wallet and Stellar."""
-    wallet_txs = wallet.get_transactions()
-    stellar_txs = []
-    for address in wallet.addresses:
-        try:
-            payments = stellar_server.payments().for_account(address).call()
-            for payment in payments["_embedded"]["records"]:
-                if payment["asset_code"] == "PI":
-                    stellar_txs.append({
-                        "id": payment["id"],
-                        "from": payment["from"],
-                        "to": payment["to"],
-                        "amount": float(payment["amount"]),
-                        "timestamp": payment["created_at"]
-                    })
-        except Exception as e:
-            logger.warning(f"Failed to fetch Stellar transactions for {address}: {str(e)}")
-    combined_txs = wallet_txs + stellar_txs
+async def get_transactions(request: Request, cursor: Optional[str] = None, limit: int = 100,
+                           current_user: User = Depends(get_current_user)):
+    """Get transactions from wallet and Stellar, a page at a time (see the X-Next-Cursor header)."""
+    async def compute():
+        wallet_txs = wallet.transactions
+        stellar_txs = [
+            {
+                "id": payment["stellar_id"],
+                "from": payment["from"],
+                "to": payment["to"],
+                "amount": payment["amount"],
+                "timestamp": payment["timestamp"]
+            }
+            for payment in await wallet_view.transactions(wallet.addresses)
+        ]
+        return wallet_txs + stellar_txs
+
     logger.info(f"User {current_user.username} requested transactions.")
-    return combined_txs
+    return await response_cache.respond(
+        request, ResponseCache.key("transactions", current_user.username), compute,
+        ttl=TRANSACTIONS_TTL, tags=["wallet", "transactions"],
+        cursor=cursor, limit=limit, item_key=lambda tx: tx.get("id") or tx.get("hash")
+    )
 
 @app.post("/save")
 async def save_wallet(current_user: User = Depends(get_current_user), background_tasks: BackgroundTasks):
@@ -362,6 +381,7 @@ async def load_wallet(current_user: User = Depends(get_current_user)):
     """Load the wallet from a file with decryption."""
     try:
         wallet.load_wallet("nexus_wallet.json")
+        await response_cache.invalidate("wallet")
         logger.info(f"User {current_user.username} loaded the wallet.")
         return {"message": "Wallet loaded successfully"}
     except Exception as e:
@@ -375,23 +395,27 @@ async def delete_address(address: str, current_user: User = Depends(get_current_
         raise HTTPException(status_code=404, detail="Address not found")
     if not compliance_analyzer.check_address_deletion(address):
         raise HTTPException(status_code=403, detail="Address deletion not compliant")
-    del wallet.addresses[address]
+    wallet.remove_address(address)
+    await response_cache.invalidate("addresses", f"address:{address}")
     logger.info(f"User {current_user.username} deleted address: {address}.")
     return {"success": True, "message": "Address deleted successfully"}
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint with nexus-revoluter status."""
-    try:
-        stellar_status = stellar_server.server().call()["status"]
-        return {
-            "status": "healthy",
-            "stellar_status": stellar_status,
-            "nexus_version": "1.0.0"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return {"status": "unhealthy", "error": str(e)}
+    def compute():
+        try:
+            stellar_status = stellar_server.server().call()["status"]
+            return {
+                "status": "healthy",
+                "stellar_status": stellar_status,
+                "nexus_version": "1.0.0"
+            }
+        except Exception as e:
+            logger.error(f"Health check failed: {str(e)}")
+            return {"status": "unhealthy", "error": str(e)}
+
+    return await response_cache.respond(request, ResponseCache.key("health", "public"), compute, ttl=HEALTH_TTL)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,14 +1,16 @@
 import hashlib
 import time
 import json
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Union, Iterator, Optional, Tuple
 import random
 import requests
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response, stream_with_context
 
 # Constants
 PI_COIN_VALUE = 314159.00  # Fixed value for Pi Coin
 TRANSACTION_FEE_PERCENTAGE = 0.01  # 1% transaction fee
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 class Block:
     def __init__(self, index: int, previous_hash: str, timestamp: float, data: Any, hash: str, nonce: int):
@@ -124,7 +126,32 @@ class Blockchain:
 
     def get_chain(self) -> List[Dict[str, Any]]:
         """Get the blockchain as a list of dictionaries."""
-        return [block.to_dict() for block in self.chain]
+        return list(self.iter_blocks())
+
+    def iter_blocks(self, start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield blocks with index in [start, end) as dictionaries, one at a time."""
+        end = len(self.chain) if end is None else min(end, len(self.chain))
+        for index in range(max(start, 0), end):
+            yield self.chain[index].to_dict()
+
+    def get_blocks(self, start: int = 0, limit: int = DEFAULT_PAGE_SIZE,
+                   end: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Get up to `limit` blocks from `start` (stopping before `end`), plus the index to continue from.
+
+        The returned cursor is None once the range or the chain is exhausted.
+        Blocks are only ever appended, so a block index is a stable cursor.
+        """
+        stop = len(self.chain) if end is None else min(end, len(self.chain))
+        if start >= stop:
+            return [], None
+        page_end = min(start + limit, stop)
+        blocks = list(self.iter_blocks(start, page_end))
+        return blocks, page_end if page_end < stop else None
+
+    def export_ndjson(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """Yield the chain as newline-delimited JSON, serializing each block only when it is consumed."""
+        for block in self.iter_blocks(start, end):
+            yield json.dumps(block) + "\n"
 
     def get_block(self, index: int) -> Union[Block, None]:
         """Get a block by its index."""
@@ -194,13 +221,48 @@ def mine():
     }
     return jsonify(response), 200
 
+def _int_arg(name: str, default: Optional[int]) -> Optional[int]:
+    value = request.args.get(name)
+    if value is None:
+        return default
+    number = int(value)
+    if number < 0:
+        raise ValueError(f"{name} must not be negative")
+    return number
+
 @app.route('/chain', methods=['GET'])
 def full_chain():
-    response = {
-        'chain': blockchain.get_chain(),
-        'length': len(blockchain)
-    }
-    return jsonify(response), 200
+    """The whole chain as one JSON document, written out block by block instead of built in memory."""
+    def generate():
+        yield '{"chain": ['
+        for position, block in enumerate(blockchain.iter_blocks()):
+            yield (',' if position else '') + json.dumps(block)
+        yield '], "length": %d}' % len(blockchain)
+    return Response(stream_with_context(generate()), mimetype='application/json'), 200
+
+@app.route('/blocks', methods=['GET'])
+def blocks():
+    """A page of blocks. Pass the returned next_cursor as `cursor` (or a block index as `start`) to continue."""
+    try:
+        start = _int_arg('cursor', None)
+        start = _int_arg('start', 0) if start is None else start
+        limit = min(_int_arg('limit', DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        end = _int_arg('end', None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if limit == 0:
+        return jsonify({'error': 'limit must be positive'}), 400
+    page, next_cursor = blockchain.get_blocks(start, limit, end)
+    return jsonify({'blocks': page, 'next_cursor': next_cursor, 'length': len(blockchain)}), 200
+
+@app.route('/chain/export', methods=['GET'])
+def export_chain():
+    """Stream blocks from `start` (default 0) to `end` (default the tip) as NDJSON."""
+    try:
+        start, end = _int_arg('start', 0), _int_arg('end', None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(stream_with_context(blockchain.export_ndjson(start, end)), mimetype='application/x-ndjson')
 
 if __name__ == "__main__":
     app.run(debug=True)
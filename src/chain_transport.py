@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import random
+import time
+import aiohttp
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class CircuitOpenError(Exception):
+    """Raised when a chain's circuit breaker is rejecting requests."""
+
+class CircuitBreaker:
+    """Stops calling a failing endpoint until a cool-down has passed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Closed and half-open circuits let requests through."""
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.state == "half-open":
+            self.opened_at = time.monotonic()
+
+def backoff_delay(attempt: int, base_delay: float = 0.5, max_delay: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class AsyncChainTransport:
+    """Asyncio HTTP transport with a connection pool and circuit breaker per chain."""
+
+    def __init__(self, blockchain_apis: dict, pool_size: int = 100, retries: int = 3, base_delay: float = 0.5,
+                 max_delay: float = 30.0, timeout: float = 10.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        self.blockchain_apis = blockchain_apis
+        self.pool_size = pool_size
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.sessions = {}
+        self.breakers = {}
+
+    def _session(self, chain: str) -> aiohttp.ClientSession:
+        session = self.sessions.get(chain)
+        if session is None or session.closed:
+            api_info = self.blockchain_apis[chain]
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=self.timeout,
+                headers={"Authorization": f"Bearer {api_info.get('api_key', '')}"}
+            )
+            self.sessions[chain] = session
+        return session
+
+    def breaker(self, chain: str) -> CircuitBreaker:
+        if chain not in self.breakers:
+            self.breakers[chain] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self.breakers[chain]
+
+    async def request(self, chain: str, method: str, path: str, payload: dict = None) -> dict:
+        """Send a request to a chain API, retrying transient failures with backoff."""
+        if chain not in self.blockchain_apis:
+            raise ValueError("Unsupported blockchain.")
+        breaker = self.breaker(chain)
+        for attempt in range(self.retries):
+            if not breaker.allow_request():
+                raise CircuitOpenError(f"Circuit open for {chain}.")
+            try:
+                url = f"{self.blockchain_apis[chain]['url']}{path}"
+                async with self._session(chain).request(method, url, json=payload) as response:
+                    if response.status >= 500:
+                        raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                          status=response.status)
+                    if response.status != 200:
+                        # The endpoint answered, so this is not retried or counted against the circuit
+                        breaker.record_success()
+                        try:
+                            body = await response.json(content_type=None)
+                        except ValueError:
+                            body = None
+                        error = body.get("error", response.reason) if isinstance(body, dict) else response.reason
+                        return {"status": "error", "error": error}
+                    body = await response.json()
+                    breaker.record_success()
+                    return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record_failure()
+                logging.error(f"Request to {chain} failed: {e}. Attempt {attempt + 1} of {self.retries}.")
+                if attempt + 1 < self.retries:
+                    await asyncio.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+        raise Exception("Max retries exceeded for request.")
+
+    async def post(self, chain: str, path: str, payload: dict) -> dict:
+        return await self.request(chain, "POST", path, payload)
+
+    async def get(self, chain: str, path: str) -> dict:
+        return await self.request(chain, "GET", path)
+
+    async def close(self):
+        """Close every pooled session."""
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+
+class ConfirmationWatcher:
+    """Tracks pending cross-chain transactions and confirms them with batched status queries.
+
+    One polling task runs per chain; each round asks for the status of up to
+    batch_size pending transactions in a single request, so thousands of
+    transfers can wait for confirmation without a thread or poll loop each.
+    A round that fails is logged and retried with backoff; if the poller
+    stops anyway (e.g. on close()), the transactions it was watching fail.
+    """
+
+    def __init__(self, transport: AsyncChainTransport, poll_interval: float = 2.0, batch_size: int = 200,
+                 status_path: str = "/transactions/status"):
+        self.transport = transport
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.status_path = status_path
+        self.pending = {}  # chain -> {transaction_id: (future, deadline)}
+        self.pollers = {}
+
+    def watch(self, chain: str, transaction_id: str, timeout: float = 60.0) -> asyncio.Future:
+        """Start watching a transaction; the future resolves to True once confirmed, False on timeout."""
+        loop = asyncio.get_running_loop()
+        chain_pending = self.pending.setdefault(chain, {})
+        if transaction_id in chain_pending:
+            return chain_pending[transaction_id][0]
+        future = loop.create_future()
+        chain_pending[transaction_id] = (future, loop.time() + timeout)
+        poller = self.pollers.get(chain)
+        if poller is None or poller.done():
+            self.pollers[chain] = asyncio.create_task(self._poll(chain))
+        return future
+
+    async def wait_for(self, chain: str, transaction_ids: list, timeout: float = 60.0) -> dict:
+        """Watch many transactions and wait until each is confirmed or timed out."""
+        futures = [self.watch(chain, transaction_id, timeout) for transaction_id in transaction_ids]
+        results = await asyncio.gather(*futures)
+        return dict(zip(transaction_ids, results))
+
+    async def _poll(self, chain: str):
+        chain_pending = self.pending[chain]
+        failures = 0
+        try:
+            while chain_pending:
+                try:
+                    await self._poll_once(chain, chain_pending)
+                    failures = 0
+                except Exception as e:
+                    logging.error(f"Confirmation polling on {chain} failed: {e}")
+                    failures += 1
+                if chain_pending:
+                    delay = self.poll_interval
+                    if failures:
+                        delay += backoff_delay(failures, self.poll_interval, self.transport.max_delay)
+                    await asyncio.sleep(delay)
+        finally:
+            for future, _ in chain_pending.values():
+                if not future.done():
+                    future.set_exception(Exception(f"Confirmation watcher for {chain} stopped."))
+            chain_pending.clear()
+
+    async def _poll_once(self, chain: str, chain_pending: dict):
+        """Expire overdue transactions and query the status of the rest."""
+        now = asyncio.get_running_loop().time()
+        for transaction_id, (future, deadline) in list(chain_pending.items()):
+            if future.done():
+                del chain_pending[transaction_id]
+            elif deadline <= now:
+                logging.warning(f"Transaction {transaction_id} not confirmed within timeout.")
+                future.set_result(False)
+                del chain_pending[transaction_id]
+
+        transaction_ids = list(chain_pending)
+        for start in range(0, len(transaction_ids), self.batch_size):
+            batch = transaction_ids[start:start + self.batch_size]
+            response = await self.transport.post(chain, self.status_path, {"transaction_ids": batch})
+            for transaction_id, status in response.get("statuses", {}).items():
+                entry = chain_pending.get(transaction_id)
+                if entry and status.get("confirmed") and not entry[0].done():
+                    entry[0].set_result(True)
+                    del chain_pending[transaction_id]
+
+    async def close(self):
+        """Stop polling; transactions still being watched fail."""
+        pollers = list(self.pollers.values())
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+        self.pollers.clear()
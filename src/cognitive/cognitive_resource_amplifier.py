@@ -1,7 +1,8 @@
 import asyncio
 from neuro_inspired import CognitiveBooster
 from swarm_intelligence import IntelligenceEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -14,6 +15,7 @@ class CognitiveResourceAmplifier:
         self.server = Server(horizon_url)
         self.intelligence_asset = Asset("INTELLIGENCE", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
     
@@ -38,22 +40,11 @@ class CognitiveResourceAmplifier:
     
     async def allocate_revenue(self, amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.intelligence_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.intelligence_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except Exception as e:
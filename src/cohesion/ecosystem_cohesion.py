@@ -1,7 +1,8 @@
 import asyncio
 from torch_geometric.nn import GNNConv
 from multi_agent_rl import SynergyCoordinator
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 import json
@@ -10,9 +11,9 @@ class EcosystemCohesion:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.mapper = GNNConv(in_channels=256, out_channels=128)
         self.coordinator = SynergyCoordinator()
-        self.server = Server(horizon_url)
         self.cohesion_asset = Asset("COHESION", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +37,11 @@ class EcosystemCohesion:
     
     async def issue_cohesion_token(self, contributor_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=contributor_public,
-                    asset=self.cohesion_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=contributor_public,
+                asset=self.cohesion_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Cohesion token issued: {response['id']}")
             return response['id']
         except Exception as e:
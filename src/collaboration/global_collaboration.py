@@ -1,7 +1,8 @@
 import asyncio
 from multimodal_transformer import CollaborationAnalyzer
 from affective_computing import SynergyEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 import json
@@ -10,9 +11,9 @@ class GlobalCollaboration:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret, project_wallet):
         self.analyzer = CollaborationAnalyzer()
         self.engine = SynergyEngine()
-        self.server = Server(horizon_url)
         self.unity_asset = Asset("UNITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = project_wallet
         self.logger = self.setup_logger()
         self.revenue_history = []
@@ -38,21 +39,11 @@ class GlobalCollaboration:
 
     async def allocate_revenue(self, amount):
         try:
-            tx = (
-                TransactionBuilder(
-                    source_account=await self.server.load_account(self.master_keypair.public_key),
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.unity_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.unity_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await asyncio.to_thread(self.server.submit_transaction, tx)
             self.revenue_history.append({'amount': amount, 'transaction_id': response['id']})
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
@@ -1,7 +1,8 @@
 import asyncio
 from emotion_neural import CohesionAnalyzer
 from affective_rl import EngagementEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -11,9 +12,9 @@ class CommunityCohesion:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.analyzer = CohesionAnalyzer()
         self.engine = EngagementEngine()
-        self.server = Server(horizon_url)
         self.cohesion_asset = Asset("COHESION", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
     
@@ -38,22 +39,11 @@ class CommunityCohesion:
     
     async def allocate_revenue(self, amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.cohesion_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.cohesion_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except Exception as e:
@@ -1,7 +1,11 @@
 import json
 import logging
+import math
+import os
 import sqlite3
+from collections import deque
 from datetime import datetime
+import joblib
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 import numpy as np
@@ -9,12 +13,135 @@ import numpy as np
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class StreamingAnomalyDetector:
+    """Scores transactions one at a time against a model of recent activity.
+
+    An IsolationForest is refit on a sliding window of the last
+    `window_size` values every `refit_every` transactions, so fitting cost
+    does not grow with history. The forest is not used until the window
+    holds `min_samples` values, and during warm-up it is refit each time the
+    window doubles, so early transactions are not judged by a model of a
+    handful of points. Because the model sees a single feature, its anomaly
+    score is tabulated over the window's quantiles after each fit and
+    interpolated on ingest, which costs microseconds instead of a forest
+    traversal per transaction; values outside the window's range are scored
+    by the forest directly. Independently, each user's running
+    mean and variance of log-values (Welford) flags values far outside that
+    user's own history.
+    """
+
+    def __init__(self, window_size=10000, refit_every=1000, contamination=0.1, user_z_threshold=4.0,
+                 min_user_history=10, min_samples=100, grid_size=1024, random_state=None):
+        self.window = deque(maxlen=window_size)
+        self.refit_every = refit_every
+        self.contamination = contamination
+        self.user_z_threshold = user_z_threshold
+        self.min_user_history = min_user_history
+        self.min_samples = min_samples
+        self.grid_size = grid_size
+        self.random_state = random_state
+        self.model = None
+        self.grid_values = None
+        self.grid_scores = None
+        self.since_refit = 0
+        self.fitted_size = 0  # Window length at the last fit
+        self.user_stats = {}  # user_id -> [count, mean, m2] of log1p(value)
+        self.last_transaction_id = 0
+
+    def refit(self):
+        values = np.fromiter(self.window, dtype=float).reshape(-1, 1)
+        self.model = IsolationForest(contamination=self.contamination, random_state=self.random_state).fit(values)
+        grid = np.unique(np.quantile(values, np.linspace(0, 1, self.grid_size)))
+        self.grid_values = grid
+        self.grid_scores = self.model.score_samples(grid.reshape(-1, 1))
+        self.since_refit = 0
+        self.fitted_size = len(values)
+
+    def refit_due(self):
+        size = len(self.window)
+        if size < min(self.min_samples, self.window.maxlen):
+            return False
+        if self.model is None or self.since_refit >= self.refit_every:
+            return True
+        # Warm-up: refit whenever the window has doubled since the last fit
+        return self.fitted_size < self.refit_every and size >= 2 * self.fitted_size
+
+    def score(self, value):
+        """Isolation forest score of a value (lower is more anomalous)."""
+        if self.grid_values[0] <= value <= self.grid_values[-1]:
+            return float(np.interp(value, self.grid_values, self.grid_scores))
+        return float(self.model.score_samples([[value]])[0])
+
+    def user_zscore(self, user_id, value):
+        stats = self.user_stats.get(user_id)
+        if not stats or stats[0] < self.min_user_history:
+            return 0.0
+        count, mean, m2 = stats
+        std = math.sqrt(m2 / (count - 1))
+        return (math.log1p(max(value, 0.0)) - mean) / std if std > 0 else 0.0
+
+    def _update_user(self, user_id, value):
+        stats = self.user_stats.setdefault(user_id, [0, 0.0, 0.0])
+        x = math.log1p(max(value, 0.0))
+        stats[0] += 1
+        delta = x - stats[1]
+        stats[1] += delta / stats[0]
+        stats[2] += delta * (x - stats[1])
+
+    def warm(self, rows):
+        """Seed the window and user statistics from (user_id, value) rows without scoring them."""
+        for user_id, value in rows:
+            value = float(value)
+            self._update_user(user_id, value)
+            self.window.append(value)
+        if len(self.window) >= min(self.min_samples, self.window.maxlen):
+            self.refit()
+
+    def update(self, user_id, value):
+        """Add one transaction and score it. Returns (is_anomaly, score, reason)."""
+        value = float(value)
+        z = self.user_zscore(user_id, value)
+        self._update_user(user_id, value)
+        self.window.append(value)
+        self.since_refit += 1
+        if self.refit_due():
+            self.refit()
+        if abs(z) > self.user_z_threshold:
+            return True, z, "user_deviation"
+        if self.model is not None:
+            score = self.score(value)
+            if score < self.model.offset_:
+                return True, score, "isolation_forest"
+            return False, score, None
+        return False, 0.0, None
+
+    def save(self, path):
+        # Write to a temporary file first so a crash never leaves a torn model
+        temp_path = f"{path}.tmp"
+        joblib.dump(self, temp_path)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        return joblib.load(path)
+
 class Compliance:
-    def __init__(self, db_name='compliance.db'):
+    def __init__(self, db_name='compliance.db', model_path=None, window_size=10000, refit_every=1000,
+                 save_every=100):
         # Initialize database connection
         self.conn = sqlite3.connect(db_name)
         self.create_tables()
-        self.model = IsolationForest(contamination=0.1)  # Simple ML model for anomaly detection
+        if model_path is None and db_name != ':memory:':
+            model_path = f"{os.path.splitext(db_name)[0]}.detector"  # Kept next to the database
+        self.model_path = model_path
+        self.save_every = save_every
+        self.unsaved = 0  # Rows scored since the detector was last saved
+        self.unreported = []  # Rows flagged since the last monitoring pass
+        if model_path and os.path.exists(model_path):
+            self.detector = StreamingAnomalyDetector.load(model_path)
+        else:
+            self.detector = StreamingAnomalyDetector(window_size=window_size, refit_every=refit_every)
+            self.seed_detector()
 
     def create_tables(self):
         """Create necessary tables in the database for KYC and AML."""
@@ -39,6 +166,16 @@ class Compliance:
                     FOREIGN KEY (user_id) REFERENCES users (user_id)
                 )
             ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS suspicious_transactions (
+                    transaction_id INTEGER PRIMARY KEY,
+                    user_id TEXT,
+                    value REAL,
+                    score REAL,
+                    reason TEXT,
+                    detected_at TEXT
+                )
+            ''')
             self.conn.execute('''
                 CREATE TABLE IF NOT EXISTS activity_log (
                     id INTEGER PRIMARY KEY,
@@ -68,14 +205,79 @@ class Compliance:
         logging.info(f"KYC verified for user: {user_id}")
 
     def log_transaction(self, user_id, value):
-        """Log a transaction for a user."""
+        """Log a transaction for a user and score it immediately."""
         with self.conn:
-            self.conn.execute('''
+            cursor = self.conn.execute('''
                 INSERT INTO transactions (user_id, value, timestamp)
                 VALUES (?, ?, ?)
             ''', (user_id, value, datetime.now().isoformat()))
         logging.info(f"Transaction logged for user {user_id}: {value}")
         self.log_activity(user_id, f"Transaction of {value} logged.")
+        if cursor.lastrowid > self.detector.last_transaction_id + 1:
+            self.score_new_transactions()  # Catch up on rows written by other connections first
+        else:
+            self.score_transactions([(cursor.lastrowid, user_id, value)])
+
+    def score_transactions(self, rows):
+        """Score (id, user_id, value) rows in id order and record the suspicious ones."""
+        flagged = []
+        for transaction_id, user_id, value in rows:
+            is_anomaly, score, reason = self.detector.update(user_id, value)
+            if is_anomaly:
+                flagged.append((transaction_id, user_id, value, score, reason, datetime.now().isoformat()))
+                logging.warning(f"Suspicious activity detected for user {user_id}: Transaction value = {value}")
+            self.detector.last_transaction_id = transaction_id
+        if flagged:
+            with self.conn:
+                self.conn.executemany('''
+                    INSERT OR REPLACE INTO suspicious_transactions
+                    (transaction_id, user_id, value, score, reason, detected_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', flagged)
+            self.unreported.extend(flagged)
+        self.unsaved += len(rows)
+        if self.unsaved >= self.save_every:
+            self.save_detector()
+        return flagged
+
+    def save_detector(self):
+        """Save the detector state, including the last scored id, to `model_path` if set.
+
+        User statistics and the last scored id are saved together, so after
+        a crash only the rows scored since the last save are scored again,
+        starting from the state they were first scored against.
+        """
+        if self.model_path:
+            self.detector.save(self.model_path)
+        self.unsaved = 0
+
+    def seed_detector(self):
+        """Start a new detector at the latest transaction, warmed on the last `window_size` rows.
+
+        Without saved state the existing table is not rescored; only rows
+        logged from now on are scored, against a model of recent history.
+        """
+        last_id = self.conn.execute('SELECT MAX(id) FROM transactions').fetchone()[0]
+        if last_id is None:
+            return
+        rows = self.conn.execute('SELECT user_id, value FROM transactions ORDER BY id DESC LIMIT ?',
+                                 (self.detector.window.maxlen,)).fetchall()
+        self.detector.warm(reversed(rows))
+        self.detector.last_transaction_id = last_id
+        self.save_detector()
+        logging.info(f"Detector seeded at transaction {last_id} from the last {len(rows)} rows")
+
+    def score_new_transactions(self, batch_size=10000):
+        """Score transactions not seen yet, reading them in batches of `batch_size`."""
+        scored = 0
+        while True:
+            rows = self.conn.execute(
+                'SELECT id, user_id, value FROM transactions WHERE id > ? ORDER BY id LIMIT ?',
+                (self.detector.last_transaction_id, batch_size)).fetchall()
+            if not rows:
+                return scored
+            self.score_transactions(rows)
+            scored += len(rows)
 
     def log_activity(self, user_id, action):
         """Log user activity."""
@@ -86,20 +288,17 @@ class Compliance:
             ''', (user_id, action, datetime.now().isoformat()))
 
     def monitor_transactions(self):
-        """Monitor transactions for suspicious activity using ML."""
-        suspicious_transactions = []
-        with self.conn:
-            cursor = self.conn.execute('SELECT user_id, value FROM transactions')
-            data = np.array(cursor.fetchall())
-            if data.size > 0:
-                # Fit the model on transaction values
-                self.model.fit(data[:, 1].reshape(-1, 1))
-                predictions = self.model.predict(data[:, 1].reshape(-1, 1))
-                for i, prediction in enumerate(predictions):
-                    if prediction == -1:  # Anomaly detected
-                        suspicious_transactions.append(data[i][0])
-                        logging.warning(f"Suspicious activity detected for user {data[i][0]}: Transaction value = {data[i][1]}")
-        return suspicious_transactions
+        """Score any unscored transactions and return the users of those flagged since the last pass.
+
+        Only transactions newer than the last scored one are read, and the
+        detector state is saved to `model_path` so a restart resumes there.
+        Rows flagged on ingest by log_transaction are reported by the next
+        pass; every flagged row stays in the suspicious_transactions table.
+        """
+        self.score_new_transactions()
+        self.save_detector()
+        flagged, self.unreported = self.unreported, []
+        return [row[1] for row in flagged]
 
     def generate_regulatory_report(self):
         """Generate a regulatory report for compliance."""
@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TOPIC_TYPES = (str, int, float, bool, type(None))
+
+class ContractEvent:
+    """One event emitted by a contract, ordered by (block_height, sequence)."""
+
+    def __init__(self, sequence: int, contract: str, name: str, args: Dict[str, Any],
+                 indexed: Sequence[str], block_height: int, timestamp: float):
+        self.sequence = sequence
+        self.contract = contract
+        self.name = name
+        self.args = args
+        self.indexed = tuple(indexed)
+        self.block_height = block_height
+        self.timestamp = timestamp
+
+    @property
+    def topics(self) -> Dict[str, Any]:
+        """The indexed arguments, which queries can filter on."""
+        return {arg: self.args[arg] for arg in self.indexed}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sequence": self.sequence,
+            "contract": self.contract,
+            "name": self.name,
+            "args": self.args,
+            "indexed": list(self.indexed),
+            "block_height": self.block_height,
+            "timestamp": self.timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ContractEvent":
+        return cls(data["sequence"], data["contract"], data["name"], data["args"], data["indexed"],
+                   data["block_height"], data["timestamp"])
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, ContractEvent) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{key}={value!r}" for key, value in self.args.items())
+        return f"{self.contract}.{self.name}({args}) @ {self.block_height}"
+
+def _topic_key(value: Any) -> str:
+    # Values that compare equal share a posting list: 1, 1.0 and True all index as 1
+    if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+        value = int(value)
+    return json.dumps(value)
+
+class EventStore:
+    """Append-only store of contract events with indexes by contract, event name and topic.
+
+    Every event gets a global sequence number. The indexes are posting lists
+    of sequence numbers, so a query bisects to its height range in the
+    shortest matching list and only fetches the events it returns. The most
+    recent `tail_size` events are kept in memory; with a `directory`, every
+    event is also appended to NDJSON segments of `segment_size` events, which
+    serve older events and are re-indexed on open. Without a directory only
+    the tail is kept and older events are forgotten. Read handles for up to
+    `max_open_segments` segments stay open between reads.
+
+    Event types registered with define() have their argument types checked
+    and their indexed arguments fixed; other events index the arguments
+    passed as `indexed`. Indexed values must be JSON scalars.
+    """
+
+    def __init__(self, directory: Optional[str] = None, tail_size: int = 10000, segment_size: int = 10000,
+                 max_open_segments: int = 16):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_open_segments = max_open_segments
+        self.tail: deque = deque(maxlen=tail_size)
+        self.event_types: Dict[Tuple[str, str], Tuple[Dict[str, type], Tuple[str, ...]]] = {}
+        self.block_height = 0
+        self.next_sequence = 0
+        self.by_contract: Dict[str, List[int]] = {}
+        self.by_name: Dict[Tuple[str, str], List[int]] = {}
+        self.by_topic: Dict[Tuple[str, str, str, str], List[int]] = {}
+        self.block_starts: List[Tuple[int, int]] = []  # (height, first sequence at that height)
+        self.offsets: List[int] = []  # Byte offset of each event within its segment
+        self._segment = None
+        self._readers: "OrderedDict[int, Any]" = OrderedDict()  # Segment number -> open read handle
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load_segments()
+
+    def define(self, contract: str, name: str, fields: Dict[str, type], indexed: Sequence[str] = ()) -> None:
+        """Declare an event type: its argument types and which arguments are topics."""
+        for arg in indexed:
+            if arg not in fields:
+                raise ValueError(f"Indexed argument '{arg}' is not a field of {contract}.{name}")
+        self.event_types[(contract, name)] = (dict(fields), tuple(indexed))
+
+    def set_block_height(self, height: int) -> None:
+        """Stamp subsequent events with this block height."""
+        if height < self.block_height:
+            raise ValueError(f"Block height cannot go backwards ({height} < {self.block_height})")
+        self.block_height = height
+
+    def validate(self, contract: str, name: str, args: Dict[str, Any],
+                 indexed: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Check an event against its declared type; returns the arguments to index."""
+        event_type = self.event_types.get((contract, name))
+        if event_type:
+            fields, indexed = event_type
+            if set(args) != set(fields):
+                raise ValueError(f"{contract}.{name} expects arguments {sorted(fields)}, got {sorted(args)}")
+            for arg, expected in fields.items():
+                if not isinstance(args[arg], expected):
+                    raise TypeError(f"{contract}.{name} argument '{arg}' must be {expected.__name__}")
+        for arg in indexed:
+            if not isinstance(args.get(arg), TOPIC_TYPES):
+                raise TypeError(f"Indexed argument '{arg}' of {contract}.{name} must be a JSON scalar")
+        return tuple(indexed)
+
+    def emit(self, contract: str, name: str, args: Optional[Dict[str, Any]] = None,
+             indexed: Sequence[str] = (), timestamp: Optional[float] = None) -> ContractEvent:
+        """Validate, store and index one event at the current block height."""
+        args = dict(args or {})
+        indexed = self.validate(contract, name, args, indexed)
+        event = ContractEvent(self.next_sequence, contract, name, args, indexed, self.block_height,
+                              time.time() if timestamp is None else timestamp)
+        if self.directory:
+            self._write(event)
+        self._index(event)
+        self.tail.append(event)
+        self.next_sequence += 1
+        if not self.directory and self.tail.maxlen and self.next_sequence % self.tail.maxlen == 0:
+            self._prune()
+        return event
+
+    def _prune(self) -> None:
+        """Drop index entries for events that have left a memory-only tail."""
+        first = self.first_available
+        for index in (self.by_contract, self.by_name, self.by_topic):
+            for key in list(index):
+                postings = index[key]
+                del postings[:bisect_left(postings, first)]
+                if not postings:
+                    del index[key]
+        stale = 0
+        while stale + 1 < len(self.block_starts) and self.block_starts[stale + 1][1] <= first:
+            stale += 1
+        del self.block_starts[:stale]
+
+    def _index(self, event: ContractEvent) -> None:
+        sequence = event.sequence
+        if not self.block_starts or self.block_starts[-1][0] != event.block_height:
+            self.block_starts.append((event.block_height, sequence))
+        self.by_contract.setdefault(event.contract, []).append(sequence)
+        self.by_name.setdefault((event.contract, event.name), []).append(sequence)
+        for arg, value in event.topics.items():
+            self.by_topic.setdefault((event.contract, event.name, arg, _topic_key(value)), []).append(sequence)
+
+    def segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"events-{number:08d}.ndjson")
+
+    def _write(self, event: ContractEvent) -> None:
+        if event.sequence % self.segment_size == 0 and self._segment:
+            self._segment.close()
+            self._segment = None
+        if self._segment is None:
+            self._segment = open(self.segment_path(event.sequence // self.segment_size), "ab")
+        self.offsets.append(self._segment.tell())
+        self._segment.write(json.dumps(event.to_dict()).encode() + b"\n")
+
+    def _load_segments(self) -> None:
+        number = 0
+        while os.path.exists(self.segment_path(number)):
+            path = self.segment_path(number)
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        logging.warning(f"Ignoring truncated event at offset {offset} in {path}")
+                        break
+                    event = ContractEvent.from_dict(json.loads(line))
+                    self.offsets.append(offset)
+                    self._index(event)
+                    self.tail.append(event)
+                    self.block_height = max(self.block_height, event.block_height)
+                    offset += len(line)
+            if offset != os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+            number += 1
+        self.next_sequence = len(self.offsets)
+
+    def flush(self) -> None:
+        if self._segment:
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+
+    def close(self) -> None:
+        if self._segment:
+            self._segment.close()
+            self._segment = None
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def _reader(self, number: int):
+        """Read handle for a segment, reusing the most recently used ones."""
+        reader = self._readers.get(number)
+        if reader is None:
+            reader = self._readers[number] = open(self.segment_path(number), "rb")
+            while len(self._readers) > self.max_open_segments:
+                self._readers.popitem(last=False)[1].close()
+        else:
+            self._readers.move_to_end(number)
+        return reader
+
+    @property
+    def first_available(self) -> int:
+        """Lowest sequence number that can still be read."""
+        if self.directory:
+            return 0
+        return self.tail[0].sequence if self.tail else self.next_sequence
+
+    def get(self, sequence: int) -> ContractEvent:
+        if self.tail and sequence >= self.tail[0].sequence:
+            return self.tail[sequence - self.tail[0].sequence]
+        if not self.directory or sequence < 0:
+            raise KeyError(sequence)
+        if self._segment:
+            self._segment.flush()
+        reader = self._reader(sequence // self.segment_size)
+        reader.seek(self.offsets[sequence])
+        return ContractEvent.from_dict(json.loads(reader.readline()))
+
+    def _sequence_range(self, from_height: Optional[int], to_height: Optional[int]) -> Tuple[int, int]:
+        start, end = self.first_available, self.next_sequence
+        if from_height is not None:
+            index = bisect_left(self.block_starts, (from_height, -1))
+            start = max(start, self.block_starts[index][1] if index < len(self.block_starts) else end)
+        if to_height is not None:
+            index = bisect_right(self.block_starts, (to_height, float("inf")))
+            end = min(end, self.block_starts[index][1] if index < len(self.block_starts) else end)
+        return start, end
+
+    def query(self, contract: Optional[str] = None, name: Optional[str] = None,
+              topics: Optional[Dict[str, Any]] = None, from_height: Optional[int] = None,
+              to_height: Optional[int] = None, limit: Optional[int] = None,
+              reverse: bool = False) -> List[ContractEvent]:
+        """Events matching every given filter, in emission order (newest first if `reverse`).
+
+        Heights are inclusive. Topic filters need both `contract` and `name`.
+        """
+        return list(self.iter_query(contract, name, topics, from_height, to_height, limit, reverse))
+
+    def iter_query(self, contract: Optional[str] = None, name: Optional[str] = None,
+                   topics: Optional[Dict[str, Any]] = None, from_height: Optional[int] = None,
+                   to_height: Optional[int] = None, limit: Optional[int] = None,
+                   reverse: bool = False) -> Iterator[ContractEvent]:
+        if topics and (contract is None or name is None):
+            raise ValueError("Topic filters need both a contract and an event name")
+        if name is not None and contract is None:
+            candidates = [self.by_name.get(key, []) for key in self.by_name if key[1] == name]
+            postings = sorted(sequence for posting in candidates for sequence in posting)
+        else:
+            lists = []
+            if contract is not None:
+                lists.append(self.by_contract.get(contract, []))
+            if name is not None:
+                lists.append(self.by_name.get((contract, name), []))
+            for arg, value in (topics or {}).items():
+                lists.append(self.by_topic.get((contract, name, arg, _topic_key(value)), []))
+            postings = min(lists, key=len) if lists else None
+        start, end = self._sequence_range(from_height, to_height)
+        if postings is None:
+            sequences = range(start, end)
+        else:
+            sequences = postings[bisect_left(postings, start):bisect_left(postings, end)]
+        if reverse:
+            sequences = reversed(sequences)
+        returned = 0
+        for sequence in sequences:
+            if limit is not None and returned >= limit:
+                return
+            event = self.get(sequence)
+            if contract is not None and event.contract != contract:
+                continue
+            if name is not None and event.name != name:
+                continue
+            if topics and any(event.args.get(arg) != value for arg, value in topics.items()):
+                continue
+            returned += 1
+            yield event
+
+    def __len__(self) -> int:
+        return self.next_sequence - self.first_available
@@ -0,0 +1,184 @@
+import os
+import sys
+import sysconfig
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_GAS_LIMIT = 1_000_000
+
+# Standard library and installed packages; entering their functions is not charged as a call
+LIBRARY_DIRS = tuple(
+    os.path.join(os.path.abspath(path), "")
+    for path in {sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+# Cost of each metered operation; "step" is one executed line of contract code
+GAS_COSTS = {
+    "call": 700,
+    "step": 1,
+    "read": 200,
+    "write": 5000,
+    "delete": 5000,
+    "event": 375,
+}
+
+class OutOfGas(RuntimeError):
+    """Raised to the caller when a call uses more gas than its limit; its writes are rolled back."""
+
+    def __init__(self, gas_limit: int, gas_used: int, operation: str):
+        super().__init__(f"Out of gas: {operation} needed more than the {gas_limit} gas limit")
+        self.gas_limit = gas_limit
+        self.gas_used = gas_used
+        self.operation = operation
+
+class GasExhausted(BaseException):
+    """Unwinds a call that ran out of gas.
+
+    Derives from BaseException so contract code cannot swallow it with
+    `except Exception`; the top-level call turns it into OutOfGas.
+    """
+
+    def __init__(self, gas_limit: int, gas_used: int, operation: str):
+        super().__init__(gas_limit, gas_used, operation)
+        self.gas_limit = gas_limit
+        self.gas_used = gas_used
+        self.operation = operation
+
+class GasMeter:
+    """Counts the gas one top-level call uses and aborts it once the limit is reached.
+
+    State reads, writes and events are charged by the contract as they
+    happen. While the meter is running, a trace function also charges every
+    line executed and every call into contract code, so a call that loops
+    without touching state still runs out. Resuming a generator or
+    coroutine is not a new call, and neither is entering the standard
+    library or an installed package, although their lines are still
+    charged. Work done inside a single C call (e.g. `sum(range(10**12))`)
+    is not visible to the tracer.
+
+    Tracing is expensive: a tight loop runs roughly 20x slower under the
+    meter. It also takes over sys.settrace for the duration of the call,
+    so a debugger or coverage tracer sees nothing of the contract code; the
+    previous trace function is restored when the meter stops.
+
+    Once the limit is passed the meter stays exhausted: every later charge
+    raises again, and check() lets the caller verify the total after the
+    call returns. This matters because contract code that catches
+    BaseException can swallow GasExhausted, and CPython removes a trace
+    function that raises; charges re-install the tracer when that happened.
+    """
+
+    def __init__(self, gas_limit: int = DEFAULT_GAS_LIMIT, costs: Optional[Dict[str, int]] = None,
+                 exempt_files: Iterable[str] = ()):
+        self.gas_limit = gas_limit
+        self.costs = costs or GAS_COSTS
+        # Modules whose work is charged per operation rather than per line
+        self.exempt_files = {os.path.abspath(path) for path in exempt_files} | {os.path.abspath(__file__)}
+        self._exempt_code: Dict[Any, bool] = {}
+        self._library_code: Dict[Any, bool] = {}
+        self.gas_used = 0
+        self.exhausted = False
+        self.operations: Counter = Counter()
+        self._previous_trace = None
+        self._active = False
+        self._entry_frame = None
+
+    @property
+    def remaining(self) -> int:
+        return self.gas_limit - self.gas_used
+
+    def charge(self, operation: str, units: int = 1) -> None:
+        if self._active and sys.gettrace() is not self._trace:
+            self._rearm()
+        self._charge(operation, units)
+
+    def _charge(self, operation: str, units: int = 1) -> None:
+        self.operations[operation] += units
+        self.gas_used += self.costs[operation] * units
+        if self.exhausted or self.gas_used > self.gas_limit:
+            self.exhausted = True
+            raise GasExhausted(self.gas_limit, self.gas_used, operation)
+
+    def check(self) -> None:
+        """Raise GasExhausted if the limit was passed at any point, even if that was swallowed."""
+        if self.exhausted or self.gas_used > self.gas_limit:
+            self.exhausted = True
+            raise GasExhausted(self.gas_limit, self.gas_used, "check")
+
+    def _rearm(self) -> None:
+        # A swallowed GasExhausted left tracing off; restore it for new frames and the running ones
+        sys.settrace(self._trace)
+        frame = sys._getframe(2)
+        while frame is not None and frame is not self._entry_frame:
+            if not self._is_exempt(frame.f_code):
+                frame.f_trace = self._trace_lines
+            frame = frame.f_back
+
+    def _is_exempt(self, code) -> bool:
+        exempt = self._exempt_code.get(code)
+        if exempt is None:
+            exempt = self._exempt_code[code] = os.path.abspath(code.co_filename) in self.exempt_files
+        return exempt
+
+    def _is_library(self, code) -> bool:
+        library = self._library_code.get(code)
+        if library is None:
+            library = self._library_code[code] = os.path.abspath(code.co_filename).startswith(LIBRARY_DIRS)
+        return library
+
+    def _trace(self, frame, event: str, arg: Any):
+        if event != "call":
+            return None
+        if self._is_exempt(frame.f_code):
+            return None
+        # A resumed generator or coroutine already has its line tracer; f_lasti
+        # cannot tell a resume apart, as fresh frames start past a prefix on 3.11+
+        if frame.f_trace is not None:
+            return frame.f_trace
+        if not self._is_library(frame.f_code):
+            self._charge("call")
+        return self._trace_lines
+
+    def _trace_lines(self, frame, event: str, arg: Any):
+        if event == "line":
+            self._charge("step")
+        return self._trace_lines
+
+    def __enter__(self) -> "GasMeter":
+        self._previous_trace = sys.gettrace()
+        self._entry_frame = sys._getframe(1)
+        self._active = True
+        sys.settrace(self._trace)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._active = False
+        self._entry_frame = None
+        sys.settrace(self._previous_trace)
+
+class GasProfile:
+    """Gas statistics for one contract function across calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.out_of_gas = 0
+        self.total_gas = 0
+        self.max_gas = 0
+        self.operations: Counter = Counter()
+
+    def record(self, meter: GasMeter, ran_out: bool) -> None:
+        self.calls += 1
+        self.out_of_gas += int(ran_out)
+        self.total_gas += meter.gas_used
+        self.max_gas = max(self.max_gas, meter.gas_used)
+        self.operations.update(meter.operations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "out_of_gas": self.out_of_gas,
+            "total_gas": self.total_gas,
+            "average_gas": self.total_gas / self.calls if self.calls else 0,
+            "max_gas": self.max_gas,
+            "operations": dict(self.operations)
+        }
@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Sequence, Set, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_MISSING = object()
+
+class ContractState(MutableMapping):
+    """Key-value contract state with a per-call write journal and dirty-key tracking.
+
+    Every write inside begin()/commit() records the key's previous value, so
+    revert() can undo a failed call's partial writes. Frames nest: committing
+    an inner frame folds its undo entries into the enclosing one. Keys written
+    since the last take_dirty() are tracked so persistence writes only them.
+    Values are expected to be replaced rather than mutated in place; in-place
+    changes to a nested dict or list are neither journaled nor marked dirty.
+    While a `meter` is attached, every read, write and delete is charged to it.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        self.data: Dict[str, Any] = dict(data or {})
+        self.dirty: Set[str] = set()
+        self.meter = None
+        self._frames: List[List[Tuple[str, Any, bool]]] = []  # (key, previous value, was dirty)
+
+    def __getitem__(self, key: str) -> Any:
+        if self.meter:
+            self.meter.charge("read")
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self.meter:
+            self.meter.charge("write")
+        self._record(key)
+        self.data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if self.meter:
+            self.meter.charge("delete")
+        if key not in self.data:
+            raise KeyError(key)
+        self._record(key)
+        del self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"ContractState({self.data!r})"
+
+    def _record(self, key: str) -> None:
+        if self._frames:
+            self._frames[-1].append((key, self.data.get(key, _MISSING), key in self.dirty))
+        self.dirty.add(key)
+
+    @property
+    def in_transaction(self) -> bool:
+        return bool(self._frames)
+
+    @property
+    def depth(self) -> int:
+        """Number of open journal frames."""
+        return len(self._frames)
+
+    def begin(self) -> None:
+        """Open a journal frame for one call."""
+        self._frames.append([])
+
+    def commit(self) -> None:
+        """Keep the current frame's writes; an enclosing frame can still revert them."""
+        frame = self._frames.pop()
+        if self._frames:
+            self._frames[-1].extend(frame)
+
+    def revert(self) -> None:
+        """Undo every write made since the matching begin()."""
+        frame = self._frames.pop()
+        for key, previous, was_dirty in reversed(frame):
+            if previous is _MISSING:
+                self.data.pop(key, None)
+            else:
+                self.data[key] = previous
+            if not was_dirty:
+                self.dirty.discard(key)
+
+    def revert_to(self, depth: int) -> None:
+        """Revert open frames until only `depth` remain, e.g. after an abort skipped inner reverts."""
+        while len(self._frames) > depth:
+            self.revert()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block as one call: commit if it returns, revert if it raises."""
+        self.begin()
+        try:
+            yield self
+        except BaseException:
+            self.revert()
+            raise
+        self.commit()
+
+    def take_dirty(self) -> Tuple[Dict[str, Any], List[str]]:
+        """Return (keys set, keys deleted) since the last call and clear the dirty set."""
+        if self._frames:
+            raise RuntimeError("Cannot persist contract state while a call is in progress")
+        updates = {key: self.data[key] for key in self.dirty if key in self.data}
+        deletes = sorted(key for key in self.dirty if key not in self.data)
+        self.dirty.clear()
+        return updates, deletes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.data)
+
+class StateStore:
+    """Persists contract state as a snapshot plus an append-only journal of changes.
+
+    `<name>.json` is a full snapshot of the contract document (the format
+    SmartContractManager has always written, plus a sequence number) and
+    `<name>.journal` holds one JSON line per save with only the keys that
+    changed and the events emitted since. Once the journal holds
+    `snapshot_interval` entries the next save writes a new snapshot instead,
+    so a restart reads one snapshot and replays a bounded number of lines.
+    """
+
+    def __init__(self, directory: str = ".", snapshot_interval: int = 100):
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self._positions: Dict[str, Dict[str, int]] = {}  # name -> sequence, journal entries, events written
+
+    def snapshot_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def journal_path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.journal")
+
+    def save(self, name: str, state: ContractState, header: Dict[str, Any], events: Sequence[Any] = ()) -> None:
+        """Append the dirty keys to the journal, or write a snapshot when one is due.
+
+        `header` holds the document fields that only change in snapshots
+        (contract name, owner); `events` is an optional full log of records
+        to persist alongside the state, of which only new ones are journaled.
+        """
+        position = self._positions.get(name)
+        updates, deletes = state.take_dirty()
+        if position is None or position["journal_entries"] >= self.snapshot_interval:
+            self.write_snapshot(name, state, header, events, position["sequence"] + 1 if position else 1)
+            return
+        if not updates and not deletes and len(events) == position["events"]:
+            return
+        position["sequence"] += 1
+        entry = {"sequence": position["sequence"], "set": updates, "delete": deletes,
+                 "events": list(events[position["events"]:])}
+        with open(self.journal_path(name), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        position["journal_entries"] += 1
+        position["events"] = len(events)
+
+    def write_snapshot(self, name: str, state: ContractState, header: Dict[str, Any],
+                       events: Sequence[Any], sequence: int) -> None:
+        document = dict(header, state=state.to_dict(), events=list(events), sequence=sequence)
+        path = self.snapshot_path(name)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(document, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        # Journal entries are all covered by the snapshot now
+        if os.path.exists(self.journal_path(name)):
+            os.remove(self.journal_path(name))
+        state.dirty.clear()
+        self._positions[name] = {"sequence": sequence, "journal_entries": 0, "events": len(events)}
+
+    def load(self, name: str) -> Tuple[Dict[str, Any], ContractState, List[Any]]:
+        """Read the snapshot and replay newer journal entries. Returns (header, state, events)."""
+        with open(self.snapshot_path(name), "r") as f:
+            document = json.load(f)
+        data = document.pop("state")
+        events = document.pop("events", [])
+        sequence = document.pop("sequence", 0)
+        journal_entries = 0
+        journal_path = self.journal_path(name)
+        if os.path.exists(journal_path):
+            offset = 0
+            with open(journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Ignoring truncated journal entry at offset {offset} in {journal_path}")
+                        break
+                    offset += len(line)
+                    if entry["sequence"] <= sequence:
+                        continue  # Written before the snapshot that replaced the journal
+                    data.update(entry["set"])
+                    for key in entry["delete"]:
+                        data.pop(key, None)
+                    events.extend(entry["events"])
+                    sequence = entry["sequence"]
+                    journal_entries += 1
+            if offset != os.path.getsize(journal_path):
+                with open(journal_path, "r+b") as f:
+                    f.truncate(offset)
+        self._positions[name] = {"sequence": sequence, "journal_entries": journal_entries, "events": len(events)}
+        return document, ContractState(data), events
@@ -1,17 +1,232 @@
+import asyncio
+import glob
+import itertools
 import json
 import logging
+import os
+import warnings
+from collections import deque
 from uuid import uuid4
+import aiohttp
 import requests
 from datetime import datetime
+from utils import TTLCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class NFTEventLog:
+    """Append-only JSONL event log split into fixed-size segment files.
+
+    Events are only ever appended, so a save costs O(new events) instead of
+    rewriting the whole history. The NFT records and the owner-to-NFT index
+    are rebuilt from the segments when the log is opened; a torn last line
+    left by a crash is truncated. Without a directory, only the last
+    `max_events` events are kept in memory; the NFT records and owner index
+    still reflect every event, so memory grows with the number of NFTs
+    rather than with history.
+    """
+
+    def __init__(self, directory=None, segment_size=100000, max_events=100000):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.nfts = {}  # NFT ID -> owner, metadata, blockchain and royalty
+        self.owner_index = {}  # owner -> set of NFT IDs
+        self.segment_number = 0
+        self.segment_count = 0
+        self.event_count = 0
+        # Ring buffer of recent events when there is no directory
+        self.events = None if directory else deque(maxlen=max_events)
+        self._file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._replay()
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"segment-{number:06d}.jsonl")
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.jsonl")))
+
+    def _replay(self):
+        """Rebuild the NFT records, owner index and segment position from disk."""
+        for path in self._segments():
+            self.segment_number = int(os.path.basename(path)[8:14])
+            self.segment_count = 0
+            offset = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        event = None
+                    if event is None and line.strip():
+                        logging.warning(f"Ignoring truncated event at offset {offset} in {path}")
+                        break
+                    offset += len(line)
+                    if event is not None:
+                        self._index(event)
+                        self.segment_count += 1
+                        self.event_count += 1
+            if offset != os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(offset)
+
+    def _index(self, event):
+        nft_id = event.get("nft_id")
+        if event.get("event") == "mint":
+            self.nfts[nft_id] = {
+                "nft_id": nft_id,
+                "owner": event["owner"],
+                "metadata": event.get("metadata", {}),
+                "blockchain": event.get("blockchain")
+            }
+            self.owner_index.setdefault(event["owner"], set()).add(nft_id)
+        elif event.get("event") == "transfer":
+            if nft_id in self.nfts:
+                self.nfts[nft_id]["owner"] = event["new_owner"]
+            self.owner_index.get(event["old_owner"], set()).discard(nft_id)
+            self.owner_index.setdefault(event["new_owner"], set()).add(nft_id)
+        elif event.get("event") == "royalty" and nft_id in self.nfts:
+            self.nfts[nft_id]["royalty"] = event["royalty"]
+
+    def _open_segment(self):
+        if self.segment_count >= self.segment_size:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.segment_number += 1
+            self.segment_count = 0
+        if self._file is None:
+            self._file = open(self._segment_path(self.segment_number), 'a')
+        return self._file
+
+    def append(self, event):
+        """Append a single event."""
+        self.append_many([event])
+
+    def append_many(self, events):
+        """Append a batch of events with one write per touched segment."""
+        if self.events is not None:
+            self.events.extend(events)
+            for event in events:
+                self._index(event)
+            self.event_count += len(events)
+            return
+        index = 0
+        while index < len(events):
+            f = self._open_segment()
+            chunk = events[index:index + self.segment_size - self.segment_count]
+            f.write("".join(json.dumps(event) + "\n" for event in chunk))
+            for event in chunk:
+                self._index(event)
+            self.segment_count += len(chunk)
+            self.event_count += len(chunk)
+            index += len(chunk)
+
+    def flush(self):
+        """Flush buffered events to disk."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def read(self, offset=0, limit=None):
+        """Yield events in append order, starting at an offset.
+
+        Without a directory, events older than the in-memory buffer are gone
+        and reading resumes at the oldest one still held.
+        """
+        if self.events is not None:
+            start = max(offset - (self.event_count - len(self.events)), 0)
+            yield from itertools.islice(self.events, start, None if limit is None else start + limit)
+            return
+        position = 0
+        for path in self._segments():
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    if position >= offset:
+                        if limit is not None and position >= offset + limit:
+                            return
+                        yield json.loads(line)
+                    position += 1
+
+    def nfts_for_owner(self, owner):
+        """Return the NFT IDs currently held by an owner."""
+        return set(self.owner_index.get(owner, set()))
+
+    def close(self):
+        """Flush and close the active segment."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self.event_count
+
+class NFTChainClient:
+    """Asyncio client for remote chain NFT lookups with pooled connections and a TTL cache."""
+
+    def __init__(self, max_connections=100, max_per_host=20, cache_ttl=60, timeout=10):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.cache = TTLCache(ttl=cache_ttl)
+        self.session = None
+
+    async def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_per_host)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def fetch_nft(self, api_url, nft_id):
+        """Fetch NFT data, serving repeated lookups from the cache."""
+        cache_key = (api_url, nft_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        session = await self._get_session()
+        try:
+            async with session.get(f"{api_url}/nft/{nft_id}") as response:
+                if response.status != 200:
+                    logging.error(f"Failed to fetch NFT {nft_id} from blockchain: HTTP {response.status}")
+                    return None
+                data = await response.json()
+        except aiohttp.ClientError as e:
+            logging.error(f"Failed to fetch NFT {nft_id} from blockchain: {e}")
+            return None
+        self.cache.set(cache_key, data)
+        return data
+
+    async def fetch_many(self, api_url, nft_ids, concurrency=50):
+        """Fetch many NFTs concurrently, returning a dict keyed by NFT ID."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(nft_id):
+            async with semaphore:
+                return await self.fetch_nft(api_url, nft_id)
+
+        results = await asyncio.gather(*(fetch(nft_id) for nft_id in nft_ids))
+        return dict(zip(nft_ids, results))
+
+    async def close(self):
+        """Close the pooled session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
 class CrossChainNFT:
-    def __init__(self):
-        self.nfts = {}  # Store NFT data
+    def __init__(self, event_log_dir=None, segment_size=100000, cache_ttl=60, max_events=100000):
         self.blockchains = {}  # Store blockchain configurations
-        self.event_log = []  # Log of events
+        # Log of events; without a directory only the last max_events are kept in memory
+        self.event_log = NFTEventLog(event_log_dir, segment_size, max_events)
+        self.nfts = self.event_log.nfts  # NFT data, rebuilt from the event log
+        self.http = requests.Session()  # Pooled connections for blocking lookups
+        self.metadata_cache = TTLCache(ttl=cache_ttl)
+        self.chain_client = NFTChainClient(cache_ttl=cache_ttl)
 
     def register_blockchain(self, blockchain_name, api_url):
         """Register a new blockchain for NFT operations."""
@@ -27,43 +242,12 @@ class CrossChainNFT:
 
     def mint_nft(self, blockchain_name, owner, metadata):
         """Mint a new NFT on the specified blockchain."""
-        if blockchain_name not in self.blockchains:
-            logging.error("Blockchain not registered.")
-            return False
-        nft_id = str(uuid4())
-        nft_data = {
-            "nft_id": nft_id,
-            "owner": owner,
-            "metadata": metadata,
-            "blockchain": blockchain_name
-        }
-        self.nfts[nft_id] = nft_data
-        self.event_log.append({
-            "event": "mint",
-            "nft_id": nft_id,
-            "owner": owner,
-            "timestamp": datetime.now().isoformat()
-        })
-        logging.info(f"NFT minted: {nft_data}")
-        return nft_id
+        nft_ids = self.batch_mint_nfts(blockchain_name, owner, [metadata])
+        return nft_ids[0] if nft_ids else False
 
     def transfer_nft(self, nft_id, new_owner):
         """Transfer an NFT to a new owner across blockchains."""
-        if nft_id not in self.nfts:
-            logging.error("NFT does not exist.")
-            return False
-        nft_data = self.nfts[nft_id]
-        old_owner = nft_data["owner"]
-        nft_data["owner"] = new_owner
-        self.event_log.append({
-            "event": "transfer",
-            "nft_id": nft_id,
-            "old_owner": old_owner,
-            "new_owner": new_owner,
-            "timestamp": datetime.now().isoformat()
-        })
-        logging.info(f"NFT transferred: {nft_id} from {old_owner} to {new_owner}")
-        return True
+        return self.batch_transfer_nfts([nft_id], new_owner)
 
     def get_nft_metadata(self, nft_id):
         """Retrieve metadata for a specific NFT."""
@@ -82,45 +266,113 @@ class CrossChainNFT:
         self.event_log.append(event_record)
         logging.info(f"Event logged: {event_record}")
 
-    def save_event_log(self, filename='event_log.json'):
-        """Save the event log to a JSON file."""
-        with open(filename, 'w') as f:
-            json.dump(self.event_log, f, indent=4)
-        logging.info(f"Event log saved to {filename}")
+    def save_event_log(self, filename=None):
+        """Flush appended events to the on-disk event log.
+
+        `filename` is deprecated: it still writes the events the log holds
+        to a JSON file, but the event log directory should be used instead.
+        """
+        self.event_log.flush()
+        if self.event_log.directory:
+            logging.info(f"Event log flushed to {self.event_log.directory}")
+        if filename is not None:
+            warnings.warn("save_event_log(filename=...) is deprecated; pass event_log_dir to CrossChainNFT instead",
+                          DeprecationWarning, stacklevel=2)
+            with open(filename, 'w') as f:
+                json.dump(list(self.event_log.read()), f, indent=4)
+            logging.info(f"Event log saved to {filename}")
+
+    def get_nfts_by_owner(self, owner):
+        """Return the IDs of NFTs currently held by an owner."""
+        return self.event_log.nfts_for_owner(owner)
 
     def fetch_nft_data_from_blockchain(self, blockchain_name, nft_id):
         """Fetch NFT data from the specified blockchain."""
         if blockchain_name not in self.blockchains:
             logging.error("Blockchain not registered.")
             return None
+        cache_key = (blockchain_name, nft_id)
+        cached = self.metadata_cache.get(cache_key)
+        if cached is not None:
+            return cached
         api_url = self.blockchains[blockchain_name]["api_url"]
-        response = requests.get(f"{api_url}/nft/{nft_id}")
+        response = self.http.get(f"{api_url}/nft/{nft_id}")
         if response.status_code == 200:
-            return response.json()
+            data = response.json()
+            self.metadata_cache.set(cache_key, data)
+            return data
         else:
             logging.error("Failed to fetch NFT data from blockchain.")
             return None
 
+    async def fetch_many_nft_data(self, blockchain_name, nft_ids, concurrency=50):
+        """Fetch NFT data for many NFTs concurrently over pooled connections."""
+        if blockchain_name not in self.blockchains:
+            logging.error("Blockchain not registered.")
+            return {}
+        api_url = self.blockchains[blockchain_name]["api_url"]
+        return await self.chain_client.fetch_many(api_url, nft_ids, concurrency)
+
     def batch_mint_nfts(self, blockchain_name, owner, metadata_list):
         """Mint multiple NFTs in a single transaction."""
+        if blockchain_name not in self.blockchains:
+            logging.error("Blockchain not registered.")
+            return []
+        timestamp = datetime.now().isoformat()
         nft_ids = []
+        events = []
         for metadata in metadata_list:
-            nft_id = self.mint_nft(blockchain_name, owner, metadata)
-            if nft_id:
-                nft_ids.append(nft_id)
+            nft_id = str(uuid4())
+            nft_ids.append(nft_id)
+            events.append({
+                "event": "mint",
+                "nft_id": nft_id,
+                "owner": owner,
+                "metadata": metadata,
+                "blockchain": blockchain_name,
+                "timestamp": timestamp
+            })
+        self.event_log.append_many(events)  # Also records the NFTs in self.nfts
+        logging.info(f"Minted {len(nft_ids)} NFTs on {blockchain_name} for {owner}")
         return nft_ids
 
     def batch_transfer_nfts(self, nft_ids, new_owner):
-        """Transfer multiple NFTs to a new owner."""
+        """Transfer multiple NFTs to a new owner; nothing is transferred if any NFT is missing."""
+        missing = [nft_id for nft_id in nft_ids if nft_id not in self.nfts]
+        if missing:
+            logging.error(f"NFT does not exist: {', '.join(missing)}")
+            return False
+        timestamp = datetime.now().isoformat()
+        events = []
         for nft_id in nft_ids:
-            self.transfer_nft(nft_id, new_owner)
+            events.append({
+                "event": "transfer",
+                "nft_id": nft_id,
+                "old_owner": self.nfts[nft_id]["owner"],
+                "new_owner": new_owner,
+                "timestamp": timestamp
+            })
+        self.event_log.append_many(events)
+        logging.info(f"Transferred {len(nft_ids)} NFTs to {new_owner}")
+        return True
+
+    async def close(self):
+        """Release network sessions and close the event log."""
+        await self.chain_client.close()
+        self.http.close()
+        self.event_log.close()
 
     def set_royalties(self, nft_id, royalty_percentage):
         """Set royalty percentage for an NFT."""
         if nft_id not in self.nfts:
             logging.error("NFT does not exist.")
             return False
-        self.nfts[nft_id]["royalty"] = royalty_percentage
+        self.event_log.append({
+            "event": "royalty",
+            "nft_id": nft_id,
+            "royalty": royalty_percentage,
+            "timestamp": datetime.now().isoformat()
+        })
         logging.info(f"Royalty set for NFT {nft_id}: {royalty_percentage}%")
         return True
 
@@ -133,7 +385,7 @@ class CrossChainNFT:
 
 # Example usage
 if __name__ == "__main__":
-    cross_chain_nft = CrossChainNFT()
+    cross_chain_nft = CrossChainNFT(event_log_dir='nft_events')
     cross_chain_nft.register_blockchain("Ethereum", "https://api.ethereum.org")
     cross_chain_nft.register_blockchain("Binance Smart Chain", "https://api.bsc.org")
     
@@ -1,7 +1,8 @@
 import asyncio
 from context_aware import AdaptationAnalyzer
 from generative_cultural import CustomizationEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -11,9 +12,9 @@ class CulturalAdaptationSynthesizer:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.analyzer = AdaptationAnalyzer()
         self.engine = CustomizationEngine()
-        self.server = Server(horizon_url)
         self.unity_asset = Asset("UNITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
 
@@ -42,22 +43,11 @@ class CulturalAdaptationSynthesizer:
 
     async def allocate_revenue(self, amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.unity_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.unity_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except RequestException as e:
@@ -67,14 +57,6 @@ class CulturalAdaptationSynthesizer:
             self.logger.error(f"An error occurred while allocating revenue: {e}")
             raise
 
-    async def submit_transaction(self, transaction):
-        try:
-            response = await self.server.submit_transaction(transaction)
-            return response
-        except Exception as e:
-            self.logger.error(f"Transaction submission failed: {e}")
-            raise
-
 # Example usage
 async def main():
     horizon_url = "https://horizon-testnet.stellar.org"
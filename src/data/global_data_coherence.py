@@ -1,7 +1,8 @@
 import asyncio
 from federated_graph import CoherenceIntegrator
 from semantic_reconciliation import ResolutionEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -14,6 +15,7 @@ class GlobalDataCoherence:
         self.server = Server(horizon_url)
         self.unity_asset = Asset("UNITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
 
@@ -38,22 +40,11 @@ class GlobalDataCoherence:
 
     async def allocate_revenue(self, amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.unity_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.unity_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except RequestException as e:
@@ -63,14 +54,6 @@ class GlobalDataCoherence:
             self.logger.error(f"Error allocating revenue: {e}")
             raise
 
-    async def submit_transaction(self, transaction):
-        try:
-            response = await self.server.submit_transaction(transaction)
-            return response
-        except Exception as e:
-            self.logger.error(f"Transaction submission failed: {e}")
-            raise
-
     async def monitor_transaction(self, transaction_id):
         try:
             response = await self.server.transactions().get(transaction_id)
@@ -1,14 +1,23 @@
+import asyncio
 import numpy as np
 import logging
+from typing import Iterable, List, Sequence
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense
 from sklearn.preprocessing import MinMaxScaler
+from batched_inference import BatchPredictor, sliding_windows
+
+WINDOW_SIZE = 10
+MIN_FEE = 0.01
 
 class DynamicFeeOracle:
-    def __init__(self):
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.002, cache_size: int = 1024):
         self.model = self._build_lstm_model()
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.logger = self.setup_logging()
+        # Fee requests are coalesced into one forward pass and cached by their scaled metrics window
+        self.predictor = BatchPredictor(self._forward, max_batch=max_batch, max_delay=max_delay,
+                                        cache_size=cache_size)
 
     def setup_logging(self):
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,7 +26,7 @@ class DynamicFeeOracle:
 
     def _build_lstm_model(self):
         model = Sequential()
-        model.add(LSTM(50, return_sequences=True, input_shape=(10, 1)))
+        model.add(LSTM(50, return_sequences=True, input_shape=(WINDOW_SIZE, 1)))
         model.add(LSTM(50))
         model.add(Dense(1))
         model.compile(optimizer="adam", loss="mse")
@@ -29,28 +38,50 @@ class DynamicFeeOracle:
             scaled_data = self.scaler.fit_transform(historical_data)
             X, y = self._create_dataset(scaled_data)
             self.model.fit(X, y, epochs=100, batch_size=32, verbose=1)
+            self.predictor.invalidate()
             self.logger.info("Model training complete.")
         except Exception as e:
             self.logger.error(f"Error during model training: {e}")
 
     def _create_dataset(self, data):
-        X, y = [], []
-        for i in range(len(data) - 10):
-            X.append(data[i:i + 10])
-            y.append(data[i + 10])
-        return np.array(X), np.array(y)
+        return sliding_windows(data, WINDOW_SIZE)
+
+    def _forward(self, windows: np.ndarray) -> np.ndarray:
+        # Calling the model directly skips model.predict's per-call dataset and callback setup
+        return self.model(windows, training=False).numpy()
+
+    def _scale_window(self, network_metrics: Sequence[float]) -> np.ndarray:
+        data = np.asarray(network_metrics, dtype=float).reshape(-1, 1)
+        if len(data) != WINDOW_SIZE:
+            raise ValueError(f"Expected {WINDOW_SIZE} network metrics, got {len(data)}.")
+        return self.scaler.transform(data)
+
+    def _to_fee(self, scaled_fee: float) -> float:
+        return max(self.scaler.inverse_transform([[scaled_fee]])[0][0], MIN_FEE)  # Ensure minimum fee
 
     def predict_fee(self, network_metrics):
+        return self.predict_fees([network_metrics])[0]
+
+    def predict_fees(self, metrics_windows: Iterable[Sequence[float]]) -> List[float]:
+        """Quote fees for many metrics windows with a single forward pass."""
+        metrics_windows = list(metrics_windows)
         try:
-            # Normalize the input metrics
-            data = np.array(network_metrics).reshape(-1, 1)
-            scaled_data = self.scaler.transform(data)
-            scaled_data = scaled_data.reshape(1, 10, 1)
-            fee = self.model.predict(scaled_data)[0][0]
-            return max(self.scaler.inverse_transform([[fee]])[0][0], 0.01)  # Ensure minimum fee
+            windows = [self._scale_window(metrics) for metrics in metrics_windows]
+            if not windows:
+                return []
+            scaled_fees = np.asarray(self.predictor.predict_many(windows)).reshape(-1, 1)
+            return np.maximum(self.scaler.inverse_transform(scaled_fees)[:, 0], MIN_FEE).tolist()
         except Exception as e:
             self.logger.error(f"Error during fee prediction: {e}")
-            return 0.01  # Fallback to minimum fee
+            return [MIN_FEE] * len(metrics_windows)  # Fallback to minimum fee
+
+    async def quote_fee(self, network_metrics: Sequence[float]) -> float:
+        """Quote one fee, sharing a forward pass with other quotes requested within max_delay."""
+        try:
+            return self._to_fee(await self.predictor.predict(self._scale_window(network_metrics)))
+        except Exception as e:
+            self.logger.error(f"Error during fee prediction: {e}")
+            return MIN_FEE  # Fallback to minimum fee
 
 # Example usage
 if __name__ == "__main__":
@@ -64,3 +95,12 @@ if __name__ == "__main__":
     network_metrics = [0.1, 0.2, 0.15, 0.3, 0.25, 0.2, 0.15, 0.1, 0.05, 0.2]
     predicted_fee = oracle.predict_fee(network_metrics)
     print(f"Predicted Fee: {predicted_fee}")
+
+    # Concurrent quotes within max_delay share one forward pass
+    async def quote_burst():
+        windows = [np.random.rand(WINDOW_SIZE).tolist() for _ in range(100)]
+        passes = oracle.predictor.batches
+        fees = await asyncio.gather(*(oracle.quote_fee(window) for window in windows))
+        print(f"Quoted {len(fees)} fees in {oracle.predictor.batches - passes} forward passes")
+
+    asyncio.run(quote_burst())
@@ -1,7 +1,8 @@
 import asyncio
 from multi_agent_rl import BalancePlanner
 from game_theoretic import OptimizationEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -11,9 +12,9 @@ class EconomicBalanceOptimizer:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.planner = BalancePlanner()
         self.engine = OptimizationEngine()
-        self.server = Server(horizon_url)
         self.equity_asset = Asset("EQUITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
 
@@ -38,22 +39,11 @@ class EconomicBalanceOptimizer:
 
     async def allocate_revenue(self, amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.equity_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.equity_asset,
+                amount=str(amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except RequestException as e:
@@ -63,14 +53,6 @@ class EconomicBalanceOptimizer:
             self.logger.error(f"Error allocating revenue: {e}")
             return None
 
-    async def submit_transaction(self, transaction):
-        try:
-            response = await self.server.submit_transaction(transaction)
-            return response
-        except Exception as e:
-            self.logger.error(f"Transaction submission failed: {e}")
-            raise
-
 # Example usage
 async def main():
     optimizer = EconomicBalanceOptimizer("https://horizon-testnet.stellar.org", "GABCD1234567890", "SXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX")
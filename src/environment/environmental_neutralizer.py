@@ -1,7 +1,8 @@
 import asyncio
 from spatio_temporal import ThreatForecaster
 from swarm_optimization import InfrastructureAdapter
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 import json
@@ -10,9 +11,9 @@ class EnvironmentalNeutralizer:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.forecaster = ThreatForecaster()
         self.adapter = InfrastructureAdapter()
-        self.server = Server(horizon_url)
         self.resilience_asset = Asset("RESILIENCE", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +37,11 @@ class EnvironmentalNeutralizer:
     
     async def issue_resilience_token(self, node_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=node_public,
-                    asset=self.resilience_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=node_public,
+                asset=self.resilience_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Resilience Token Issued: {response['id']}")
             return response['id']
         except Exception as e:
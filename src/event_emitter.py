@@ -1,51 +1,214 @@
 import logging
 import asyncio
-from typing import Callable, Dict, List, Any, Tuple
+import inspect
+import itertools
+from collections import Counter, OrderedDict, defaultdict
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class EventEmitter:
-    def __init__(self):
-        self.events: Dict[str, List[Tuple[int, Callable[[Any], None]]] ] = {}  # Event name -> list of (priority, listener)
-
-    def on(self, event: str, listener: Callable[[Any], None], priority: int = 0) -> None:
-        """Register a listener for a specific event with an optional priority."""
-        if event not in self.events:
-            self.events[event] = []
-        self.events[event].append((priority, listener))
-        self.events[event].sort(key=lambda x: x[0], reverse=True)  # Higher priority first
-        logging.info(f"Listener registered for event: {event} with priority: {priority}")
-
-    async def _emit_listener(self, listener: Callable[[Any], None], data: Any) -> None:
-        """Execute a listener asynchronously."""
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+class Subscription:
+    """One listener's bounded queue and the task that drains it.
+
+    Each subscription is delivered to by its own task, so a slow listener
+    only delays itself. When its queue is full the overflow policy decides:
+    "block" makes emit() wait for space, "drop_oldest" discards the oldest
+    queued event, and "coalesce" replaces a queued event that has the same
+    `coalesce_key` (falling back to dropping the oldest). With `batch_size`
+    the listener receives lists of up to that many events.
+    """
+
+    def __init__(self, emitter: "EventEmitter", pattern: str, listener: Callable[[Any], Any], priority: int,
+                 order: int, max_queue: int, overflow: str, batch_size: Optional[int],
+                 coalesce_key: Optional[Callable[[Any], Any]], with_topic: bool):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if overflow == "coalesce" and coalesce_key is None:
+            raise ValueError("The coalesce policy needs a coalesce_key")
+        self.emitter = emitter
+        self.pattern = pattern
+        self.listener = listener
+        self.priority = priority
+        self.order = order
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.coalesce_key = coalesce_key
+        self.with_topic = with_topic
+        self.queue: OrderedDict = OrderedDict()  # Key -> (topic, data); keys are sequence numbers unless coalescing
+        self.sequence = itertools.count()
+        self.ready = asyncio.Event()
+        self.space = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def sort_key(self) -> Tuple[int, int]:
+        return (-self.priority, self.order)
+
+    async def offer(self, topic: str, data: Any) -> None:
+        if self.closed:
+            return
+        key = self.coalesce_key(data) if self.overflow == "coalesce" else next(self.sequence)
+        if self.overflow == "coalesce" and key in self.queue:
+            self._drop(self.queue[key][0])
+        else:
+            while len(self.queue) >= self.max_queue:
+                if self.overflow == "block":
+                    self.space.clear()
+                    await self.space.wait()
+                    if self.closed:
+                        return
+                else:
+                    _, (dropped_topic, _) = self.queue.popitem(last=False)
+                    self._drop(dropped_topic)
+        self.queue[key] = (topic, data)
+        self.emitter.stats[topic]["enqueued"] += 1
+        self.idle.clear()
+        self.ready.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def _drop(self, topic: str) -> None:
+        self.dropped += 1
+        self.emitter.stats[topic]["dropped"] += 1
+
+    async def _run(self) -> None:
+        while True:
+            await self.ready.wait()
+            count = min(len(self.queue), self.batch_size or 1)
+            items = [self.queue.popitem(last=False)[1] for _ in range(count)]
+            if not self.queue:
+                self.ready.clear()
+            self.space.set()
+            await self._deliver(items)
+            for topic, _ in items:
+                self.emitter.stats[topic]["delivered"] += 1
+            self.delivered += len(items)
+            if not self.queue:
+                self.idle.set()
+
+    async def _deliver(self, items: List[Tuple[str, Any]]) -> None:
+        payloads = [item if self.with_topic else item[1] for item in items]
         try:
-            if asyncio.iscoroutinefunction(listener):
-                await listener(data)
-            else:
-                listener(data)
+            result = self.listener(payloads if self.batch_size else payloads[0])
+            if inspect.isawaitable(result):
+                await result
         except Exception as e:
-            logging.error(f"Error while executing listener: {listener.__name__} for event: {data}: {e}")
+            name = getattr(self.listener, "__name__", repr(self.listener))
+            logging.error(f"Error while executing listener: {name} for pattern: {self.pattern}: {e}")
 
-    async def emit(self, event: str, data: Any) -> None:
-        """Emit an event, calling all registered listeners asynchronously."""
-        if event in self.events:
-            logging.info(f"Emitting event: {event} with data: {data}")
-            await asyncio.gather(*(self._emit_listener(listener, data) for _, listener in self.events[event]))
-        else:
-            logging.warning(f"No listeners registered for event: {event}")
+    def cancel(self) -> None:
+        self.closed = True
+        self.space.set()  # Release emitters blocked on this queue
+        self.idle.set()
+        if self.task:
+            self.task.cancel()
+            self.task = None
 
-    def remove_listener(self, event: str, listener: Callable[[Any], None]) -> None:
+class EventEmitter:
+    """Topic-based event bus with per-subscriber bounded queues.
+
+    emit() only enqueues: every matching subscription gets the event on its
+    own queue, in priority order, and its own task delivers it. Patterns may
+    use shell-style wildcards ("stake.*", "*"). Subscriptions are kept per
+    pattern in a dict, so removal is O(1); the ordered subscriber list for a
+    topic is resolved once and cached until subscriptions change.
+    """
+
+    def __init__(self, max_queue: int = 1000, overflow: str = "block"):
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.events: Dict[str, Dict[Callable[[Any], Any], Subscription]] = {}  # Pattern -> listener -> subscription
+        self.routes: Dict[str, List[Subscription]] = {}  # Topic -> matching subscriptions, highest priority first
+        self.stats: Dict[str, Counter] = defaultdict(Counter)  # Topic -> emitted/enqueued/delivered/dropped
+        self.order = itertools.count()
+
+    def on(self, event: str, listener: Callable[[Any], Any], priority: int = 0, max_queue: Optional[int] = None,
+           overflow: Optional[str] = None, batch_size: Optional[int] = None,
+           coalesce_key: Optional[Callable[[Any], Any]] = None, with_topic: bool = False) -> Subscription:
+        """Register a listener for an event name or wildcard pattern.
+
+        Higher priorities receive each event first. Queue size and overflow
+        policy default to the emitter's. With `with_topic` the listener gets
+        (topic, data) pairs instead of bare data.
+        """
+        subscription = Subscription(self, event, listener, priority, next(self.order),
+                                    max_queue or self.max_queue, overflow or self.overflow, batch_size,
+                                    coalesce_key, with_topic)
+        previous = self.events.setdefault(event, {}).pop(listener, None)
+        if previous:
+            previous.cancel()
+        self.events[event][listener] = subscription
+        self.routes.clear()
+        logging.debug(f"Listener registered for event: {event} with priority: {priority}")
+        return subscription
+
+    def subscribers(self, topic: str) -> List[Subscription]:
+        """Subscriptions matching a topic, highest priority first."""
+        route = self.routes.get(topic)
+        if route is None:
+            route = [subscription for pattern, subscriptions in self.events.items()
+                     if pattern == topic or (_is_pattern(pattern) and fnmatchcase(topic, pattern))
+                     for subscription in subscriptions.values()]
+            route.sort(key=lambda subscription: subscription.sort_key)
+            self.routes[topic] = route
+        return route
+
+    async def emit(self, event: str, data: Any) -> None:
+        """Queue an event for every matching listener; waits only if a "block" queue is full."""
+        self.stats[event]["emitted"] += 1
+        subscribers = self.subscribers(event)
+        if not subscribers:
+            logging.debug(f"No listeners registered for event: {event}")
+        for subscription in subscribers:
+            await subscription.offer(event, data)
+
+    def remove_listener(self, event: str, listener: Callable[[Any], Any]) -> None:
         """Remove a specific listener for an event."""
-        if event in self.events:
-            self.events[event] = [(priority, l) for priority, l in self.events[event] if l != listener]
-            logging.info(f"Listener removed for event: {event}")
+        subscription = self.events.get(event, {}).pop(listener, None)
+        if subscription:
+            subscription.cancel()
+            self.routes.clear()
+            logging.debug(f"Listener removed for event: {event}")
 
     def clear_event(self, event: str) -> None:
         """Clear all listeners for a specific event."""
         if event in self.events:
-            del self.events[event]
-            logging.info(f"All listeners cleared for event: {event}")
+            for subscription in self.events.pop(event).values():
+                subscription.cancel()
+            self.routes.clear()
+            logging.debug(f"All listeners cleared for event: {event}")
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been delivered."""
+        for subscriptions in list(self.events.values()):
+            for subscription in list(subscriptions.values()):
+                await subscription.idle.wait()
+
+    async def close(self) -> None:
+        """Stop every delivery task; undelivered events are discarded."""
+        for subscriptions in self.events.values():
+            for subscription in subscriptions.values():
+                subscription.cancel()
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        """Per-topic counters; `lag` is the number of events still queued for delivery."""
+        fields = ("emitted", "enqueued", "delivered", "dropped")
+        return {topic: {**{field: counts[field] for field in fields},
+                        "lag": counts["enqueued"] - counts["delivered"] - counts["dropped"]}
+                for topic, counts in self.stats.items()}
+
+def _is_pattern(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
 
 # Example usage of the EventEmitter class
 async def main():
@@ -58,8 +221,9 @@ async def main():
     # Register the listener for the 'stake' event with priority 1
     emitter.on('stake', on_stake, priority=1)
 
-    # Emit a 'stake' event
+    # Emit a 'stake' event and wait for it to be delivered
     await emitter.emit('stake', {'user': 'user1', 'amount': 100.0})
+    await emitter.drain()
 
     # Emit an event with no listeners
     await emitter.emit('unknown_event', {'info': 'This should not trigger any listener.'})
@@ -72,6 +236,7 @@ async def main():
 
     # Clear all listeners for the 'stake' event
     emitter.clear_event('stake')
+    print(emitter.metrics())
 
 if __name__ == "__main__":
     asyncio.run(main())
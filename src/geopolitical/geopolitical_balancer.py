@@ -1,7 +1,8 @@
 import asyncio
 from temporal_graph import PredictionEngine
 from game_theory import MitigationOptimizer
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 from datetime import datetime
@@ -13,6 +14,7 @@ class GeopoliticalBalancer:
         self.server = Server(horizon_url)
         self.equity_asset = Asset("EQUITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +38,11 @@ class GeopoliticalBalancer:
     
     async def issue_equity_token(self, stakeholder_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=stakeholder_public,
-                    asset=self.equity_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=stakeholder_public,
+                asset=self.equity_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Equity token issued: {response['id']}")
             return response['id']
         except Exception as e:
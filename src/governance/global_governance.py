@@ -3,7 +3,8 @@ import json
 import sqlite3
 from federated_gnn import SyncEngine
 from bayesian_optimization import ResolutionOptimizer
-from stellar_sdk import Server, TransactionBuilder, Network, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from logging import getLogger, StreamHandler, Formatter
 from datetime import datetime, timedelta
 
@@ -11,9 +12,9 @@ class GlobalGovernance:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret, db_path='governance.db'):
         self.engine = SyncEngine()
         self.optimizer = ResolutionOptimizer()
-        self.server = Server(horizon_url)
         self.governance_asset = Asset("GOVERNANCE", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
         self.db_path = db_path
         self.initialize_database()
@@ -61,21 +62,11 @@ class GlobalGovernance:
 
     async def issue_governance_token(self, voter_public, token_amount):
         try:
-            tx = (
-                TransactionBuilder(
-                    source_account=await self.server.load_account(self.master_keypair.public_key),
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=voter_public,
-                    asset=self.governance_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=voter_public,
+                asset=self.governance_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Consensus token issued: {response['id']}")
             return response['id']
         except Exception as e:
@@ -0,0 +1,434 @@
+import asyncio
+import logging
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+from stellar_sdk import Asset, Keypair, Network, ServerAsync, TransactionBuilder
+from stellar_sdk.account import Account
+from stellar_sdk.client.aiohttp_client import AiohttpClient
+from stellar_sdk.exceptions import BadRequestError, BadResponseError, ConnectionError, NotFoundError
+from chain_transport import backoff_delay
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def result_code(error: BadRequestError) -> Optional[str]:
+    """Extract the transaction result code (e.g. tx_bad_seq) from a Horizon error."""
+    return ((error.extras or {}).get("result_codes") or {}).get("transaction")
+
+def operation_codes(error: BadRequestError) -> List[str]:
+    """Per-operation result codes from a tx_failed Horizon error."""
+    return ((error.extras or {}).get("result_codes") or {}).get("operations") or []
+
+class PaymentError(Exception):
+    """Raised to a batched payment's caller when its own operation failed."""
+
+    def __init__(self, code: str):
+        super().__init__(f"Payment failed: {code}")
+        self.code = code
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+class SequenceCache:
+    """Local account sequence numbers, advanced optimistically as transactions are built.
+
+    The cache is shared by every event loop using a client. Submissions are
+    ordered per loop with asyncio locks, while sequence numbers are
+    allocated under a per-account threading lock so two loops never build
+    transactions with the same one.
+    """
+
+    def __init__(self):
+        self.accounts: Dict[str, Account] = {}
+        self.locks = weakref.WeakKeyDictionary()  # Event loop -> account ID -> lock
+        self.guards: Dict[str, threading.Lock] = {}  # Account ID -> lock held while allocating a sequence
+
+    def lock(self, account_id: str) -> asyncio.Lock:
+        """Lock that orders submissions from one source account on the running event loop."""
+        locks = self.locks.setdefault(asyncio.get_running_loop(), {})
+        if account_id not in locks:
+            locks[account_id] = asyncio.Lock()
+        return locks[account_id]
+
+    def guard(self, account_id: str) -> threading.Lock:
+        """Lock that makes allocating the account's next sequence number atomic across threads."""
+        guard = self.guards.get(account_id)
+        if guard is None:
+            guard = self.guards.setdefault(account_id, threading.Lock())
+        return guard
+
+    def get(self, account_id: str) -> Optional[Account]:
+        return self.accounts.get(account_id)
+
+    def put(self, account: Account) -> None:
+        with self.guard(account.account.account_id):
+            self.accounts[account.account.account_id] = account
+
+    def invalidate(self, account_id: str) -> None:
+        """Forget an account so its sequence is reloaded from Horizon."""
+        self.accounts.pop(account_id, None)
+
+class HorizonClient:
+    """Shared asyncio Horizon client with pooled connections and cached sequence numbers.
+
+    Builds transactions against a locally cached source account instead of
+    loading it before every submit. The cache is resynced from Horizon on
+    tx_bad_seq. Transport failures resubmit the same signed envelope with
+    backoff, so a retry can never apply a payment twice. Pooled connections
+    belong to an event loop, so each loop that uses the client gets its own
+    pool; the sequence cache is shared.
+    """
+
+    def __init__(self, horizon_url: str, network_passphrase: str = Network.PUBLIC_NETWORK_PASSPHRASE,
+                 base_fee: int = 100, pool_size: int = 100, retries: int = 3, base_delay: float = 0.5,
+                 skip_memo_required_check: bool = False):
+        self.horizon_url = horizon_url
+        self.network_passphrase = network_passphrase
+        self.base_fee = base_fee
+        self.retries = retries
+        self.base_delay = base_delay
+        self.skip_memo_required_check = skip_memo_required_check
+        self.pool_size = pool_size
+        self.servers = weakref.WeakKeyDictionary()  # Event loop -> ServerAsync
+        self.idle_server: Optional[ServerAsync] = None  # Created outside any event loop
+        self.sequences = SequenceCache()
+
+    @property
+    def server(self) -> ServerAsync:
+        """Horizon server whose connection pool belongs to the running event loop."""
+        loop = running_loop()
+        if loop is None:
+            if self.idle_server is None:
+                self.idle_server = ServerAsync(self.horizon_url, client=AiohttpClient(pool_size=self.pool_size))
+            return self.idle_server
+        if loop not in self.servers:
+            self.servers[loop] = ServerAsync(self.horizon_url, client=AiohttpClient(pool_size=self.pool_size))
+        return self.servers[loop]
+
+    async def load_account(self, account_id: str, refresh: bool = False) -> Account:
+        """Return the cached account, loading it from Horizon on first use or when refreshing."""
+        account = None if refresh else self.sequences.get(account_id)
+        if account is None:
+            account = await self.server.load_account(account_id)
+            self.sequences.put(account)
+        return account
+
+    async def submit(self, source_keypair: Keypair, build: Callable[[TransactionBuilder], None],
+                     signers: Optional[List[Keypair]] = None, source_account_id: Optional[str] = None,
+                     timeout: int = 30, base_fee: Optional[int] = None) -> dict:
+        """Build, sign and submit a transaction.
+
+        `build` receives a TransactionBuilder and appends the operations.
+        The source account defaults to the first signer's account.
+        """
+        account_id = source_account_id or source_keypair.public_key
+        signers = signers or [source_keypair]
+        async with self.sequences.lock(account_id):
+            tx = None
+            outcome_unknown = False
+            for attempt in range(self.retries):
+                if tx is None:
+                    account = await self.load_account(account_id)
+                    with self.sequences.guard(account_id):
+                        # Another event loop may have cached this account first; build from its copy
+                        account = self.sequences.get(account_id) or account
+                        builder = TransactionBuilder(
+                            source_account=account,
+                            network_passphrase=self.network_passphrase,
+                            base_fee=base_fee or self.base_fee
+                        )
+                        build(builder)
+                        tx = builder.set_timeout(timeout).build()  # Advances the cached sequence number
+                    for signer in signers:
+                        tx.sign(signer)
+                try:
+                    return await self.server.submit_transaction(
+                        tx, skip_memo_required_check=self.skip_memo_required_check)
+                except BadRequestError as e:
+                    self.sequences.invalidate(account_id)
+                    if result_code(e) != "tx_bad_seq":
+                        raise
+                    if outcome_unknown:
+                        # An earlier attempt may have landed; look it up before building a new transaction
+                        try:
+                            return await self.server.transactions().transaction(tx.hash_hex()).call()
+                        except NotFoundError:
+                            pass
+                    logging.warning(f"Sequence for {account_id} out of date; resyncing.")
+                    tx = None
+                    outcome_unknown = False
+                except (ConnectionError, BadResponseError) as e:
+                    outcome_unknown = True
+                    logging.error(f"Submission failed: {e}. Attempt {attempt + 1} of {self.retries}.")
+                    if attempt + 1 < self.retries:
+                        await asyncio.sleep(backoff_delay(attempt, self.base_delay))
+            self.sequences.invalidate(account_id)
+            raise Exception("Max retries exceeded for transaction submission.")
+
+    async def submit_payment(self, source_keypair: Keypair, destination: str, asset: Asset, amount: str,
+                             memo: Optional[str] = None, base_fee: Optional[int] = None) -> dict:
+        """Submit a single payment."""
+        def build(builder: TransactionBuilder):
+            builder.append_payment_op(destination=destination, asset=asset, amount=str(amount))
+            if memo:
+                builder.add_text_memo(memo)
+
+        return await self.submit(source_keypair, build, base_fee=base_fee)
+
+    async def close(self) -> None:
+        """Close the running event loop's pooled connections."""
+        server = self.servers.pop(asyncio.get_running_loop(), None)
+        if server is not None:
+            await server.close()
+
+class ChannelPool:
+    """Channel accounts that act as transaction sources so one signer can have many transactions in flight.
+
+    Sequence numbers only have to be ordered per source account. Leasing a
+    channel as the source of each transaction means N transactions can be
+    pending at once. The signing account stays the source of the operations
+    and still signs, while the channel pays the fee. A channel is returned
+    to the pool once its transaction is confirmed or has failed. Each event
+    loop leases from its own queue of the channels; a channel used from two
+    loops at once still gets distinct sequence numbers from the client.
+    """
+
+    def __init__(self, client: HorizonClient, channel_keypairs: Iterable[Keypair] = ()):
+        self.client = client
+        self.channels: List[Keypair] = []
+        self.queues = weakref.WeakKeyDictionary()  # Event loop -> its queue of idle channels
+        for keypair in channel_keypairs:
+            self.add(keypair)
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def _idle(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if loop not in self.queues:
+            idle = self.queues[loop] = asyncio.Queue()
+            for keypair in self.channels:
+                idle.put_nowait(keypair)
+        return self.queues[loop]
+
+    @property
+    def leased(self) -> int:
+        """Number of channels currently carrying a transaction on the running event loop."""
+        idle = self.queues.get(running_loop())
+        return 0 if idle is None else len(self.channels) - idle.qsize()
+
+    def add(self, keypair: Keypair) -> None:
+        self.channels.append(keypair)
+        for idle in self.queues.values():
+            idle.put_nowait(keypair)
+
+    async def provision(self, funder_keypair: Keypair, count: int, starting_balance: str = "2") -> List[Keypair]:
+        """Create and fund `count` new channel accounts in one transaction and add them to the pool.
+
+        The caller is responsible for persisting the returned secrets.
+        """
+        keypairs = [Keypair.random() for _ in range(count)]
+
+        def build(builder: TransactionBuilder):
+            for keypair in keypairs:
+                builder.append_create_account_op(destination=keypair.public_key, starting_balance=starting_balance)
+
+        await self.client.submit(funder_keypair, build)
+        for keypair in keypairs:
+            self.add(keypair)
+        logging.info(f"Provisioned {count} channel accounts.")
+        return keypairs
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow an idle channel for one transaction, waiting if all are busy."""
+        if not self.channels:
+            raise ValueError("Channel pool is empty.")
+        idle = self._idle()
+        channel = await idle.get()
+        try:
+            yield channel
+        finally:
+            idle.put_nowait(channel)
+
+    async def submit(self, signing_keypair: Keypair, build: Callable[[TransactionBuilder], None],
+                     signers: Optional[List[Keypair]] = None, **kwargs) -> dict:
+        """Submit through a leased channel.
+
+        `build` must set `source` on each operation to the account it acts on.
+        """
+        async with self.lease() as channel:
+            return await self.client.submit(channel, build, signers=[channel] + (signers or [signing_keypair]),
+                                            **kwargs)
+
+    async def submit_payment(self, source_keypair: Keypair, destination: str, asset: Asset, amount: str,
+                             memo: Optional[str] = None) -> dict:
+        """Submit a single payment from `source_keypair` through a leased channel."""
+        def build(builder: TransactionBuilder):
+            builder.append_payment_op(destination=destination, asset=asset, amount=str(amount),
+                                      source=source_keypair.public_key)
+            if memo:
+                builder.add_text_memo(memo)
+
+        return await self.submit(source_keypair, build)
+
+class _PaymentQueue:
+    """Payments waiting on one event loop, with that loop's flush timer and submissions."""
+
+    def __init__(self):
+        self.pending = []  # (payment kwargs, future, base_fee)
+        self.timer = None
+        self.inflight = set()
+
+class PaymentBatcher:
+    """Coalesces payments from one source account into multi-operation transactions.
+
+    Callers await pay() as if it submitted alone. Queued payments are sent
+    together once max_operations are waiting or max_delay seconds after the
+    first one was queued, whichever comes first. Each caller gets back the
+    transaction response plus the index of its operation. When a batch fails
+    with tx_failed, only the payments whose operations failed are rejected;
+    the rest are resubmitted. With a ChannelPool, full batches are submitted
+    in parallel instead of queueing behind the source account's sequence.
+    Payments are queued per event loop, so one batcher can serve several.
+    """
+
+    def __init__(self, client: HorizonClient, source_keypair: Keypair, max_operations: int = 100,
+                 max_delay: float = 0.2, channels: Optional[ChannelPool] = None):
+        if not 1 <= max_operations <= 100:
+            raise ValueError("A Stellar transaction holds between 1 and 100 operations.")
+        self.client = client
+        self.source_keypair = source_keypair
+        self.max_operations = max_operations
+        self.max_delay = max_delay
+        self.channels = channels
+        self.queues = weakref.WeakKeyDictionary()  # Event loop -> its queue
+
+    def _queue(self) -> _PaymentQueue:
+        loop = asyncio.get_running_loop()
+        if loop not in self.queues:
+            self.queues[loop] = _PaymentQueue()
+        return self.queues[loop]
+
+    async def pay(self, destination: str, asset: Asset, amount: str, base_fee: Optional[int] = None) -> dict:
+        """Queue a payment and wait for the transaction that carries it."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue()
+        future = loop.create_future()
+        queue.pending.append(({"destination": destination, "asset": asset, "amount": str(amount)}, future, base_fee))
+        if len(queue.pending) >= self.max_operations:
+            self._flush_pending(queue)
+        elif queue.timer is None:
+            queue.timer = loop.call_later(self.max_delay, self._flush_pending, queue)
+        return await future
+
+    async def pay_many(self, payments: List[dict]) -> List[dict]:
+        """Queue many payments (dicts of destination, asset, amount) and wait for all of them.
+
+        Entries are either a response dict or the exception raised for that payment.
+        """
+        return await asyncio.gather(*(self.pay(**payment) for payment in payments), return_exceptions=True)
+
+    def _flush_pending(self, queue: _PaymentQueue) -> None:
+        if queue.timer is not None:
+            queue.timer.cancel()
+            queue.timer = None
+        while queue.pending:
+            batch, queue.pending = queue.pending[:self.max_operations], queue.pending[self.max_operations:]
+            task = asyncio.create_task(self._submit(batch))
+            queue.inflight.add(task)
+            task.add_done_callback(queue.inflight.discard)
+
+    async def flush(self) -> None:
+        """Send everything queued on the running event loop and wait for it to settle."""
+        queue = self._queue()
+        self._flush_pending(queue)
+        if queue.inflight:
+            await asyncio.gather(*queue.inflight, return_exceptions=True)
+
+    async def _submit(self, batch: list) -> None:
+        while batch:
+            operation_source = self.source_keypair.public_key if self.channels else None
+
+            def build(builder: TransactionBuilder):
+                for payment, _, _ in batch:
+                    builder.append_payment_op(**payment, source=operation_source)
+
+            fees = [base_fee for _, _, base_fee in batch if base_fee]
+            submit = self.channels.submit if self.channels else self.client.submit
+            try:
+                response = await submit(self.source_keypair, build, base_fee=max(fees) if fees else None)
+            except BadRequestError as e:
+                codes = operation_codes(e)
+                if result_code(e) != "tx_failed" or len(codes) != len(batch):
+                    self._reject(batch, e)
+                    return
+                remaining = []
+                for entry, code in zip(batch, codes):
+                    if code == "op_success":
+                        remaining.append(entry)
+                    elif not entry[1].done():
+                        entry[1].set_exception(PaymentError(code))
+                logging.warning(f"Batch of {len(batch)} payments failed; resubmitting {len(remaining)}.")
+                batch = remaining
+                continue
+            except Exception as e:
+                self._reject(batch, e)
+                return
+            for index, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    future.set_result(dict(response, operation_index=index))
+            logging.info(f"Submitted {len(batch)} payments in transaction {response['id']}")
+            return
+
+    @staticmethod
+    def _reject(batch: list, error: Exception) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+# Shared clients and batchers are usable from any event loop, so one registry serves the process
+_clients: Dict[tuple, tuple] = {}  # key -> (client, kwargs it was created with)
+_batchers: Dict[tuple, tuple] = {}
+
+def _shared(registry: Dict[tuple, tuple], key: tuple, kwargs: dict, create: Callable[[], object]):
+    if key not in registry:
+        registry[key] = (create(), kwargs)
+    shared, created_with = registry[key]
+    if kwargs and kwargs != created_with:
+        raise ValueError(f"Shared instance for {key} already exists with settings {created_with}, not {kwargs}.")
+    return shared
+
+def get_horizon_client(horizon_url: str, network_passphrase: str = Network.PUBLIC_NETWORK_PASSPHRASE,
+                       **kwargs) -> HorizonClient:
+    """Return the process-wide client for a Horizon URL, creating it on first use.
+
+    Settings are taken from the first call; later calls may omit them but
+    raise ValueError if they pass different ones.
+    """
+    return _shared(_clients, (horizon_url, network_passphrase), kwargs,
+                   lambda: HorizonClient(horizon_url, network_passphrase, **kwargs))
+
+def get_payment_batcher(horizon_url: str, source_keypair: Keypair,
+                        network_passphrase: str = Network.PUBLIC_NETWORK_PASSPHRASE, **kwargs) -> PaymentBatcher:
+    """Return the process-wide batcher for a source account, so modules paying from one key share batches.
+
+    As with get_horizon_client, differing settings on a later call raise ValueError.
+    """
+    return _shared(_batchers, (horizon_url, network_passphrase, source_keypair.public_key), kwargs,
+                   lambda: PaymentBatcher(get_horizon_client(horizon_url, network_passphrase), source_keypair,
+                                          **kwargs))
+
+async def close_horizon_clients() -> None:
+    """Flush shared batchers and close every shared client."""
+    for batcher, _ in _batchers.values():
+        await batcher.flush()
+    _batchers.clear()
+    for client, _ in _clients.values():
+        await client.close()
+    _clients.clear()
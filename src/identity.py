@@ -2,22 +2,59 @@ import json
 import hashlib
 import logging
 import base64
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Timer
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization
 from cryptography.exceptions import InvalidSignature
 from ipfshttpclient import connect
+from chain_transport import backoff_delay
+from revocation_registry import RevocationRegistry
+from utils import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-class DecentralizedIdentity:
+class LocalIPFSClient:
+    """In-process IPFS stand-in that content-addresses JSON documents."""
+
     def __init__(self):
+        self.objects = {}
+
+    def add_json(self, data: dict) -> str:
+        """Store a JSON document and return its content hash."""
+        payload = json.dumps(data, sort_keys=True)
+        content_hash = hashlib.sha256(payload.encode()).hexdigest()
+        self.objects[content_hash] = payload
+        return content_hash
+
+    def get_json(self, content_hash: str) -> dict:
+        """Fetch a previously stored JSON document."""
+        return json.loads(self.objects[content_hash])
+
+class DecentralizedIdentity:
+    def __init__(self, ipfs_client=None, cache_size: int = 4096, cache_ttl: float = 3600.0, pin_batch_size: int = 64,
+                 pin_delay: float = 5.0, pin_retries: int = 3, pin_base_delay: float = 0.5, max_workers: int = 8):
         self.identities = {}  # Store identities
         self.credentials = {}  # Store issued credentials
         self.revocation_list = {}  # Store revoked credentials
-        self.ipfs_client = connect()  # Connect to IPFS
+        self.revocation_registry = RevocationRegistry()  # Compact, shareable revocation state
+        self.ipfs_client = ipfs_client if ipfs_client is not None else connect()  # Connect to IPFS
+        self.credential_index = {}  # credential_id -> issuer and parsed public key
+        self.public_keys = {}  # user_id -> parsed public key
+        # Keyed by credential hash and revocation version, so revocations never serve a stale result
+        self.verification_cache = TTLCache(ttl=cache_ttl, max_size=cache_size)
+        self.pending_pins = []  # Credentials waiting to be stored in IPFS
+        self.pin_batch_size = pin_batch_size
+        self.pin_delay = pin_delay  # Longest a queued credential waits for its batch to fill
+        self.pin_retries = pin_retries
+        self.pin_base_delay = pin_base_delay
+        self.pin_timer = None
+        self.pin_lock = Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
 
     def create_identity(self, user_id: str, multi_sig_keys: list = None) -> dict:
         """Create a new decentralized identity."""
@@ -35,6 +72,7 @@ class DecentralizedIdentity:
             "private_key": private_key,
             "identity": identity
         }
+        self.public_keys[user_id] = public_key
 
         logging.info(f"Identity created for user: {user_id}")
         return identity
@@ -68,15 +106,20 @@ class DecentralizedIdentity:
             "credential_id": credential_id,
             "data": credential_data,
             "signature": signature.hex(),
-            "revoked": False
+            "revoked": False,
+            "status_index": self.revocation_registry.allocate(credential_id)
         }
 
-        # Store credential in IPFS
-        ipfs_hash = self.store_in_ipfs(credential)
-        credential["ipfs_hash"] = ipfs_hash
+        # Defer storage in IPFS; the hash is filled in when the batch is pinned
+        credential["ipfs_hash"] = None
 
         self.identities[user_id]["identity"]["credentials"].append(credential)
         self.credentials[credential_id] = credential
+        self.credential_index[credential_id] = {
+            "issuer": user_id,
+            "public_key": self.public_keys[user_id]
+        }
+        self.queue_pin(credential)
 
         logging.info(f"Credential issued to {user_id}: {credential_id}")
         return credential
@@ -84,7 +127,80 @@ class DecentralizedIdentity:
     def store_in_ipfs(self, data: dict) -> str:
         """Store data in IPFS and return the hash."""
         response = self.ipfs_client.add_json(data)
-        return response['Hash']
+        # ipfshttpclient returns the bare hash string from add_json
+        return response['Hash'] if isinstance(response, dict) else response
+
+    def queue_pin(self, credential: dict):
+        """Queue a credential for IPFS storage.
+
+        The batch is pinned once it is full, or `pin_delay` seconds after
+        its first credential was queued, whichever comes first.
+        """
+        with self.pin_lock:
+            self.pending_pins.append(credential)
+            if len(self.pending_pins) < self.pin_batch_size:
+                self._arm_pin_timer()
+                return
+            batch = self._take_pending_pins()
+        self.executor.submit(self.pin_batch, batch)
+
+    def _arm_pin_timer(self):
+        # Caller holds pin_lock
+        if self.pin_timer is None:
+            self.pin_timer = Timer(self.pin_delay, self._flush_due_pins)
+            self.pin_timer.daemon = True
+            self.pin_timer.start()
+
+    def _take_pending_pins(self) -> list:
+        # Caller holds pin_lock
+        if self.pin_timer is not None:
+            self.pin_timer.cancel()
+            self.pin_timer = None
+        batch, self.pending_pins = self.pending_pins, []
+        return batch
+
+    def _flush_due_pins(self):
+        with self.pin_lock:
+            batch = self._take_pending_pins()
+        if batch:
+            self.executor.submit(self.pin_batch, batch)
+
+    def flush_pins(self) -> int:
+        """Pin all queued credentials now and return how many were stored."""
+        with self.pin_lock:
+            batch = self._take_pending_pins()
+        return self.pin_batch(batch)
+
+    def pin_batch(self, batch: list) -> int:
+        """Store a batch of credentials in IPFS and record their hashes.
+
+        Failed credentials are retried with backoff up to `pin_retries`
+        attempts; any still failing are queued again for the next batch.
+        """
+        pinned = 0
+        for attempt in range(self.pin_retries):
+            if attempt:
+                time.sleep(backoff_delay(attempt - 1, self.pin_base_delay))
+            failed = []
+            for credential in batch:
+                document = {key: value for key, value in credential.items() if key != "ipfs_hash"}
+                try:
+                    credential["ipfs_hash"] = self.store_in_ipfs(document)
+                    pinned += 1
+                except Exception as e:
+                    logging.error(f"Failed to pin credential {credential['credential_id']}: {e}. "
+                                  f"Attempt {attempt + 1} of {self.pin_retries}.")
+                    failed.append(credential)
+            batch = failed
+            if not batch:
+                break
+        if batch:
+            with self.pin_lock:
+                self.pending_pins.extend(batch)
+                self._arm_pin_timer()
+        if pinned:
+            logging.info(f"Pinned {pinned} credentials to IPFS.")
+        return pinned
 
     def generate_credential_id(self, credential_data: dict) -> str:
         """Generate a unique credential ID based on the credential data."""
@@ -92,7 +208,7 @@ class DecentralizedIdentity:
 
     def verify_credential(self, credential_id: str) -> bool:
         """Verify the issued credential."""
-        if credential_id in self.revocation_list:
+        if self.revocation_registry.is_revoked(credential_id):
             logging.warning(f"Credential {credential_id} has been revoked.")
             return False
 
@@ -100,6 +216,11 @@ class DecentralizedIdentity:
             raise Exception("Credential does not exist.")
 
         credential = self.credentials[credential_id]
+        cache_key = (self.credential_hash(credential), self.revocation_registry.version)
+        cached = self.verification_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         public_key = self.get_public_key(credential)
 
         try:
@@ -113,17 +234,37 @@ class DecentralizedIdentity:
                 hashes.SHA256()
             )
             logging.info(f"Credential { credential_id} verified successfully.")
-            return True
+            verified = True
         except InvalidSignature:
             logging.error(f"Credential {credential_id} verification failed.")
-            return False
+            verified = False
+
+        self.verification_cache.set(cache_key, verified)
+        return verified
+
+    def verify_many(self, credential_ids: list) -> dict:
+        """Verify a batch of credentials on the worker pool."""
+        def verify(credential_id):
+            try:
+                return self.verify_credential(credential_id)
+            except Exception as e:
+                logging.error(f"Credential {credential_id} could not be verified: {e}")
+                return False
+
+        results = self.executor.map(verify, credential_ids)
+        return dict(zip(credential_ids, results))
+
+    def credential_hash(self, credential: dict) -> str:
+        """Hash the signed content of a credential."""
+        payload = json.dumps(credential["data"], sort_keys=True) + credential["signature"]
+        return hashlib.sha256(payload.encode()).hexdigest()
 
     def get_public_key(self, credential: dict):
         """Retrieve the public key from the credential."""
-        for identity in self.identities.values():
-            if credential in identity["identity"]["credentials"]:
-                return serialization.load_pem_public_key(identity["identity"]["public_key"])
-        raise Exception("Public key not found.")
+        entry = self.credential_index.get(credential["credential_id"])
+        if entry is None:
+            raise Exception("Public key not found.")
+        return entry["public_key"]
 
     def revoke_credential(self, user_id: str, credential_id: str) -> bool:
         """Revoke an issued credential."""
@@ -137,12 +278,21 @@ class DecentralizedIdentity:
             if credential["credential_id"] == credential_id:
                 credential["revoked"] = True
                 self.revocation_list[credential_id] = credential
+                self.revocation_registry.revoke(credential_id)
                 logging.info(f"Credential {credential_id} revoked for user: {user_id}")
                 return True
 
         logging.warning(f"Credential {credential_id} not found for user: {user_id}")
         return False
 
+    def export_revocation_snapshot(self) -> dict:
+        """Export the compressed revocation state for verifier nodes."""
+        return self.revocation_registry.snapshot()
+
+    def export_revocation_delta(self, since_version: int):
+        """Export revocations since a version, or None if a full snapshot is needed."""
+        return self.revocation_registry.delta_since(since_version)
+
     def present_credential(self, user_id: str, credential_id: str) -> dict:
         """Present a credential selectively."""
         if user_id not in self.identities:
@@ -174,6 +324,7 @@ if __name__ == "__main__":
         "role": "admin"
     }
     credential = did_system.issue_credential(user_id, credential_data)
+    did_system.flush_pins()
 
     # Verify the issued credential
     is_verified = did_system.verify_credential(credential["credential_id"])
@@ -2,7 +2,8 @@ import os
 import asyncio
 from generative_adversarial import DiscoveryEngine
 from swarm_intelligence import DevelopmentCoordinator
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 
@@ -13,6 +14,7 @@ class DecentralizedInnovation:
         self.server = Server(horizon_url)
         self.creativity_asset = Asset("CREATIVITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
 
     def setup_logger(self):
@@ -40,21 +42,11 @@ class DecentralizedInnovation:
             return None
 
         try:
-            tx = (
-                TransactionBuilder(
-                    source_account=await self.server.load_account(self.master_keypair.public_key),
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=innovator_public,
-                    asset=self.creativity_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=innovator_public,
+                asset=self.creativity_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Creativity token issued: {response['id']}")
             return response['id']
         except Exception as e:
@@ -1,7 +1,8 @@
 import asyncio
 from holographic_network import ValueMapper
 from zk_channel import TransferEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 from requests.exceptions import RequestException
@@ -10,9 +11,9 @@ class ValueTransatron:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.mapper = ValueMapper()
         self.engine = TransferEngine()
-        self.server = Server(horizon_url)
         self.reality_asset = Asset("REALITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
 
     def setup_logger(self):
@@ -36,22 +37,11 @@ class ValueTransatron:
 
     async def issue_reality_token(self, user_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=user_public,
-                    asset=self.reality_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=user_public,
+                asset=self.reality_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.submit_transaction(tx)
             self.logger.info(f"Reality token issued: {response['id']}")
             return response['id']
         except RequestException as e:
@@ -61,14 +51,6 @@ class ValueTransatron:
             self.logger.error(f"Error issuing reality token: {e}")
             raise
 
-    async def submit_transaction(self, transaction):
-        try:
-            response = await self.server.submit_transaction(transaction)
-            return response
-        except Exception as e:
-            self.logger.error(f"Transaction submission failed: {e}")
-            raise
-
 # Example usage
 async def main():
     horizon_url = "https://horizon.stellar.org"
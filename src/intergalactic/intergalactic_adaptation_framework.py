@@ -1,7 +1,8 @@
 import asyncio
 from quantum_inspired import FuturePredictor
 from evolutionary_algo import AdaptationEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
@@ -14,6 +15,7 @@ class IntergalacticAdaptationFramework:
         self.server = Server(horizon_url)
         self.frontier_asset = Asset("FRONTIER", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.logger = self.setup_logger()
     
@@ -35,21 +37,12 @@ class IntergalacticAdaptationFramework:
     async def allocate_revenue(self, amount):
         try:
             base_fee = await self.get_dynamic_fee()
-            tx = (
-                TransactionBuilder(
-                    source_account=self.server.load_account(self.master_keypair.public_key),
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=base_fee
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.frontier_asset,
-                    amount=str(amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.frontier_asset,
+                amount=str(amount),
+                base_fee=base_fee
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Revenue allocated to {self.project_wallet}: {response['id']}")
             return response['id']
         except Exception as e:
@@ -3,13 +3,17 @@ import requests
 import logging
 import time
 import os
+from chain_transport import AsyncChainTransport, ConfirmationWatcher, backoff_delay
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class CrossChainInteroperability:
-    def __init__(self, config_file='config.json'):
-        self.blockchain_apis = self.load_config(config_file)
+    def __init__(self, config_file='config.json', blockchain_apis: dict = None):
+        self.blockchain_apis = blockchain_apis if blockchain_apis is not None else self.load_config(config_file)
+        self.session = requests.Session()  # Pooled connections for blocking calls
+        self.transport = AsyncChainTransport(self.blockchain_apis)
+        self.watcher = ConfirmationWatcher(self.transport)
 
     def load_config(self, config_file):
         """Load blockchain API configuration from a JSON file."""
@@ -52,14 +56,39 @@ class CrossChainInteroperability:
         """Make an HTTP request with retries."""
         for attempt in range(retries):
             try:
-                response = requests.post(url, headers=headers, json=payload)
+                response = self.session.post(url, headers=headers, json=payload)
                 response.raise_for_status()  # Raise an error for bad responses
                 return response
             except requests.exceptions.RequestException as e:
                 logging.error(f"Request failed: {e}. Attempt {attempt + 1} of {retries}.")
-                time.sleep(2)  # Wait before retrying
+                if attempt + 1 < retries:
+                    time.sleep(backoff_delay(attempt))  # Back off with jitter before retrying
         raise Exception("Max retries exceeded for request.")
 
+    async def send_asset_async(self, from_chain: str, to_chain: str, amount: float, recipient_address: str) -> dict:
+        """Send assets over the pooled asyncio transport."""
+        if from_chain not in self.blockchain_apis or to_chain not in self.blockchain_apis:
+            raise ValueError("Unsupported blockchain.")
+
+        response = await self.transport.post(from_chain, "/send", {"amount": amount, "recipient": recipient_address})
+        if response.get("status") == "success":
+            logging.info(f"Successfully sent {amount} from {from_chain} to {to_chain}. Transaction ID: {response['transaction_id']}")
+            return response
+        logging.error(f"Failed to send asset: {response.get('error')}")
+        raise Exception("Asset transfer failed.")
+
+    async def confirm_transactions(self, chain: str, transaction_ids: list, timeout: float = 60) -> dict:
+        """Wait for many transactions to confirm, sharing batched status queries."""
+        if chain not in self.blockchain_apis:
+            raise ValueError("Unsupported blockchain.")
+        return await self.watcher.wait_for(chain, transaction_ids, timeout)
+
+    async def close(self):
+        """Stop confirmation polling and release pooled connections."""
+        await self.watcher.close()
+        await self.transport.close()
+        self.session.close()
+
     def receive_asset(self, from_chain: str, amount: float, sender_address: str) -> dict:
         """Receive assets from another blockchain."""
         if from_chain not in self.blockchain_apis:
@@ -89,9 +118,10 @@ class CrossChainInteroperability:
             raise ValueError("Unsupported blockchain.")
 
         logging.info(f"Retrieving balance for address {address} on {chain}.")
-        response = self.make_request(f"{self.blockchain_apis[chain]['url']}/balance", 
-                                      {"Authorization": f"Bearer {self.blockchain_apis[chain]['api_key']}"}, 
-                                      {"address": address})
+        response = self.handle_response(
+            self.make_request(f"{self.blockchain_apis[chain]['url']}/balance",
+                              {"Authorization": f"Bearer {self.blockchain_apis[chain]['api_key']}"},
+                              {"address": address}))
 
         if response.get("status") == "success":
             balance = response['balance']
@@ -104,16 +134,21 @@ class CrossChainInteroperability:
     def confirm_transaction(self, chain: str, transaction_id: str, timeout: int = 60) -> bool:
         """Confirm a transaction on the specified blockchain."""
         start_time = time.time()
+        attempt = 0
         while time.time() - start_time < timeout:
             logging.info(f"Checking transaction status for {transaction_id} on {chain}.")
-            response = self.make_request(f"{self.blockchain_apis[chain]['url']}/transaction/{transaction_id}", 
-                                          {"Authorization": f"Bearer {self.blockchain_apis[chain]['api_key']}"}, 
-                                          {})
+            response = self.handle_response(
+                self.make_request(f"{self.blockchain_apis[chain]['url']}/transaction/{transaction_id}",
+                                  {"Authorization": f"Bearer {self.blockchain_apis[chain]['api_key']}"},
+                                  {}))
 
             if response.get("status") == "success" and response['confirmed']:
                 logging.info(f"Transaction {transaction_id} confirmed on {chain}.")
                 return True
-            time.sleep(5)  # Wait before checking again
+            # Back off between checks, without sleeping past the timeout
+            remaining = timeout - (time.time() - start_time)
+            time.sleep(max(0, min(remaining, backoff_delay(attempt, base_delay=1.0, max_delay=10.0))))
+            attempt += 1
         logging.warning(f"Transaction {transaction_id} not confirmed within timeout.")
         return False
 
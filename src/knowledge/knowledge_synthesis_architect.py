@@ -10,7 +10,8 @@ import asyncio
 from typing import Dict, List, Optional
 from hashlib import sha256
 import numpy as np
-from stellar_sdk import Server, TransactionBuilder, Network, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from config import Config
 from ai_analysis import KnowledgeProcessor  # Assumed module for AI analysis
 from human_machine_symbiosis import ReasoningEngine  # Assumed module for reasoning
@@ -32,9 +33,9 @@ class KnowledgeSynthesisArchitect:
             master_secret (Optional[str]): Master private key (load from env for security).
         """
         self.logger = logging.getLogger("KnowledgeSynthesisArchitect")
-        self.server = Server(horizon_url)
         self.insight_asset = Asset("INSIGHT", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret) if master_secret else None
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair) if self.master_keypair else None
         self.project_wallet = Config.PROJECT_WALLET_ADDRESS
         self.knowledge_processor = KnowledgeProcessor()  # Process knowledge data
         self.reasoning_engine = ReasoningEngine()  # Generate insights
@@ -128,28 +129,12 @@ class KnowledgeSynthesisArchitect:
             raise ValueError("Master secret not configured for Stellar transactions")
 
         try:
-            # Load source account
-            source_account = await self.server.load_account(self.master_keypair.public_key)
-
-            # Build Stellar transaction
-            tx = (
-                TransactionBuilder(
-                    source_account=source_account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=self.project_wallet,
-                    asset=self.insight_asset,
-                    amount=str(amount)
-                )
-                .set_timeout(30)
-                .build()
+            # Queued with other master-account payouts and sent as one multi-operation transaction
+            response = await self.payouts.pay(
+                destination=self.project_wallet,
+                asset=self.insight_asset,
+                amount=str(amount)
             )
-
-            # Sign and submit transaction
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             tx_id = response["id"]
             self.logger.info(f"Revenue of {amount} INSIGHT allocated to {self.project_wallet}: {tx_id}")
             return tx_id
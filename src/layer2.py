@@ -1,15 +1,29 @@
 import json
 import logging
 import hashlib
+import heapq
+import itertools
+import secrets
 import time
-import random
-from threading import Thread, Event
+from collections import deque
+from threading import Condition, Thread, Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class PaymentChannel:
-    def __init__(self, party_a: str, party_b: str, capacity: float, multi_sig_required: int = 2):
+    """Two-party channel whose history is compacted into its latest state.
+
+    Instead of a list of every payment, the channel keeps a state nonce that
+    increases with each update; signed_state() signs the current balances
+    and nonce, which is all a settlement needs. Hashlocked contracts (HTLCs)
+    lock funds until the payment preimage is revealed, which is what lets a
+    network forward payments across several channels.
+    """
+
+    def __init__(self, party_a: str, party_b: str, capacity: float, multi_sig_required: int = 2,
+                 signers: Optional[Dict[str, Any]] = None):
         self.party_a = party_a
         self.party_b = party_b
         self.capacity = capacity
@@ -18,8 +32,12 @@ class PaymentChannel:
         self.channel_id = self.generate_channel_id()
         self.is_open = True
         self.multi_sig_required = multi_sig_required
-        self.transaction_history = []
-        logging.info(f"Payment channel created between {party_a} and {party_b} with capacity {capacity}.")
+        self.signers = signers or {}  # Party -> object with sign(bytes), e.g. a stellar_sdk Keypair
+        self.nonce = 0
+        self.htlcs: Dict[str, Dict[str, Any]] = {}  # Payment hash -> locked amount, payer, expiry
+        self.lock = Lock()
+        self.watchtower: Optional[Watchtower] = None
+        logging.debug(f"Payment channel created between {party_a} and {party_b} with capacity {capacity}.")
 
     def generate_channel_id(self) -> str:
         """Generate a unique channel ID based on the parties involved."""
@@ -30,67 +48,444 @@ class PaymentChannel:
         if amount > self.capacity:
             raise ValueError("Amount exceeds channel capacity.")
         self.balance_a += amount
-        logging.info(f"{self.party_a} funded the channel with {amount}. New balance: {self.balance_a}")
+        self.nonce += 1
+        logging.debug(f"{self.party_a} funded the channel with {amount}. New balance: {self.balance_a}")
 
     def make_payment(self, amount: float, from_party: str) -> None:
         """Make a payment through the channel."""
         if not self.is_open:
             raise Exception("Channel is closed.")
-        if from_party == self.party_a:
-            if amount > self.balance_a:
-                raise ValueError("Insufficient balance for payment.")
+        with self.lock:
+            self._debit(from_party, amount)
+            self._credit(self.counterparty(from_party), amount)
+            self.nonce += 1
+        logging.debug(f"{from_party} paid {amount} to {self.counterparty(from_party)}.")
+
+    def counterparty(self, party: str) -> str:
+        if party == self.party_a:
+            return self.party_b
+        if party == self.party_b:
+            return self.party_a
+        raise ValueError("Invalid party.")
+
+    def spendable(self, party: str) -> float:
+        """Balance the party can send right now (HTLC-locked funds are excluded)."""
+        return self.balance_a if party == self.party_a else self.balance_b if party == self.party_b else 0.0
+
+    def _debit(self, party: str, amount: float) -> None:
+        if party not in (self.party_a, self.party_b):
+            raise ValueError("Invalid party.")
+        if amount > self.spendable(party):
+            raise ValueError("Insufficient balance for payment.")
+        if party == self.party_a:
             self.balance_a -= amount
-            self.balance_b += amount
-            self.transaction_history.append((time.time(), from_party, amount))
-            logging.info(f"{self.party_a} paid {amount} to {self.party_b}.")
-        elif from_party == self.party_b:
-            if amount > self.balance_b:
-                raise ValueError("Insufficient balance for payment.")
+        else:
             self.balance_b -= amount
+
+    def _credit(self, party: str, amount: float) -> None:
+        if party == self.party_a:
             self.balance_a += amount
-            self.transaction_history.append((time.time(), from_party, amount))
-            logging.info(f"{self.party_b} paid {amount} to {self.party_a}.")
         else:
-            raise ValueError("Invalid party.")
+            self.balance_b += amount
+
+    def add_htlc(self, payment_hash: str, amount: float, from_party: str, expiry: float) -> None:
+        """Lock `amount` from the payer until the preimage of `payment_hash` is revealed or it expires."""
+        if not self.is_open:
+            raise Exception("Channel is closed.")
+        with self.lock:
+            if payment_hash in self.htlcs:
+                raise ValueError("HTLC already exists for this payment hash.")
+            self._debit(from_party, amount)
+            self.htlcs[payment_hash] = {"amount": amount, "from": from_party, "expiry": expiry}
+            self.nonce += 1
+
+    def settle_htlc(self, payment_hash: str, preimage: bytes) -> None:
+        """Release a locked amount to the payee on presentation of the preimage."""
+        if hashlib.sha256(preimage).hexdigest() != payment_hash:
+            raise ValueError("Preimage does not match payment hash.")
+        with self.lock:
+            htlc = self.htlcs.pop(payment_hash)
+            self._credit(self.counterparty(htlc["from"]), htlc["amount"])
+            self.nonce += 1
+
+    def fail_htlc(self, payment_hash: str) -> None:
+        """Return a locked amount to the payer."""
+        with self.lock:
+            htlc = self.htlcs.pop(payment_hash, None)
+            if htlc:
+                self._credit(htlc["from"], htlc["amount"])
+                self.nonce += 1
+
+    def state_digest(self) -> bytes:
+        return hashlib.sha256(f"{self.channel_id}:{self.nonce}:{self.balance_a}:{self.balance_b}".encode()).digest()
+
+    def signed_state(self) -> dict:
+        """The latest channel state, signed by whichever parties have signers."""
+        digest = self.state_digest()
+        return {
+            "channel_id": self.channel_id,
+            "nonce": self.nonce,
+            "final_balance_a": self.balance_a,
+            "final_balance_b": self.balance_b,
+            "signatures": {party: signer.sign(digest).hex() for party, signer in self.signers.items()}
+        }
 
     def close_channel(self) -> dict:
         """Close the payment channel and settle the final balance."""
         if not self.is_open:
             raise Exception("Channel is already closed.")
+        if self.htlcs:
+            raise Exception("Channel has pending HTLCs.")
         self.is_open = False
         logging.info(f"Closing channel {self.channel_id}. Final balances: {self.balance_a}, {self.balance_b}")
         return self.settle_on_chain()
 
     def settle_on_chain(self) -> dict:
-        """Mock function to settle the final balance on the blockchain."""
-        # Simulate a delay for on-chain settlement
-        time.sleep(1)
+        """Settlement record for this channel alone; networks batch these (see SettlementBatcher)."""
         logging.info(f"Settling channel {self.channel_id} on-chain.")
-        return {
-            "channel_id": self.channel_id,
-            "final_balance_a": self.balance_a,
-            "final_balance_b": self.balance_b,
-            "transaction_history": self.transaction_history
-        }
+        return self.signed_state()
 
-    def dispute_resolution(self, timeout: int = 30) -> None:
-        """Handle dispute resolution with a timeout."""
+    def dispute_resolution(self, timeout: float = 30, watchtower: Optional["Watchtower"] = None) -> None:
+        """Open a dispute; the channel is closed unless resolve_dispute() is called within `timeout`.
+
+        Returns immediately. The deadline is tracked by a watchtower shared
+        by all channels rather than by a thread per dispute.
+        """
         logging.info("Dispute resolution initiated.")
-        event = Event()
+        self.watchtower = watchtower if watchtower is not None else get_watchtower()
+        self.watchtower.watch(("dispute", self.channel_id), timeout, self.expire_dispute)
+
+    def resolve_dispute(self) -> bool:
+        """Cancel the dispute deadline; returns False if there was none pending."""
+        if self.watchtower is not None and self.watchtower.cancel(("dispute", self.channel_id)):
+            logging.info("Dispute resolved successfully.")
+            return True
+        return False
+
+    def expire_dispute(self) -> None:
+        """Refund HTLCs that have expired and close the channel.
+
+        If HTLCs are still pending, the deadline moves to the latest of
+        their expiries instead.
+        """
+        logging.warning("Dispute resolution timed out. Channel will be closed.")
+        clock = self.watchtower.clock if self.watchtower is not None else time.time
+        remaining = self.fail_expired_htlcs(clock())
+        if remaining is not None:
+            self.watchtower.watch(("dispute", self.channel_id), remaining - clock(), self.expire_dispute)
+        elif self.is_open:
+            self.close_channel()
+
+    def fail_expired_htlcs(self, now: float) -> Optional[float]:
+        """Refund HTLCs that expired by `now`; returns the latest expiry still pending, if any."""
+        for payment_hash, htlc in list(self.htlcs.items()):
+            if htlc["expiry"] <= now:
+                self.fail_htlc(payment_hash)
+        with self.lock:
+            return max((htlc["expiry"] for htlc in self.htlcs.values()), default=None)
+
+class Watchtower:
+    """Tracks dispute and channel deadlines for any number of channels on one thread.
 
-        def wait_for_resolution():
-            event.wait(timeout)
-            if not event.is_set():
-                logging.warning("Dispute resolution timed out. Channel will be closed.")
-                self.close_channel()
+    Deadlines live in a heap keyed by caller-chosen keys. Cancelling only
+    marks the entry dead (O(1)); dead entries are skipped when they reach
+    the top and the heap is rebuilt once they outnumber live ones. Call
+    start() to fire callbacks from a background thread, or run_due() to fire
+    them from the caller's loop.
+    """
 
-        thread = Thread(target=wait_for_resolution)
-        thread.start()
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.heap: List[list] = []  # [deadline, tie-breaker, key, callback, live]
+        self.entries: Dict[Hashable, list] = {}
+        self.counter = itertools.count()
+        self.condition = Condition()
+        self.thread: Optional[Thread] = None
+        self.running = False
 
-        # Simulate some resolution process
-        time.sleep(random.randint(1, timeout))
-        event.set()
-        logging.info("Dispute resolved successfully.")
+    def watch(self, key: Hashable, timeout: float, callback: Callable[[], Any]) -> None:
+        """Call `callback` after `timeout` seconds unless `key` is cancelled first.
+
+        Watching a key again replaces its earlier deadline.
+        """
+        with self.condition:
+            self._cancel(key)
+            entry = [self.clock() + timeout, next(self.counter), key, callback, True]
+            self.entries[key] = entry
+            heapq.heappush(self.heap, entry)
+            if self.heap[0] is entry:
+                self.condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        with self.condition:
+            return self._cancel(key)
+
+    def _cancel(self, key: Hashable) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[4] = False
+        if len(self.heap) > 64 and len(self.entries) < len(self.heap) // 2:
+            self.heap = [live for live in self.heap if live[4]]
+            heapq.heapify(self.heap)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _pop_due(self, now: float) -> List[list]:
+        due = []
+        while self.heap and (not self.heap[0][4] or self.heap[0][0] <= now):
+            entry = heapq.heappop(self.heap)
+            if entry[4]:
+                entry[4] = False
+                del self.entries[entry[2]]
+                due.append(entry)
+        return due
+
+    def _fire(self, due: List[list]) -> None:
+        for _, _, key, callback, _ in due:
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Watchtower callback for {key} failed: {e}")
+
+    def run_due(self, now: Optional[float] = None) -> int:
+        """Fire every callback whose deadline has passed; returns how many fired."""
+        with self.condition:
+            due = self._pop_due(self.clock() if now is None else now)
+        self._fire(due)
+        return len(due)
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                while self.running:
+                    due = self._pop_due(self.clock())
+                    if due:
+                        break
+                    timeout = self.heap[0][0] - self.clock() if self.heap else None
+                    self.condition.wait(timeout)
+                if not self.running:
+                    return
+            self._fire(due)
+
+    def start(self) -> "Watchtower":
+        with self.condition:
+            if self.running:
+                return self
+            self.running = True
+        self.thread = Thread(target=self._run, name="watchtower", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+_watchtower: Optional[Watchtower] = None
+_watchtower_lock = Lock()
+
+def get_watchtower() -> Watchtower:
+    """Process-wide watchtower, started on first use."""
+    global _watchtower
+    with _watchtower_lock:
+        if _watchtower is None:
+            _watchtower = Watchtower().start()
+        return _watchtower
+
+class SettlementBatcher:
+    """Collects closed channels and settles them together in one on-chain settlement.
+
+    Final balances are netted per party across all channels in the batch,
+    so the settlement pays each party once. `submit` receives the batch
+    record and performs the on-chain step; without one the record is just
+    returned.
+    """
+
+    def __init__(self, submit: Optional[Callable[[dict], Any]] = None, max_batch: int = 100):
+        self.submit = submit
+        self.max_batch = max_batch
+        self.pending: List[dict] = []
+        self.settlements = 0
+
+    def add(self, channel: PaymentChannel) -> Optional[dict]:
+        """Queue a closed channel's final state; settles once `max_batch` are queued."""
+        self.pending.append({**channel.signed_state(), "party_a": channel.party_a, "party_b": channel.party_b})
+        if len(self.pending) >= self.max_batch:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[dict]:
+        if not self.pending:
+            return None
+        states, self.pending = self.pending, []
+        payouts: Dict[str, float] = {}
+        for state in states:
+            payouts[state["party_a"]] = payouts.get(state["party_a"], 0.0) + state["final_balance_a"]
+            payouts[state["party_b"]] = payouts.get(state["party_b"], 0.0) + state["final_balance_b"]
+        batch = {
+            "settlement_id": hashlib.sha256("".join(state["channel_id"] for state in states).encode()).hexdigest(),
+            "channels": states,
+            "payouts": {party: amount for party, amount in payouts.items() if amount > 0}
+        }
+        self.settlements += 1
+        logging.info(f"Settling {len(states)} channels on-chain in one settlement.")
+        if self.submit:
+            self.submit(batch)
+        return batch
+
+class Layer2Network:
+    """A graph of payment channels with multi-hop, hashlocked payments and batched settlement.
+
+    Payments between parties without a direct channel are routed over the
+    fewest hops whose senders can each forward the amount. The payee's
+    secret hash locks the amount on every hop; revealing the secret settles
+    the hops from the payee backwards, and a failure on any hop unlocks the
+    ones already added.
+    """
+
+    def __init__(self, settle: Optional[Callable[[dict], Any]] = None, max_settlement_batch: int = 100,
+                 htlc_timeout: float = 60.0, max_route_attempts: int = 3,
+                 watchtower: Optional[Watchtower] = None):
+        self.channels: Dict[str, PaymentChannel] = {}
+        self.graph: Dict[str, Dict[str, Set[str]]] = {}  # Party -> neighbour -> channel ids
+        self.settlement = SettlementBatcher(settle, max_settlement_batch)
+        self.htlc_timeout = htlc_timeout
+        self.max_route_attempts = max_route_attempts
+        self._watchtower = watchtower
+
+    @property
+    def watchtower(self) -> Watchtower:
+        if self._watchtower is None:
+            self._watchtower = get_watchtower()
+        return self._watchtower
+
+    def clock(self) -> float:
+        """Current time on the watchtower's clock, which HTLC expiries use too."""
+        return self._watchtower.clock() if self._watchtower is not None else time.time()
+
+    def open_channel(self, party_a: str, party_b: str, capacity: float,
+                     signers: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> PaymentChannel:
+        """Open a channel; with a `timeout` it is closed and settled automatically once that passes."""
+        channel = PaymentChannel(party_a, party_b, capacity, signers=signers)
+        self.channels[channel.channel_id] = channel
+        if timeout is not None:
+            self.watchtower.watch(("timeout", channel.channel_id), timeout,
+                                  lambda: self._expire(channel.channel_id, "timeout"))
+        self.graph.setdefault(party_a, {}).setdefault(party_b, set()).add(channel.channel_id)
+        self.graph.setdefault(party_b, {}).setdefault(party_a, set()).add(channel.channel_id)
+        return channel
+
+    def _best_channel(self, sender: str, receiver: str, amount: float,
+                      excluded: Set[str]) -> Optional[PaymentChannel]:
+        best = None
+        for channel_id in self.graph.get(sender, {}).get(receiver, ()):
+            channel = self.channels[channel_id]
+            if channel_id in excluded or not channel.is_open:
+                continue
+            spendable = channel.spendable(sender)
+            if spendable >= amount and (best is None or spendable > best.spendable(sender)):
+                best = channel
+        return best
+
+    def find_route(self, source: str, target: str, amount: float,
+                   excluded: Optional[Set[str]] = None) -> Optional[List[PaymentChannel]]:
+        """Fewest-hop path of channels that can each carry `amount` towards the target."""
+        excluded = excluded or set()
+        previous: Dict[str, tuple] = {source: (None, None)}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                break
+            for neighbour in self.graph.get(node, {}):
+                if neighbour in previous:
+                    continue
+                channel = self._best_channel(node, neighbour, amount, excluded)
+                if channel:
+                    previous[neighbour] = (node, channel)
+                    queue.append(neighbour)
+        if target not in previous or source == target:
+            return None
+        route = []
+        node = target
+        while node != source:
+            node, channel = previous[node]
+            route.append(channel)
+        return route[::-1]
+
+    def pay(self, source: str, target: str, amount: float) -> dict:
+        """Route a payment over one or more channels using a fresh hashlock."""
+        excluded: Set[str] = set()
+        for _ in range(self.max_route_attempts):
+            route = self.find_route(source, target, amount, excluded)
+            if route is None:
+                break
+            preimage = secrets.token_bytes(32)
+            payment_hash = hashlib.sha256(preimage).hexdigest()
+            expiry = self.clock() + self.htlc_timeout
+            locked = []
+            sender = source
+            try:
+                for channel in route:
+                    channel.add_htlc(payment_hash, amount, sender, expiry)
+                    locked.append(channel)
+                    sender = channel.counterparty(sender)
+            except Exception:
+                # A hop's balance changed or it was closed since routing; unlock and try around it
+                for channel in locked:
+                    channel.fail_htlc(payment_hash)
+                excluded.add(route[len(locked)].channel_id)
+                continue
+            for channel in reversed(route):
+                channel.settle_htlc(payment_hash, preimage)
+            return {"payment_hash": payment_hash, "hops": len(route),
+                    "route": [channel.channel_id for channel in route]}
+        raise ValueError(f"No route from {source} to {target} with capacity for {amount}.")
+
+    def open_dispute(self, channel_id: str, timeout: float) -> None:
+        """Close and settle the channel unless resolve_dispute() is called within `timeout`."""
+        self.watchtower.watch(("dispute", channel_id), timeout, lambda: self._expire(channel_id, "dispute"))
+
+    def resolve_dispute(self, channel_id: str) -> bool:
+        return self.watchtower.cancel(("dispute", channel_id))
+
+    def _expire(self, channel_id: str, kind: str) -> None:
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            return
+        remaining = channel.fail_expired_htlcs(self.clock())
+        if remaining is not None:
+            # Pending HTLCs block the close; try again once the last of them expires
+            self.watchtower.watch((kind, channel_id), remaining - self.clock(),
+                                  lambda: self._expire(channel_id, kind))
+            return
+        self.close_channel(channel_id)
+
+    def close_channel(self, channel_id: str) -> Optional[dict]:
+        """Close a channel and queue it for the next batched settlement."""
+        channel = self.channels[channel_id]
+        if channel.htlcs:
+            raise Exception("Channel has pending HTLCs.")
+        del self.channels[channel_id]
+        if self._watchtower is not None:
+            self._watchtower.cancel(("timeout", channel_id))
+            self._watchtower.cancel(("dispute", channel_id))
+        channel.is_open = False
+        for a, b in ((channel.party_a, channel.party_b), (channel.party_b, channel.party_a)):
+            self.graph[a][b].discard(channel_id)
+            if not self.graph[a][b]:
+                del self.graph[a][b]
+        return self.settlement.add(channel)
+
+    def settle(self) -> Optional[dict]:
+        """Settle every queued channel now."""
+        return self.settlement.flush()
 
 # Example usage of the PaymentChannel class
 if __name__ == "__main__":
@@ -107,9 +502,10 @@ if __name__ == "__main__":
     except ValueError as e:
         logging.error(f"Payment error: {e}")
 
+    # Open a dispute and resolve it before the deadline
+    channel.dispute_resolution(timeout=30)
+    channel.resolve_dispute()
+
     # Close the channel
     final_settlement = channel.close_channel()
     print(f"Final settlement: {json.dumps(final_settlement, indent=2)}")
-
-    # Simulate dispute resolution
-    channel.dispute_resolution()
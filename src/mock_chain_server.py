@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from uuid import uuid4
+from aiohttp import web
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class MockChainServer:
+    """Local stand-in for a chain bridge API, used by tests and benchmarks.
+
+    Transactions submitted to /send confirm after confirmation_delay seconds.
+    fail_next(n) makes the next n requests return HTTP 503 so retry and
+    circuit-breaker behaviour can be exercised.
+    """
+
+    def __init__(self, confirmation_delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.confirmation_delay = confirmation_delay
+        self.host = host
+        self.port = port
+        self.transactions = {}  # transaction_id -> submission time
+        self.balances = {}
+        self.request_count = 0
+        self.status_queries = 0
+        self.failures_remaining = 0
+        self.runner = None
+        self.url = None
+
+    def fail_next(self, count: int):
+        """Fail the next few requests with HTTP 503."""
+        self.failures_remaining = count
+
+    def is_confirmed(self, transaction_id: str) -> bool:
+        submitted_at = self.transactions.get(transaction_id)
+        return submitted_at is not None and time.monotonic() - submitted_at >= self.confirmation_delay
+
+    @web.middleware
+    async def _count_and_fail(self, request, handler):
+        self.request_count += 1
+        if self.failures_remaining > 0:
+            self.failures_remaining -= 1
+            return web.json_response({"status": "error", "error": "Service unavailable"}, status=503)
+        return await handler(request)
+
+    async def _send(self, request):
+        payload = await request.json()
+        transaction_id = str(uuid4())
+        self.transactions[transaction_id] = time.monotonic()
+        recipient = payload.get("recipient")
+        self.balances[recipient] = self.balances.get(recipient, 0) + payload.get("amount", 0)
+        return web.json_response({"status": "success", "transaction_id": transaction_id})
+
+    async def _balance(self, request):
+        payload = await request.json()
+        return web.json_response({"status": "success", "balance": self.balances.get(payload.get("address"), 0)})
+
+    async def _transaction(self, request):
+        transaction_id = request.match_info["transaction_id"]
+        if transaction_id not in self.transactions:
+            return web.json_response({"status": "error", "error": "Unknown transaction"}, status=404)
+        return web.json_response({"status": "success", "confirmed": self.is_confirmed(transaction_id)})
+
+    async def _transaction_statuses(self, request):
+        self.status_queries += 1
+        payload = await request.json()
+        statuses = {
+            transaction_id: {"confirmed": self.is_confirmed(transaction_id)}
+            for transaction_id in payload.get("transaction_ids", [])
+            if transaction_id in self.transactions
+        }
+        return web.json_response({"status": "success", "statuses": statuses})
+
+    async def start(self) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application(middlewares=[self._count_and_fail])
+        app.router.add_post("/send", self._send)
+        app.router.add_post("/balance", self._balance)
+        app.router.add_route("*", "/transaction/{transaction_id}", self._transaction)
+        app.router.add_post("/transactions/status", self._transaction_statuses)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}"
+        logging.info(f"Mock chain server listening on {self.url}")
+        return self.url
+
+    async def stop(self):
+        """Stop serving."""
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+# Example usage of the MockChainServer class
+if __name__ == "__main__":
+    async def main():
+        server = MockChainServer(confirmation_delay=1.0)
+        print(f"Serving on {await server.start()}")
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from aiohttp import web
+from stellar_sdk import Network, TransactionEnvelope
+from stellar_sdk.operation import CreateAccount, Payment
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class MockHorizon:
+    """In-process Horizon stand-in for tests and offline benchmarks.
+
+    Serves account lookups and transaction submission with real XDR
+    decoding and sequence-number checks, so clients see tx_bad_seq exactly
+    as they would against a live network. `latency` adds a fixed delay per
+    request to approximate a network round-trip.
+    """
+
+    def __init__(self, network_passphrase: str = Network.PUBLIC_NETWORK_PASSPHRASE, latency: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.network_passphrase = network_passphrase
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.accounts = {}  # account_id -> {"sequence": int, "balances": {asset: Decimal}}
+        self.transactions = {}  # hash -> submission response
+        self.payments = []  # (source, destination, asset, amount)
+        self.payment_records = []  # Horizon payment operation records, oldest first
+        self.ledger = 1
+        self.account_loads = 0
+        self.payment_queries = 0
+        self.submissions = 0
+        self.failures_remaining = 0
+        self.runner = None
+        self.url = None
+
+    def create_account(self, account_id: str, balance: str = "10000", sequence: int = 0) -> None:
+        """Fund an account directly, bypassing transactions."""
+        self.accounts[account_id] = {"sequence": sequence, "balances": {"native": Decimal(balance)},
+                                     "last_modified_ledger": self.ledger}
+
+    def fail_next(self, count: int) -> None:
+        """Answer the next few submissions with HTTP 504, as Horizon does on submission timeouts."""
+        self.failures_remaining = count
+
+    def balance(self, account_id: str, asset: str = "native") -> Decimal:
+        return self.accounts[account_id]["balances"].get(asset, Decimal(0))
+
+    @staticmethod
+    def _error(status: int, title: str, extras: dict = None):
+        body = {"type": "https://stellar.org/horizon-errors/transaction_failed", "title": title, "status": status}
+        if extras is not None:
+            body["extras"] = extras
+        return web.json_response(body, status=status)
+
+    @web.middleware
+    async def _delay_and_fail(self, request, handler):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failures_remaining > 0 and request.method == "POST":
+            self.failures_remaining -= 1
+            return self._error(504, "Timeout")
+        return await handler(request)
+
+    def _account_body(self, account_id: str) -> dict:
+        account = self.accounts[account_id]
+        balances = [
+            {"asset_type": "native", "balance": str(amount)} if asset == "native" else
+            {"asset_type": "credit_alphanum12" if len(asset.split(":")[0]) > 4 else "credit_alphanum4",
+             "asset_code": asset.split(":")[0], "asset_issuer": asset.split(":")[1], "balance": str(amount)}
+            for asset, amount in account["balances"].items()
+        ]
+        return {
+            "id": account_id,
+            "account_id": account_id,
+            "sequence": str(account["sequence"]),
+            "subentry_count": 0,
+            "last_modified_ledger": account["last_modified_ledger"],
+            "thresholds": {"low_threshold": 0, "med_threshold": 0, "high_threshold": 0},
+            "flags": {"auth_required": False, "auth_revocable": False},
+            "balances": balances,
+            "signers": [{"key": account_id, "weight": 1, "type": "ed25519_public_key"}],
+            "data": {}
+        }
+
+    async def _get_account(self, request):
+        self.account_loads += 1
+        account_id = request.match_info["account_id"]
+        if account_id not in self.accounts:
+            return self._error(404, "Resource Missing")
+        return web.json_response(self._account_body(account_id))
+
+    async def _get_payments(self, request):
+        self.payment_queries += 1
+        account_id = request.match_info["account_id"]
+        if account_id not in self.accounts:
+            return self._error(404, "Resource Missing")
+        cursor = int(request.query.get("cursor") or 0)
+        limit = int(request.query.get("limit", 10))
+        records = [
+            record for record in self.payment_records
+            if account_id in (record["from"], record["to"]) and int(record["paging_token"]) > cursor
+        ]
+        if request.query.get("order") == "desc":
+            records.reverse()
+        return web.json_response({"_embedded": {"records": records[:limit]}, "_links": {}})
+
+    async def _get_transaction(self, request):
+        transaction_hash = request.match_info["transaction_hash"]
+        if transaction_hash not in self.transactions:
+            return self._error(404, "Resource Missing")
+        return web.json_response(self.transactions[transaction_hash])
+
+    def _check_operations(self, operations) -> list:
+        """Result code per operation; payments need an existing destination."""
+        created, codes = set(), []
+        for operation in operations:
+            if isinstance(operation, CreateAccount):
+                created.add(operation.destination)
+                codes.append("op_success")
+            elif isinstance(operation, Payment):
+                destination = operation.destination.account_id
+                exists = destination in self.accounts or destination in created
+                codes.append("op_success" if exists else "op_no_destination")
+            else:
+                codes.append("op_success")
+        return codes
+
+    async def _submit(self, request):
+        self.submissions += 1
+        form = await request.post()
+        envelope = TransactionEnvelope.from_xdr(form["tx"], self.network_passphrase)
+        tx = envelope.transaction
+        source_id = tx.source.account_id
+        transaction_hash = envelope.hash_hex()
+        failed = {"envelope_xdr": form["tx"], "result_xdr": ""}
+
+        if source_id not in self.accounts:
+            return self._error(400, "Transaction Failed", dict(failed, result_codes={"transaction": "tx_no_source_account"}))
+        if not envelope.signatures:
+            return self._error(400, "Transaction Failed", dict(failed, result_codes={"transaction": "tx_bad_auth"}))
+        if tx.sequence != self.accounts[source_id]["sequence"] + 1:
+            return self._error(400, "Transaction Failed", dict(failed, result_codes={"transaction": "tx_bad_seq"}))
+
+        self.accounts[source_id]["sequence"] = tx.sequence
+        self.accounts[source_id]["last_modified_ledger"] = self.ledger + 1
+        operation_codes = self._check_operations(tx.operations)
+        if any(code != "op_success" for code in operation_codes):
+            # Failed transactions still consume the sequence number but apply no operations
+            self.ledger += 1
+            return self._error(400, "Transaction Failed", dict(
+                failed, result_codes={"transaction": "tx_failed", "operations": operation_codes}))
+
+        for operation in tx.operations:
+            op_source = operation.source.account_id if operation.source else source_id
+            if isinstance(operation, CreateAccount):
+                self.create_account(operation.destination, operation.starting_balance, sequence=self.ledger << 32)
+            elif isinstance(operation, Payment):
+                asset = "native" if operation.asset.is_native() else f"{operation.asset.code}:{operation.asset.issuer}"
+                destination = operation.destination.account_id
+                amount = Decimal(operation.amount)
+                self.payments.append((op_source, destination, asset, amount))
+                self.payment_records.append(self._payment_record(op_source, destination, operation.asset,
+                                                                 amount, transaction_hash))
+                balances = self.accounts[destination]["balances"]
+                balances[asset] = balances.get(asset, Decimal(0)) + amount
+                self.accounts[destination]["last_modified_ledger"] = self.ledger + 1
+        self.ledger += 1
+        response = {
+            "id": transaction_hash,
+            "hash": transaction_hash,
+            "ledger": self.ledger,
+            "successful": True,
+            "source_account": source_id,
+            "source_account_sequence": str(tx.sequence),
+            "operation_count": len(tx.operations),
+            "envelope_xdr": form["tx"],
+            "result_xdr": ""
+        }
+        self.transactions[transaction_hash] = response
+        return web.json_response(response)
+
+    def _payment_record(self, source: str, destination: str, asset, amount: Decimal, transaction_hash: str) -> dict:
+        paging_token = str((self.ledger << 12) + len(self.payment_records))
+        record = {
+            "id": paging_token,
+            "paging_token": paging_token,
+            "type": "payment",
+            "transaction_successful": True,
+            "transaction_hash": transaction_hash,
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "from": source,
+            "to": destination,
+            "amount": str(amount),
+            "asset_type": "native" if asset.is_native() else asset.type,
+        }
+        if not asset.is_native():
+            record["asset_code"] = asset.code
+            record["asset_issuer"] = asset.issuer
+        return record
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._delay_and_fail])
+        app.router.add_get("/accounts/{account_id}", self._get_account)
+        app.router.add_get("/accounts/{account_id}/payments", self._get_payments)
+        app.router.add_get("/transactions/{transaction_hash}", self._get_transaction)
+        app.router.add_post("/transactions", self._submit)
+        return app
+
+    async def start(self) -> str:
+        """Start serving and return the base URL."""
+        self.runner = web.AppRunner(self.build_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{self.host}:{port}/"
+        logging.info(f"Mock Horizon listening on {self.url}")
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
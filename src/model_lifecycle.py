@@ -0,0 +1,154 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.preprocessing import StandardScaler
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class ModelLifecycle:
+    """Keeps a fitted regressor and its scaler across cycles and retrains only when needed.
+
+    observe() adds the rows of each fetched dataset that have not been seen
+    before (rows are identified by content hash) to a training window of
+    at most `window_size` rows. New rows are scored before the model learns
+    from them, and count as drift when their error exceeds `error_drift`
+    times the running mean of earlier batches' errors (once at least
+    `min_baseline_rows` rows have been scored), or when a feature
+    mean is more than `feature_drift` scaler standard deviations from the
+    fitted mean. retrain() then:
+
+    - fits scaler and model from scratch when there is no model yet, on
+      drift, or when warm starts would push the forest past `max_estimators`;
+    - otherwise, if `retrain_interval` seconds have passed and new rows
+      arrived, adds `warm_start_estimators` trees fitted on the current
+      window, keeping the existing trees and scaling;
+    - otherwise leaves the model untouched.
+
+    Warm starts need an estimator with `warm_start` and `n_estimators`
+    (e.g. a random forest); other estimators are refit on schedule.
+    """
+
+    def __init__(self, model, feature_columns: Sequence[str], target_column: str,
+                 retrain_interval: float = 3600.0, window_size: int = 5000, warm_start_estimators: int = 10,
+                 max_estimators: int = 300, error_drift: float = 3.0, feature_drift: float = 3.0,
+                 min_baseline_rows: int = 50, clock: Callable[[], float] = time.time):
+        self.template = clone(model)
+        self.model = model
+        self.scaler = StandardScaler()
+        self.feature_columns = list(feature_columns)
+        self.target_column = target_column
+        self.retrain_interval = retrain_interval
+        self.window_size = window_size
+        self.warm_start_estimators = warm_start_estimators
+        self.max_estimators = max_estimators
+        self.error_drift = error_drift
+        self.feature_drift = feature_drift
+        self.clock = clock
+        self.window = pd.DataFrame(columns=self.feature_columns + [target_column])
+        self.seen: deque = deque()  # Row hashes in the window, oldest first
+        self.seen_set = set()
+        self.fitted = False
+        self.fitted_at: Optional[float] = None
+        self.error_baseline: Optional[float] = None  # Mean absolute error on rows not yet trained on
+        self.error_smoothing = 0.2
+        self.baseline_rows = 0
+        self.min_baseline_rows = min_baseline_rows
+        self.new_rows = 0
+        self.drift = False
+        self.stats = {"full_fits": 0, "warm_starts": 0, "skipped": 0, "drift_events": 0}
+
+    def _row_hashes(self, data: pd.DataFrame) -> np.ndarray:
+        return pd.util.hash_pandas_object(data[self.feature_columns + [self.target_column]], index=False).to_numpy()
+
+    def observe(self, data: pd.DataFrame) -> int:
+        """Add unseen rows to the training window, checking them for drift first. Returns how many were new."""
+        hashes = self._row_hashes(data)
+        is_new = np.array([value not in self.seen_set for value in hashes], dtype=bool)
+        new = data.loc[is_new, self.feature_columns + [self.target_column]]
+        if new.empty:
+            return 0
+        if self.fitted and not self.drift and self.detect_drift(new):
+            self.drift = True
+            self.stats["drift_events"] += 1
+        self.window = pd.concat([self.window, new], ignore_index=True) if len(self.window) else new.reset_index(drop=True)
+        for value in hashes[is_new]:
+            self.seen.append(value)
+            self.seen_set.add(value)
+        excess = len(self.window) - self.window_size
+        if excess > 0:
+            self.window = self.window.iloc[excess:].reset_index(drop=True)
+            for _ in range(excess):
+                self.seen_set.discard(self.seen.popleft())
+        self.new_rows += len(new)
+        return len(new)
+
+    def detect_drift(self, new: pd.DataFrame) -> bool:
+        scaled = self.scaler.transform(new[self.feature_columns].to_numpy(dtype=float))
+        shift = float(np.abs(scaled.mean(axis=0)).max())
+        error = float(np.abs(self.model.predict(scaled) - new[self.target_column].to_numpy(dtype=float)).mean())
+        baseline = self.error_baseline
+        drifted = shift > self.feature_drift or (self.baseline_rows >= self.min_baseline_rows
+                                                 and error > self.error_drift * baseline)
+        if drifted:
+            logging.warning(f"Drift detected: feature shift {shift:.2f} std, error {error:.4g} "
+                            f"vs {baseline if baseline is not None else float('nan'):.4g} before.")
+        else:
+            self.error_baseline = error if baseline is None else baseline + self.error_smoothing * (error - baseline)
+            self.baseline_rows += len(new)
+        return drifted
+
+    def _training_arrays(self):
+        return (self.window[self.feature_columns].to_numpy(dtype=float),
+                self.window[self.target_column].to_numpy(dtype=float))
+
+    def _can_warm_start(self) -> bool:
+        params = self.model.get_params()
+        return ("warm_start" in params and "n_estimators" in params
+                and params["n_estimators"] + self.warm_start_estimators <= self.max_estimators)
+
+    def retrain(self, force: bool = False) -> str:
+        """Bring the model up to date; returns "full", "warm" or "skipped"."""
+        if self.window.empty:
+            raise ValueError("No data to train the model on.")
+        now = self.clock()
+        due = self.new_rows and (self.fitted_at is None or now - self.fitted_at >= self.retrain_interval)
+        if self.fitted and not force and not self.drift and not due:
+            self.stats["skipped"] += 1
+            return "skipped"
+        X, y = self._training_arrays()
+        if self.fitted and not force and not self.drift and self._can_warm_start():
+            kind = "warm"
+            n_estimators = self.model.get_params()["n_estimators"] + self.warm_start_estimators
+            self.model.set_params(warm_start=True, n_estimators=n_estimators)
+            self.model.fit(self.scaler.transform(X), y)
+        else:
+            kind = "full"
+            if self.fitted:
+                self.model = clone(self.template)  # Drops trees added by warm starts
+            self.model.fit(self.scaler.fit_transform(X), y)
+        if kind == "full":
+            self.error_baseline = None  # Errors of the previous model say little about the new one
+            self.baseline_rows = 0
+        self.fitted = True
+        self.fitted_at = now
+        self.new_rows = 0
+        self.drift = False
+        self.stats["full_fits" if kind == "full" else "warm_starts"] += 1
+        logging.info(f"Model retrained ({kind}) on {len(y)} rows.")
+        return kind
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        if not self.fitted:
+            raise ValueError("The model has not been trained.")
+        return self.model.predict(self.scaler.transform(features[self.feature_columns].to_numpy(dtype=float)))
+
+    def update(self, data: pd.DataFrame) -> Dict[str, Any]:
+        """One cycle: observe the dataset, retrain if needed, and predict its last row."""
+        self.observe(data)
+        kind = self.retrain()
+        return {"prediction": float(self.predict(data.iloc[[-1]])[0]), "retrain": kind}
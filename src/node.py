@@ -4,12 +4,14 @@ import json
 import logging
 import time
 import hashlib
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from planetary_mesh import PlanetaryMeshNetwork  # Import the planetary mesh network
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+CHAIN_CHUNK_SIZE = 500  # Blocks per message when sending the chain to a peer
+
 class Block:
     def __init__(self, index: int, previous_hash: str, transactions: List[Dict[str, Any]], timestamp: float, nonce: int = 0):
         self.index = index
@@ -72,16 +74,23 @@ class Node:
                 logging.error(f"Error accepting connections: {e}")
 
     def handle_client(self, client_socket: socket.socket):
-        """Handle communication with a connected peer."""
+        """Handle communication with a connected peer; messages are newline-delimited JSON."""
+        buffer = b""
         while True:
             try:
-                message = client_socket.recv(1024).decode()
-                if not message:
+                data = client_socket.recv(65536)
+                if not data:
                     break
-                self.process_message(message)
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        self.process_message(line.decode())
             except Exception as e:
                 logging.error(f"Error handling client: {e}")
                 break
+        if buffer.strip():
+            self.process_message(buffer.decode())  # Peers that send one unterminated message per connection
         client_socket.close()
 
     def process_message(self, message: str):
@@ -96,7 +105,9 @@ class Node:
             elif message_type == 'block':
                 self.handle_block(data['block'])
             elif message_type == 'request_chain':
-                self.send_chain(data['peer'])
+                self.send_chain(data['peer'], data.get('start', 0), data.get('end'))
+            elif message_type == 'blockchain':
+                self.handle_chain_chunk(data)
             else:
                 logging.warning(f"Unknown message type: {message_type}")
         except json.JSONDecodeError:
@@ -134,10 +145,17 @@ class Node:
         message = json.dumps({"type": "transaction", "transaction": transaction})
         self.broadcast(message)
 
+    def block_from_dict(self, block: Dict[str, Any]) -> Block:
+        """Rebuild a block received from a peer, keeping the hash it was mined with."""
+        fields = {key: value for key, value in block.items() if key != 'hash'}
+        new_block = Block(**fields)
+        new_block.hash = block.get('hash', new_block.hash)
+        return new_block
+
     def handle_block(self, block: Dict[str, Any]):
         """Handle a new block received from a peer."""
         if self.validate_block(block):
-            self.chain.append(Block(**block))
+            self.chain.append(self.block_from_dict(block))
             logging.info(f"New block added to the chain: {block}")
         else:
             logging.warning(f"Invalid block received: {block}")
@@ -146,11 +164,50 @@ class Node:
         """Validate the block (placeholder for actual validation logic)."""
         return True
 
-    def send_chain(self, peer: str):
-        """Send the current blockchain to a peer."""
-        message = json.dumps({"type": "blockchain", "chain": [block.__dict__ for block in self.chain]})
+    def iter_chain(self, start: int = 0, end: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield blocks with index in [start, end) as dictionaries, one at a time."""
+        end = len(self.chain) if end is None else min(end, len(self.chain))
+        for index in range(max(start, 0), end):
+            yield dict(self.chain[index].__dict__)
+
+    def chain_messages(self, start: int = 0, end: Optional[int] = None,
+                       chunk_size: int = CHAIN_CHUNK_SIZE) -> Iterator[str]:
+        """Serialize a range of the chain lazily as 'blockchain' messages of up to chunk_size blocks."""
+        length = len(self.chain)
+        chunk = []
+        chunk_start = start
+        for block in self.iter_chain(start, end):
+            chunk.append(block)
+            if len(chunk) == chunk_size:
+                yield json.dumps({"type": "blockchain", "start": chunk_start, "length": length, "chain": chunk})
+                chunk_start += len(chunk)
+                chunk = []
+        if chunk or chunk_start == start:
+            yield json.dumps({"type": "blockchain", "start": chunk_start, "length": length, "chain": chunk})
+
+    def send_chain(self, peer: str, start: int = 0, end: Optional[int] = None):
+        """Send the blocks a peer asked for, streamed in chunks over one connection."""
+        self.send_messages(peer, self.chain_messages(start, end))
+
+    def request_chain(self, peer: str):
+        """Ask a peer for the blocks after our tip."""
+        message = json.dumps({"type": "request_chain", "peer": f"{self.host}:{self.port}", "start": len(self.chain)})
         self.send_message(peer, message)
 
+    def handle_chain_chunk(self, data: Dict[str, Any]):
+        """Append the blocks of a chain chunk that extend our tip, skipping ones we already have."""
+        added = 0
+        for block in data.get('chain', []):
+            if block.get('index') != len(self.chain):
+                continue
+            if block.get('previous_hash') != self.chain[-1].hash or not self.validate_block(block):
+                logging.warning(f"Chain chunk does not extend our tip at block {block.get('index')}")
+                break
+            self.chain.append(self.block_from_dict(block))
+            added += 1
+        if added:
+            logging.info(f"Added {added} blocks from chain sync; height is now {len(self.chain)}")
+
     def broadcast(self, message: str):
         """Broadcast a message to all connected peers."""
         for peer in self.peers:
@@ -158,10 +215,15 @@ class Node:
 
     def send_message(self, peer: str, message: str):
         """Send a message to a specific peer."""
+        self.send_messages(peer, [message])
+
+    def send_messages(self, peer: str, messages: Iterable[str]):
+        """Send messages to a peer over one connection, newline-delimited, as they are produced."""
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                 sock.connect((peer.split(':')[0], int(peer.split(':')[1])))
-                sock.sendall(message.encode())
+                for message in messages:
+                    sock.sendall(message.encode() + b"\n")
                 logging.info(f"Sent message to {peer}")
         except Exception as e:
             logging.error(f"Could not send message to {peer}: {e}")
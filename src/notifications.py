@@ -1,5 +1,10 @@
 import logging
-from typing import List, Dict, Any
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
 import smtplib
 from email.mime.text import MIMEText
 from twilio.rest import Client as TwilioClient
@@ -9,32 +14,192 @@ from jinja2 import Template
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+@lru_cache(maxsize=256)
+def compile_template(template_str: str) -> Template:
+    """Parse a Jinja template once and reuse the compiled form."""
+    return Template(template_str)
+
+class SMTPConnectionPool:
+    """Keeps logged-in SMTP connections open for reuse across sends."""
+
+    def __init__(self, email_config: Dict[str, Any], size: int = 4):
+        self.email_config = email_config
+        self.size = size
+        self.idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
+        if self.email_config.get('use_tls', True):
+            server.starttls()
+        if self.email_config.get('email_password'):
+            server.login(self.email_config['from_email'], self.email_config['email_password'])
+        return server
+
+    @contextmanager
+    def connection(self):
+        """Lend a connection, opening a new one if none is idle or the idle one has dropped."""
+        try:
+            server = self.idle.get_nowait()
+        except queue.Empty:
+            server = self._connect()
+        else:
+            try:
+                alive = server.noop()[0] == 250
+            except smtplib.SMTPException:
+                alive = False
+            if not alive:
+                server.close()
+                server = self._connect()
+        try:
+            yield server
+        except Exception:
+            server.close()
+            raise
+        else:
+            try:
+                self.idle.put_nowait(server)
+            except queue.Full:
+                server.quit()
+
+    def close(self) -> None:
+        """Quit every idle connection."""
+        while True:
+            try:
+                server = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+
+class RateLimiter:
+    """Token bucket allowing `rate` sends per second with bursts up to `burst`.
+
+    The bucket outlives event loops: its lock is created for whichever loop
+    is running, so a service can be driven by successive asyncio.run calls.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        return self._lock
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class DispatchError(Exception):
+    """Raised after a dispatch in which some digests failed; `unsent` holds their notifications."""
+
+    def __init__(self, unsent: List[Dict[str, Any]], error: BaseException):
+        super().__init__(f"{len(unsent)} notifications were not sent: {error}")
+        self.unsent = unsent
+        self.error = error
+
+class NotificationDispatcher:
+    """Sends queued notifications concurrently with per-channel rate limits.
+
+    Notifications for the same user and channel are coalesced into one
+    digest, and blocking sends run on a bounded thread pool so the event
+    loop is never held up by SMTP or SMS round-trips.
+    """
+
+    def __init__(self, service: "NotificationService", max_workers: int = 8,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.service = service
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.rate_limiters = {channel: RateLimiter(rate) for channel, rate in (rate_limits or {}).items()}
+
+    @staticmethod
+    def coalesce(notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge notifications per user and channel, preserving first-seen order."""
+        digests: Dict[tuple, Dict[str, Any]] = {}
+        for notification in notifications:
+            key = (notification['user_id'], notification['type'])
+            if key in digests:
+                digests[key]['messages'].append(notification['message'])
+            else:
+                digests[key] = {'user_id': key[0], 'type': key[1], 'messages': [notification['message']]}
+        return list(digests.values())
+
+    async def dispatch(self, notifications: List[Dict[str, Any]]) -> int:
+        """Send a batch of notifications and return how many digests went out.
+
+        Every digest is attempted; if any fail, DispatchError is raised
+        afterwards with the notifications that were not sent.
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def send(digest):
+            limiter = self.rate_limiters.get(digest['type'])
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire()
+                count = len(digest['messages'])
+                subject = "Notification" if count == 1 else f"{count} new notifications"
+                await self.service.notify_user(digest['user_id'], digest['type'], "\n\n".join(digest['messages']),
+                                               subject=subject)
+
+        digests = self.coalesce(notifications)
+        results = await asyncio.gather(*(send(digest) for digest in digests), return_exceptions=True)
+        failed = [(digest, result) for digest, result in zip(digests, results) if isinstance(result, BaseException)]
+        if failed:
+            unsent = [{'user_id': digest['user_id'], 'type': digest['type'], 'message': message}
+                      for digest, _ in failed for message in digest['messages']]
+            raise DispatchError(unsent, failed[0][1])
+        return len(digests)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
 class NotificationService:
-    def __init__(self, email_config: Dict[str, str], sms_config: Dict[str, str]):
+    def __init__(self, email_config: Dict[str, str], sms_config: Dict[str, str], max_workers: int = 8,
+                 smtp_pool_size: int = 4, rate_limits: Optional[Dict[str, float]] = None):
         self.email_config = email_config
         self.sms_config = sms_config
-        self.twilio_client = TwilioClient(sms_config['account_sid'], sms_config['auth_token'])
+        self.twilio_client = TwilioClient(sms_config['account_sid'], sms_config['auth_token'])  # Shared, pooled HTTP client
+        self.smtp_pool = SMTPConnectionPool(email_config, smtp_pool_size)
+        self.dispatcher = NotificationDispatcher(self, max_workers, rate_limits)
         self.notifications: List[Dict[str, Any]] = []  # Store notifications for processing
         self.user_preferences: Dict[str, Dict[str, Any]] = {}  # User preferences for notifications
 
     def send_email(self, to: str, subject: str, message: str) -> None:
-        """Send an email notification."""
+        """Send an email notification; failures are logged and re-raised so the dispatcher can requeue."""
         try:
             msg = MIMEText(message)
             msg['Subject'] = subject
             msg['From'] = self.email_config['from_email']
             msg['To'] = to
 
-            with smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.email_config['from_email'], self.email_config['email_password'])
+            with self.smtp_pool.connection() as server:
                 server.sendmail(self.email_config['from_email'], to, msg.as_string())
             logging.info(f"Email sent to {to} with subject: {subject}")
         except Exception as e:
             logging.error(f"Failed to send email to {to}: {e}")
+            raise
 
     def send_sms(self, to: str, message: str) -> None:
-        """Send an SMS notification."""
+        """Send an SMS notification; failures are logged and re-raised so the dispatcher can requeue."""
         try:
             self.twilio_client.messages.create(
                 body=message,
@@ -44,17 +209,21 @@ class NotificationService:
             logging.info(f"SMS sent to {to}: {message}")
         except Exception as e:
             logging.error(f"Failed to send SMS to {to}: {e}")
+            raise
 
-    async def notify_user(self, user_id: str, notification_type: str, message: str) -> None:
+    async def notify_user(self, user_id: str, notification_type: str, message: str,
+                          subject: str = "Notification") -> None:
         """Notify a user via the specified notification type."""
         user_contact_info = self.get_user_contact_info(user_id)
         user_pref = self.user_preferences.get(user_id, {})
+        loop = asyncio.get_running_loop()
+        executor = self.dispatcher.executor
 
         if notification_type in user_pref.get('preferred_channels', []):
             if notification_type == 'email':
-                self.send_email(user_contact_info['email'], "Notification", message)
+                await loop.run_in_executor(executor, self.send_email, user_contact_info['email'], subject, message)
             elif notification_type == 'sms':
-                self.send_sms(user_contact_info['phone'], message)
+                await loop.run_in_executor(executor, self.send_sms, user_contact_info['phone'], message)
             else:
                 logging.warning(f"Unknown notification type: {notification_type}")
         else:
@@ -79,9 +248,16 @@ class NotificationService:
 
     async def process_notifications(self) -> None:
         """Process all queued notifications asynchronously."""
-        for notification in self.notifications:
-            await self.notify_user(notification['user_id'], notification['type'], notification['message'])
-        self.notifications.clear()  # Clear the queue after processing
+        batch, self.notifications = self.notifications, []  # Take the queue so new notifications keep accumulating
+        try:
+            await self.dispatcher.dispatch(batch)
+        except DispatchError as e:
+            self.notifications[:0] = e.unsent  # Retry only what failed, ahead of anything queued since
+            logging.error(f"Requeued {len(e.unsent)} notifications: {e.error}")
+            raise
+        except BaseException:
+            self.notifications[:0] = batch
+            raise
 
     def set_user_preferences(self, user_id: str, preferences: Dict[str, Any]) -> None:
         """Set user notification preferences."""
@@ -90,8 +266,12 @@ class NotificationService:
 
     def render_template(self, template_str: str, context: Dict[str, Any]) -> str:
         """Render a notification template with context."""
-        template = Template(template_str)
-        return template.render(context)
+        return compile_template(template_str).render(context)
+
+    def close(self) -> None:
+        """Release pooled SMTP connections and worker threads."""
+        self.dispatcher.close()
+        self.smtp_pool.close()
 
 # Example usage of the NotificationService class
 if __name__ == "__main__":
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import aiohttp
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAD_SCALE = 1.4826  # Makes the MAD a consistent estimator of the standard deviation for normal data
+
+def extract_price(data: Dict[str, Any]) -> float:
+    """Read a price from the common ticker shapes ({"price": ...} or {"data": {"amount": ...}})."""
+    if "price" in data:
+        return float(data["price"])
+    return float(data["data"]["amount"])
+
+def median_mad(values: Iterable[float]) -> Tuple[float, float]:
+    values = list(values)
+    median = statistics.median(values)
+    return median, statistics.median(abs(value - median) for value in values)
+
+def is_outlier(price: float, median: float, mad: float, threshold: float, min_spread: float) -> bool:
+    """Whether `price` is more than `threshold` robust deviations from the median.
+
+    The spread is floored at `min_spread` of the median so identical
+    quotes (MAD of zero) do not make every tick an outlier.
+    """
+    spread = max(MAD_SCALE * mad, min_spread * abs(median))
+    return abs(price - median) > threshold * spread
+
+class PriceRing:
+    """Bounded buffer of (timestamp, price) observations."""
+
+    def __init__(self, size: int):
+        self.items: deque = deque(maxlen=size)
+
+    def append(self, timestamp: float, price: float) -> None:
+        self.items.append((timestamp, price))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def latest(self) -> Optional[Tuple[float, float]]:
+        return self.items[-1] if self.items else None
+
+    def prices(self) -> List[float]:
+        return [price for _, price in self.items]
+
+    def twap(self, window: float, now: float) -> Optional[float]:
+        """Time-weighted average over the last `window` seconds; each price holds until the next one."""
+        start = now - window
+        total = weighted = 0.0
+        end = now
+        for timestamp, price in reversed(self.items):
+            begin = max(timestamp, start)
+            if end > begin:
+                weighted += price * (end - begin)
+                total += end - begin
+            if timestamp <= start:
+                break
+            end = timestamp
+        return weighted / total if total else None
+
+class SourceState:
+    def __init__(self, url: str, asset: str, parse: Callable[[Dict[str, Any]], float], buffer_size: int):
+        self.url = url
+        self.asset = asset
+        self.parse = parse
+        self.prices = PriceRing(buffer_size)
+        self.last_error: Optional[str] = None
+        self.failures = 0
+
+    @property
+    def last_update(self) -> Optional[float]:
+        latest = self.prices.latest
+        return latest[0] if latest else None
+
+class PriceAggregator:
+    """Long-lived price aggregation over several HTTP price feeds per asset.
+
+    One aiohttp session is opened by start() and reused for every poll.
+    Each source and each asset keeps a bounded ring of observations. A poll
+    fetches every source concurrently, drops sources whose last good price
+    is older than `max_age`, and combines the rest with a median after
+    rejecting outliers across sources when at least three are fresh.
+
+    With fewer fresh sources there is no cross-source majority, so quotes
+    are compared with the last `history_window` aggregates instead. A quote far
+    from them is rejected only while another fresh source still agrees with
+    them; when every source has moved away together it is taken as a real
+    move, accepted and counted in `flagged`, so the history can follow it.
+    """
+
+    def __init__(self, sources: Dict[str, Iterable[Union[str, Tuple[str, Callable[[Dict[str, Any]], float]]]]],
+                 buffer_size: int = 1024, max_age: float = 180.0, outlier_threshold: float = 3.0,
+                 min_spread: float = 0.001, timeout: float = 10.0, history_window: int = 20,
+                 clock: Callable[[], float] = time.time):
+        self.sources: List[SourceState] = []
+        for asset, feeds in sources.items():
+            for feed in feeds:
+                url, parse = (feed, extract_price) if isinstance(feed, str) else feed
+                self.sources.append(SourceState(url, asset, parse, buffer_size))
+        self.aggregates: Dict[str, PriceRing] = {asset: PriceRing(buffer_size) for asset in sources}
+        self.max_age = max_age
+        self.outlier_threshold = outlier_threshold
+        self.min_spread = min_spread
+        self.history_window = history_window
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.clock = clock
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.rejected: Dict[str, int] = {}  # Source url -> ticks rejected as outliers
+        self.flagged: Dict[str, int] = {}  # Source url -> ticks accepted despite leaving the recent range
+
+    async def start(self) -> "PriceAggregator":
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "PriceAggregator":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def fetch(self, source: SourceState) -> Optional[float]:
+        try:
+            async with self.session.get(source.url) as response:
+                response.raise_for_status()
+                price = source.parse(await response.json(content_type=None))
+        except Exception as e:
+            source.failures += 1
+            source.last_error = str(e)
+            logging.error(f"Error fetching data from {source.url}: {e}")
+            return None
+        source.prices.append(self.clock(), price)
+        source.failures = 0
+        source.last_error = None
+        logging.debug(f"Fetched price from {source.url}: {price}")
+        return price
+
+    def fresh_prices(self, asset: str, now: float) -> Dict[str, float]:
+        return {source.url: source.prices.latest[1] for source in self.sources
+                if source.asset == asset and source.last_update is not None
+                and now - source.last_update <= self.max_age}
+
+    def aggregate(self, asset: str) -> Optional[float]:
+        """Combine the fresh source prices for an asset and record the result."""
+        now = self.clock()
+        prices = self.fresh_prices(asset, now)
+        if not prices:
+            return None
+        history = self.aggregates[asset]
+        if len(prices) >= 3:
+            median, mad = median_mad(prices.values())
+        elif len(history) >= 3:
+            median, mad = median_mad(history.prices()[-self.history_window:])
+        else:
+            median = None
+        if median is not None:
+            outliers = [url for url, price in prices.items()
+                        if is_outlier(price, median, mad, self.outlier_threshold, self.min_spread)]
+            if len(prices) < 3 and len(outliers) == len(prices):
+                # Every source left the recent range: a level shift, not a bad feed
+                for url in outliers:
+                    self.flagged[url] = self.flagged.get(url, 0) + 1
+                    logging.warning(f"Accepted price {prices[url]} from {url} outside the recent range "
+                                    f"(median {median})")
+                outliers = []
+            for url in outliers:
+                self.rejected[url] = self.rejected.get(url, 0) + 1
+                logging.warning(f"Rejected outlier price {prices.pop(url)} from {url} (median {median})")
+        if not prices:
+            return None
+        price = statistics.median(prices.values())
+        history.append(now, price)
+        return price
+
+    async def poll(self) -> Dict[str, Optional[float]]:
+        """Fetch every source once and return the new aggregate per asset."""
+        await self.start()
+        await asyncio.gather(*(self.fetch(source) for source in self.sources))
+        return {asset: self.aggregate(asset) for asset in self.aggregates}
+
+    async def run(self, interval: float, iterations: Optional[int] = None,
+                  on_prices: Optional[Callable[[Dict[str, Optional[float]]], Any]] = None) -> None:
+        """Poll every `interval` seconds on the current event loop."""
+        count = 0
+        while iterations is None or count < iterations:
+            started = self.clock()
+            prices = await self.poll()
+            if on_prices:
+                on_prices(prices)
+            count += 1
+            if iterations is None or count < iterations:
+                await asyncio.sleep(max(0.0, interval - (self.clock() - started)))
+
+    def latest(self, asset: str) -> Optional[float]:
+        latest = self.aggregates[asset].latest
+        return latest[1] if latest else None
+
+    def twap(self, asset: str, window: float) -> Optional[float]:
+        return self.aggregates[asset].twap(window, self.clock())
+
+    def staleness(self) -> Dict[str, Dict[str, Any]]:
+        """Per source: seconds since its last good price, whether that exceeds max_age, and its last error."""
+        now = self.clock()
+        report = {}
+        for source in self.sources:
+            age = None if source.last_update is None else now - source.last_update
+            report[source.url] = {"age": age, "stale": age is None or age > self.max_age,
+                                  "failures": source.failures, "last_error": source.last_error}
+        return report
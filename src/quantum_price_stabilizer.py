@@ -4,23 +4,36 @@ import logging
 from quantum_computing_module import QuantumPredictor
 from real_time_analytics import fetch_global_economic_data
 from smart_contracts.PiCoinSmartContract import PiCoinSmartContract
-from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
+from collections import deque
+from model_lifecycle import ModelLifecycle
 import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+FEATURE_COLUMNS = ['inflation_rate', 'interest_rate', 'demand']
+
 class QuantumPriceStabilizer:
-    def __init__(self):
+    def __init__(self, retrain_interval=3600, history_size=10000, window_size=5000):
         self.quantum_predictor = QuantumPredictor()
         self.smart_contract = PiCoinSmartContract()
         self.total_supply = 100_000_000_000  # Total supply of Pi Coin
         self.current_supply = self.smart_contract.get_current_supply()
         self.target_value = 314159.00  # Target value for Pi Coin
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.scaler = StandardScaler()
-        self.history = []
+        # The fitted model is kept between cycles and only retrained on schedule or on drift
+        self.lifecycle = ModelLifecycle(RandomForestRegressor(n_estimators=100, random_state=42),
+                                        FEATURE_COLUMNS, 'price', retrain_interval=retrain_interval,
+                                        window_size=window_size)
+        self.history = deque(maxlen=history_size)
+
+    @property
+    def model(self):
+        return self.lifecycle.model
+
+    @property
+    def scaler(self):
+        return self.lifecycle.scaler
 
     def analyze_market(self):
         # Fetch global economic data
@@ -29,22 +42,23 @@ class QuantumPriceStabilizer:
         return economic_data
 
     def preprocess_data(self, economic_data):
-        # Preprocess the data for model training
-        features = economic_data[['inflation_rate', 'interest_rate', 'demand']]
+        # Scale features with the scaler fitted at the last full retrain
+        features = economic_data[FEATURE_COLUMNS]
         target = economic_data['price']
-        features_scaled = self.scaler.fit_transform(features)
-        return features_scaled, target
+        return self.scaler.transform(features.to_numpy(dtype=float)), target
 
-    def train_model(self, features, target):
-        # Train the machine learning model
-        self.model.fit(features, target)
-        logging.info("Trained the price prediction model for Pi Coin.")
+    def train_model(self, economic_data, force=False):
+        # Learn new rows; refit or add trees only when the schedule or drift calls for it
+        self.lifecycle.observe(economic_data)
+        kind = self.lifecycle.retrain(force=force)
+        if kind != "skipped":
+            logging.info(f"Trained the price prediction model for Pi Coin ({kind}).")
+        return kind
 
     def predict_price_fluctuations(self, economic_data):
         # Use quantum model and machine learning model to predict price fluctuations
-        features, target = self.preprocess_data(economic_data)
-        self.train_model(features, target)
-        predicted_fluctuations = self.model.predict(features[-1].reshape(1, -1))[0]
+        self.train_model(economic_data)
+        predicted_fluctuations = self.lifecycle.predict(economic_data.iloc[[-1]])[0]
         logging.info(f"Predicted price fluctuations for Pi Coin: {predicted_fluctuations}")
         return predicted_fluctuations
 
@@ -61,18 +75,20 @@ class QuantumPriceStabilizer:
             self.current_supply += amount_to_mint  # Update current supply
             logging.info(f"Minted {amount_to_mint} Pi Coins to stabilize price.")
 
-    def run(self):
+    def run(self, interval=60, iterations=None):
         # Main process to maintain price stability
-        while True:
+        count = 0
+        while iterations is None or count < iterations:
+            count += 1
             try:
                 economic_data = self.analyze_market()
                 predicted_fluctuations = self.predict_price_fluctuations(economic_data)
                 self.adjust_supply(predicted_fluctuations)
                 self.history.append(predicted_fluctuations)
-                time.sleep(60)  # Run every minute
+                time.sleep(interval)  # Run every minute by default
             except Exception as e:
                 logging.error(f"An error occurred: {e}")
-                time.sleep(60)  # Wait before retrying
+                time.sleep(interval)  # Wait before retrying
 
 if __name__ == "__main__":
     stabilizer = QuantumPriceStabilizer()
@@ -1,7 +1,8 @@
 import asyncio
 from variational_quantum import QuantumProcessor
 from hybrid_algorithm import BridgingEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Server, Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 from datetime import datetime
@@ -13,6 +14,7 @@ class QuantumRealityAdapter:
         self.server = Server(horizon_url)
         self.quantum_asset = Asset("QUANTUM", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +38,11 @@ class QuantumRealityAdapter:
 
     async def issue_quantum_token(self, user_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=user_public,
-                    asset=self.quantum_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=user_public,
+                asset=self.quantum_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Quantum token issued: {response['id']}")
             return response['id']
         except Exception as e:
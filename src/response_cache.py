@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import inspect
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from utils import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class InMemoryCacheBackend:
+    """Process-local cache backend, for single-worker deployments and tests.
+
+    Keys that expire or are evicted stay in their tag sets until the next
+    prune, which runs once twice `max_size` keys are tagged, so tag sets
+    stay within a constant factor of the cache size.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.cache = TTLCache(max_size=max_size)
+        self.tags: Dict[str, Set[str]] = {}
+        self.key_tags: Dict[str, Set[str]] = {}  # Reverse index, for pruning
+
+    async def get(self, key: str) -> Optional[dict]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: dict, ttl: float, tags: Iterable[str] = ()) -> None:
+        self.cache.set(key, value, ttl=ttl)
+        self._untag(key)
+        tags = set(tags)
+        if tags:
+            self.key_tags[key] = tags
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+        if len(self.key_tags) > 2 * self.cache.max_size:
+            self.prune()
+
+    def _untag(self, key: str) -> None:
+        for tag in self.key_tags.pop(key, ()):
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+    def prune(self) -> None:
+        """Drop expired and evicted keys from the tag sets."""
+        for key in [key for key in self.key_tags if key not in self.cache]:
+            self._untag(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self.tags.get(tag, ())):
+                self._untag(key)
+                self.cache.invalidate(key)
+
+class RedisCacheBackend:
+    """Cache backend shared by every worker through redis; tags are kept as redis sets of keys."""
+
+    def __init__(self, client, prefix: str = "response-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict, ttl: float, tags: Iterable[str] = ()) -> None:
+        seconds = max(1, int(ttl))
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, json.dumps(value), ex=seconds)
+        for tag in tags:
+            pipe.sadd(f"{self.prefix}tag:{tag}", key)
+            pipe.expire(f"{self.prefix}tag:{tag}", seconds)
+        await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = await self.client.smembers(tag_key)
+            if keys:
+                await self.client.delete(*(self.prefix + key for key in keys))
+            await self.client.delete(tag_key)
+
+def etag_for(body: Any) -> str:
+    """Strong ETag over the canonical JSON encoding of a body."""
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return f'"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def encode_cursor(key: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(items: List[Any], cursor: Optional[str], limit: int,
+             item_key: Callable[[Any], Any]) -> Tuple[List[Any], Optional[str]]:
+    """Page through `items` after the item named by `cursor`.
+
+    Cursors name an item rather than an offset, so items appended while a
+    client is paging do not shift the pages it has not read yet.
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor)
+        start = next((index + 1 for index, item in enumerate(items) if item_key(item) == after), None)
+        if start is None:
+            raise HTTPException(status_code=400, detail="Cursor does not match any item")
+    page = items[start:start + limit]
+    next_cursor = encode_cursor(item_key(page[-1])) if page and start + limit < len(items) else None
+    return page, next_cursor
+
+class ResponseCache:
+    """Caches JSON response bodies per endpoint and principal, with ETags and tag-based invalidation.
+
+    Entries expire after their TTL or when one of their tags is invalidated,
+    e.g. after a transaction changes the balances they show. A body whose
+    tag is invalidated in this process while it is being computed is
+    returned but not cached, since it may predate the change. Clients that
+    send If-None-Match with the current ETag get an empty 304.
+    """
+
+    def __init__(self, backend=None, default_ttl: float = 10.0):
+        self.backend = backend or InMemoryCacheBackend()
+        self.default_ttl = default_ttl
+        self.generations: Dict[str, int] = {}  # Tag -> number of invalidations
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint: str, principal: str, *params: Any) -> str:
+        return ":".join([endpoint, principal, *(str(param) for param in params)])
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Union[Any, Awaitable[Any]]],
+                             ttl: Optional[float] = None, tags: Iterable[str] = ()) -> dict:
+        entry = await self.backend.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        tags = list(tags)
+        generations = [self.generations.get(tag, 0) for tag in tags]
+        body = compute()
+        if inspect.isawaitable(body):
+            body = await body
+        body = jsonable_encoder(body)
+        entry = {"body": body, "etag": etag_for(body)}
+        if generations == [self.generations.get(tag, 0) for tag in tags]:
+            await self.backend.set(key, entry, self.default_ttl if ttl is None else ttl, tags)
+        return entry
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of the tags."""
+        for tag in tags:
+            self.generations[tag] = self.generations.get(tag, 0) + 1
+        await self.backend.invalidate_tags(tags)
+
+    async def respond(self, request: Request, key: str, compute: Callable[[], Union[Any, Awaitable[Any]]],
+                      ttl: Optional[float] = None, tags: Iterable[str] = (), cursor: Optional[str] = None,
+                      limit: Optional[int] = None, item_key: Optional[Callable[[Any], Any]] = None) -> Response:
+        """Serve a cached body (paginated when `limit` is given), honouring If-None-Match."""
+        entry = await self.get_or_compute(key, compute, ttl, tags)
+        body, etag = entry["body"], entry["etag"]
+        headers = {"Cache-Control": "private, no-cache"}
+        if limit is not None:
+            body, next_cursor = paginate(body, cursor, limit, item_key)
+            etag = etag_for([etag, cursor, limit])
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+        headers["ETag"] = etag
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(body, headers=headers)
@@ -0,0 +1,200 @@
+import base64
+import hashlib
+import logging
+import math
+import zlib
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class BloomFilter:
+    """Fixed-size bloom filter over string keys."""
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str):
+        """Add a key to the filter."""
+        for position in self._positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(key))
+
+    def to_dict(self) -> dict:
+        """Serialize the filter to a compressed, JSON-safe dict."""
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": base64.b64encode(zlib.compress(bytes(self.bits))).decode()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BloomFilter":
+        """Rebuild a filter from its serialized form."""
+        bloom = cls(data["capacity"], data["error_rate"])
+        bloom.bits = bytearray(zlib.decompress(base64.b64decode(data["bits"])))
+        return bloom
+
+class StatusList:
+    """Growable bitmap where bit N is set when status index N is revoked."""
+
+    def __init__(self, size: int = 131072):
+        self.bits = bytearray((size + 7) // 8)
+
+    @property
+    def size(self) -> int:
+        return len(self.bits) * 8
+
+    def _ensure(self, index: int):
+        if index >= self.size:
+            self.bits.extend(bytearray(max(len(self.bits), (index // 8) + 1 - len(self.bits))))
+
+    def set(self, index: int):
+        """Mark an index as revoked."""
+        self._ensure(index)
+        self.bits[index // 8] |= 1 << (index % 8)
+
+    def is_set(self, index: int) -> bool:
+        """Check whether an index is revoked."""
+        if index >= self.size:
+            return False
+        return bool(self.bits[index // 8] & (1 << (index % 8)))
+
+    def encode(self) -> str:
+        """Compress and base64-encode the bitmap."""
+        return base64.b64encode(zlib.compress(bytes(self.bits), 9)).decode()
+
+    @classmethod
+    def decode(cls, encoded: str) -> "StatusList":
+        """Rebuild a bitmap from its encoded form."""
+        status_list = cls(0)
+        status_list.bits = bytearray(zlib.decompress(base64.b64decode(encoded)))
+        return status_list
+
+class RevocationRegistry:
+    """Revocation state as a status-list bitmap with snapshots and deltas.
+
+    Issuers allocate a status index per credential and flip its bit on
+    revocation. Verifier nodes load a snapshot once and then apply the
+    much smaller deltas, after which each check is a single bit lookup.
+    """
+
+    def __init__(self, size: int = 131072, use_bloom: bool = True, bloom_capacity: int = 100000,
+                 max_delta_log: int = 10000):
+        self.status_list = StatusList(size)
+        self.bloom = BloomFilter(bloom_capacity) if use_bloom else None
+        self.indices = {}  # credential_id -> status index
+        self.next_index = 0
+        self.version = 0
+        self.delta_log = []  # (version, index, credential_id) per revocation
+        self.max_delta_log = max_delta_log
+
+    def allocate(self, credential_id: str) -> int:
+        """Assign a status index to a credential."""
+        if credential_id not in self.indices:
+            self.indices[credential_id] = self.next_index
+            self.next_index += 1
+        return self.indices[credential_id]
+
+    def revoke(self, credential_id: str) -> int:
+        """Revoke a credential and return the new registry version."""
+        index = self.allocate(credential_id)
+        if self.status_list.is_set(index):
+            return self.version
+        self.status_list.set(index)
+        if self.bloom is not None:
+            self.bloom.add(credential_id)
+        self.version += 1
+        self.delta_log.append((self.version, index, credential_id))
+        if len(self.delta_log) > self.max_delta_log:
+            del self.delta_log[:len(self.delta_log) - self.max_delta_log]
+        logging.info(f"Revocation registry advanced to version {self.version}.")
+        return self.version
+
+    def is_revoked(self, credential_id: str = None, status_index: int = None) -> bool:
+        """Check revocation by status index, or by credential ID."""
+        if status_index is None:
+            if self.bloom is not None and credential_id not in self.bloom:
+                return False
+            status_index = self.indices.get(credential_id)
+            if status_index is None:
+                # Index unknown on this node; the bloom answer may be a false positive
+                return self.bloom is not None
+        return self.status_list.is_set(status_index)
+
+    def snapshot(self) -> dict:
+        """Export the full revocation state in compressed form."""
+        snapshot = {
+            "version": self.version,
+            "next_index": self.next_index,
+            "status_list": self.status_list.encode()
+        }
+        if self.bloom is not None:
+            snapshot["bloom"] = self.bloom.to_dict()
+        return snapshot
+
+    def delta_since(self, version: int):
+        """Return the revocations after a version, or None if a snapshot is required."""
+        if version > self.version:
+            raise Exception("Requested version is ahead of the registry.")
+        if self.delta_log and version < self.delta_log[0][0] - 1:
+            return None
+        if not self.delta_log and version < self.version:
+            return None
+        entries = [entry for entry in self.delta_log if entry[0] > version]
+        return {
+            "from_version": version,
+            "to_version": self.version,
+            "indices": [index for _, index, _ in entries],
+            "credential_ids": [credential_id for _, _, credential_id in entries]
+        }
+
+    def apply_delta(self, delta: dict):
+        """Apply a delta produced by another registry's delta_since."""
+        if delta["from_version"] != self.version:
+            raise Exception("Delta does not start at the current registry version.")
+        for index, credential_id in zip(delta["indices"], delta["credential_ids"]):
+            self.status_list.set(index)
+            self.indices.setdefault(credential_id, index)
+            if self.bloom is not None:
+                self.bloom.add(credential_id)
+        self.next_index = max([self.next_index] + [index + 1 for index in delta["indices"]])
+        self.version = delta["to_version"]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "RevocationRegistry":
+        """Build a verifier-side registry from a snapshot."""
+        registry = cls(0, use_bloom=False)
+        registry.status_list = StatusList.decode(snapshot["status_list"])
+        registry.version = snapshot["version"]
+        registry.next_index = snapshot["next_index"]
+        if "bloom" in snapshot:
+            registry.bloom = BloomFilter.from_dict(snapshot["bloom"])
+        return registry
+
+# Example usage of the RevocationRegistry class
+if __name__ == "__main__":
+    issuer_registry = RevocationRegistry()
+    for credential_id in ("cred-a", "cred-b", "cred-c"):
+        issuer_registry.allocate(credential_id)
+
+    # A verifier node syncs once from a snapshot
+    verifier_registry = RevocationRegistry.from_snapshot(issuer_registry.snapshot())
+
+    # Later revocations are shipped as deltas
+    issuer_registry.revoke("cred-b")
+    verifier_registry.apply_delta(issuer_registry.delta_since(verifier_registry.version))
+
+    print(f"cred-b revoked: {verifier_registry.is_revoked(status_index=issuer_registry.allocate('cred-b'))}")
+    print(f"cred-a revoked: {verifier_registry.is_revoked('cred-a')}")
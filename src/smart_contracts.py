@@ -1,15 +1,38 @@
 import json
 import time
-from typing import Any, Dict, Callable, List, Optional
+from typing import Any, Dict, Callable, List, Optional, Tuple
+import contract_events
+import contract_state
+from contract_events import ContractEvent, EventStore
+from contract_gas import DEFAULT_GAS_LIMIT, GasExhausted, GasMeter, GasProfile, OutOfGas
+from contract_state import ContractState, StateStore
+
+# Modules whose work is charged per state operation or event rather than per line
+METERED_MODULES = (contract_state.__file__, contract_events.__file__)
 
 class SmartContract:
-    def __init__(self, contract_name: str, owner: str):
+    def __init__(self, contract_name: str, owner: str, event_store: Optional[EventStore] = None,
+                 gas_limit: int = DEFAULT_GAS_LIMIT):
         self.contract_name = contract_name
         self.owner = owner
-        self.state: Dict[str, Any] = {}
+        self._state = ContractState()
         self.functions: Dict[str, Callable] = {}
-        self.events: List[str] = []
+        self.event_store = event_store or EventStore()
+        self.pending_events: List[Tuple[str, Dict[str, Any], Tuple[str, ...]]] = []  # Held until the call commits
         self.access_control: Dict[str, List[str]] = {}  # Role-based access control
+        self.gas_limit = gas_limit
+        self.gas_profiles: Dict[str, GasProfile] = {}
+        self.meter: Optional[GasMeter] = None  # Set while a top-level call runs
+        self.last_gas_used = 0
+
+    @property
+    def state(self) -> ContractState:
+        return self._state
+
+    @state.setter
+    def state(self, state: ContractState):
+        state.meter = self.meter
+        self._state = state
 
     def add_function(self, func_name: str, func: Callable, roles: Optional[List[str]] = None):
         """Add a function to the smart contract with optional access control."""
@@ -18,15 +41,71 @@ class SmartContract:
             self.access_control[func_name] = roles
 
     def call_function(self, func_name: str, caller: str, *args, **kwargs) -> Any:
-        """Call a function in the smart contract with access control."""
+        """Call a function in the smart contract with access control.
+
+        The call runs in a state transaction: if it raises, its writes and
+        the events it emitted are rolled back. A top-level call is metered
+        against `gas_limit` and raises OutOfGas once it is exceeded; calls
+        made from inside it share its meter.
+        """
         if func_name in self.functions:
             if self.has_access(caller, func_name):
-                return self.functions[func_name](self, *args, **kwargs)
+                if self.meter is not None:
+                    return self._run(func_name, args, kwargs)
+                return self._run_metered(func_name, args, kwargs)
             else:
                 raise PermissionError(f"Caller '{caller}' does not have access to function '{func_name}'")
         else:
             raise ValueError(f"Function '{func_name}' not found in contract '{self.contract_name}'")
 
+    def _run(self, func_name: str, args: tuple, kwargs: dict) -> Any:
+        # A call made from inside a metered call; its events wait for the top-level commit
+        event_count = len(self.pending_events)
+        try:
+            with self.state.transaction():
+                return self.functions[func_name](self, *args, **kwargs)
+        except BaseException:
+            del self.pending_events[event_count:]
+            raise
+
+    def _run_metered(self, func_name: str, args: tuple, kwargs: dict) -> Any:
+        meter = GasMeter(self.gas_limit, exempt_files=METERED_MODULES)
+        self.meter = self.state.meter = meter
+        event_count = len(self.pending_events)
+        depth = self.state.depth
+        ran_out = False
+        # Only the contract function runs under the meter, so running out can
+        # never interrupt the begin/commit/revert bookkeeping around it
+        self.state.begin()
+        try:
+            with meter:
+                meter.charge("call")
+                result = self.functions[func_name](self, *args, **kwargs)
+            # The function may have caught and swallowed GasExhausted
+            meter.check()
+        except BaseException as e:
+            # Also reverts frames of nested calls that an abort left open
+            self.state.revert_to(depth)
+            del self.pending_events[event_count:]
+            if isinstance(e, GasExhausted):
+                ran_out = True
+                raise OutOfGas(e.gas_limit, e.gas_used, e.operation) from None
+            raise
+        else:
+            self.state.commit()
+        finally:
+            self.meter = self.state.meter = None
+            self.last_gas_used = meter.gas_used
+            self.gas_profiles.setdefault(func_name, GasProfile()).record(meter, ran_out)
+        # Events were charged when emitted; storing them happens after the meter stops
+        if not self.state.in_transaction:
+            self.publish_events()
+        return result
+
+    def gas_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-function gas statistics for the calls made so far."""
+        return {func_name: profile.to_dict() for func_name, profile in self.gas_profiles.items()}
+
     def has_access(self, caller: str, func_name: str) -> bool:
         """Check if the caller has access to the function."""
         if func_name in self.access_control:
@@ -36,38 +115,51 @@ class SmartContract:
     def set_state(self, key: str, value: Any):
         """Set a value in the contract's state and emit an event."""
         self.state[key] = value
-        self.emit_event(f"State updated: {key} = {value}")
+        self.emit_event("StateUpdated", indexed=["key"], key=key, value=value)
 
     def get_state(self, key: str) -> Any:
         """Get a value from the contract's state."""
         return self.state.get(key, None)
 
-    def emit_event(self, event: str):
-        """Emit an event for state changes."""
-        self.events.append(event)
-
-    def get_events(self) -> List[str]:
-        """Get the list of events that have occurred in the contract."""
-        return self.events
+    def emit_event(self, event: str, indexed: Optional[List[str]] = None, **args):
+        """Emit an event; inside a call it is only stored once the call commits."""
+        if self.meter:
+            self.meter.charge("event")
+        indexed = self.event_store.validate(self.contract_name, event, args, indexed or ())
+        self.pending_events.append((event, args, indexed))
+        if not self.state.in_transaction:
+            self.publish_events()
+
+    def publish_events(self):
+        """Move committed events into the event store."""
+        pending, self.pending_events = self.pending_events, []
+        for event, args, indexed in pending:
+            self.event_store.emit(self.contract_name, event, args, indexed)
+
+    def get_events(self, event: Optional[str] = None, **kwargs) -> List[ContractEvent]:
+        """Get this contract's events, optionally filtered (see EventStore.query)."""
+        return self.event_store.query(self.contract_name, event, **kwargs)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert the smart contract to a dictionary for serialization."""
         return {
             "contract_name": self.contract_name,
             "owner": self.owner,
-            "state": self.state,
-            "events": self.events
+            "state": self.state.to_dict()
         }
 
 class SmartContractManager:
-    def __init__(self):
+    def __init__(self, storage_dir: str = ".", snapshot_interval: int = 100,
+                 event_store: Optional[EventStore] = None):
         self.contracts: Dict[str, SmartContract] = {}
+        self.store = StateStore(storage_dir, snapshot_interval)
+        self.event_store = event_store or EventStore()
 
-    def deploy_contract(self, contract_name: str, owner: str) -> SmartContract:
+    def deploy_contract(self, contract_name: str, owner: str, gas_limit: int = DEFAULT_GAS_LIMIT) -> SmartContract:
         """Deploy a new smart contract."""
         if contract_name in self.contracts:
             raise ValueError(f"Contract '{contract_name}' already exists.")
-        contract = SmartContract(contract_name, owner)
+        contract = SmartContract(contract_name, owner, self.event_store, gas_limit)
         self.contracts[contract_name] = contract
         return contract
 
@@ -79,20 +171,18 @@ class SmartContractManager:
         return contract
 
     def save_contract_state(self, contract_name: str):
-        """Persist the state of the contract to a file (or database)."""
+        """Persist the keys changed since the last save, snapshotting periodically."""
         contract = self.get_contract(contract_name)
-        with open(f"{contract_name}.json", "w") as f:
-            json.dump(contract.to_dict(), f)
+        header = {"contract_name": contract.contract_name, "owner": contract.owner}
+        self.store.save(contract_name, contract.state, header)
 
     def load_contract_state(self, contract_name: str):
-        """Load the state of the contract from a file (or database)."""
+        """Load the latest snapshot of the contract and replay its journal."""
         try:
-            with open(f"{contract_name}.json", "r") as f:
-                data = json.load(f)
-                contract = SmartContract(data['contract_name'], data['owner'])
-                contract.state = data['state']
-                contract.events = data['events']
-                self.contracts[contract_name] = contract
+            header, state, _ = self.store.load(contract_name)
+            contract = SmartContract(header['contract_name'], header['owner'], self.event_store)
+            contract.state = state
+            self.contracts[contract_name] = contract
         except FileNotFoundError:
             raise FileNotFoundError(f"Contract '{contract_name}' not found.")
         except json.JSONDecodeError:
@@ -101,8 +191,9 @@ class SmartContractManager:
             raise RuntimeError(f"An error occurred while loading contract '{contract_name}': {str(e)}")
 
 class ExpiringSmartContract(SmartContract):
-    def __init__(self, contract_name: str, owner: str, expiration_time: int):
-        super().__init__(contract_name, owner)
+    def __init__(self, contract_name: str, owner: str, expiration_time: int,
+                 event_store: Optional[EventStore] = None, gas_limit: int = DEFAULT_GAS_LIMIT):
+        super().__init__(contract_name, owner, event_store, gas_limit)
         self.expiration_time = expiration_time
         self.creation_time = time.time()
 
@@ -140,7 +231,7 @@ if __name__ == "__main__":
 
     # Load contract state
     manager.load_contract_state("MyContract")
-    print("Loaded State:", contract.get _state("my_key"))
+    print("Loaded State:", contract.get_state("my_key"))
 
     # Additional functionality: Batch state updates
     def batch_set_state(contract: SmartContract, updates: Dict[str, Any]):
@@ -163,15 +254,15 @@ if __name__ == "__main__":
     print("Events:", contract.get_events())
 
     # Additional functionality: Event filtering
-    def filter_events(contract: SmartContract, keyword: str) -> List[str]:
-        """Filter events based on a keyword."""
-        return [event for event in contract.get_events() if keyword in event]
+    def filter_events(contract: SmartContract, key: str) -> List[ContractEvent]:
+        """Filter state updates by the key they touched."""
+        return contract.get_events("StateUpdated", topics={"key": key})
 
     contract.add_function("filter_events", filter_events)
 
     # Call the new function to filter events
     try:
-        filtered_events = contract.call_function("filter_events", "Alice", "State")
+        filtered_events = contract.call_function("filter_events", "Alice", "key1")
         print("Filtered Events:", filtered_events)
     except Exception as e:
         print(f"Error: {e}")
@@ -200,11 +291,12 @@ if __name__ == "__main__":
         expired = expiring_contract.call_function("check_expiration", "Alice")
         print("Is the contract expired after waiting?", expired)
     except Exception as e:
-        print(f"Error: {e}") ```python
+        print(f"Error: {e}")
+
     # Additional functionality: Update access control for a function
     def update_access_control(contract: SmartContract, func_name: str, roles: List[str]):
         contract.access_control[func_name] = roles
-        contract.emit_event(f"Access control updated for function '{func_name}'")
+        contract.emit_event("AccessControlUpdated", indexed=["function"], function=func_name, roles=roles)
 
     contract.add_function("update_access_control", update_access_control, roles=["Alice"])
 
@@ -230,7 +322,7 @@ if __name__ == "__main__":
     def renew_contract(contract: ExpiringSmartContract, additional_time: int):
         contract.creation_time = time.time()  # Reset creation time
         contract.expiration_time += additional_time
-        contract.emit_event(f"Contract '{contract.contract_name}' renewed for {additional_time} seconds.")
+        contract.emit_event("ContractRenewed", additional_time=additional_time)
 
     expiring_contract.add_function("renew_contract", renew_contract, roles=["Alice"])
 
@@ -1,7 +1,8 @@
 import asyncio
 from emotion_graph import ResonanceAnalyzer
 from affective_computing import CollaborationEngine
-from stellar_sdk import Server, TransactionBuilder, Network, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 import json
@@ -10,9 +11,9 @@ class SocialResonance:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.analyzer = ResonanceAnalyzer()
         self.engine = CollaborationEngine()
-        self.server = Server(horizon_url)
         self.resonance_asset = Asset("RESONANCE", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +37,11 @@ class SocialResonance:
     
     async def issue_resonance_token(self, participant_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=100
-                )
-                .append_payment_op(
-                    destination=participant_public,
-                    asset=self.resonance_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=participant_public,
+                asset=self.resonance_asset,
+                amount=str(token_amount)
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Resonance Token Issued: {response['id']}")
             return response['id']
         except Exception as e:
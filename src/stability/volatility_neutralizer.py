@@ -1,7 +1,8 @@
 import asyncio
 from adversarial_network import MarketPredictor
 from stochastic_optimization import ReserveManager
-from stellar_sdk import Server, TransactionBuilder, Network, Payment, Asset, Keypair
+from stellar_sdk import Asset, Keypair
+from horizon_client import get_payment_batcher
 from hashlib import sha256
 from logging import getLogger, StreamHandler, Formatter
 import time
@@ -10,9 +11,9 @@ class VolatilityNeutralizer:
     def __init__(self, horizon_url, pi_coin_issuer, master_secret):
         self.predictor = MarketPredictor()
         self.manager = ReserveManager()
-        self.server = Server(horizon_url)
         self.stability_asset = Asset("STABILITY", pi_coin_issuer)
         self.master_keypair = Keypair.from_secret(master_secret)
+        self.payouts = get_payment_batcher(horizon_url, self.master_keypair)
         self.logger = self.setup_logger()
     
     def setup_logger(self):
@@ -36,22 +37,12 @@ class VolatilityNeutralizer:
     
     async def issue_stability_token(self, reserve_public, token_amount):
         try:
-            account = await self.server.load_account(self.master_keypair.public_key)
-            tx = (
-                TransactionBuilder(
-                    source_account=account,
-                    network_passphrase=Network.PUBLIC_NETWORK_PASSPHRASE,
-                    base_fee=self.dynamic_fee_adjustment()
-                )
-                .append_payment_op(
-                    destination=reserve_public,
-                    asset=self.stability_asset,
-                    amount=str(token_amount)
-                )
-                .build()
+            response = await self.payouts.pay(
+                destination=reserve_public,
+                asset=self.stability_asset,
+                amount=str(token_amount),
+                base_fee=self.dynamic_fee_adjustment()
             )
-            tx.sign(self.master_keypair)
-            response = await self.server.submit_transaction(tx)
             self.logger.info(f"Stability Token Issued: {response['id']}")
             return response['id']
         except Exception as e:
@@ -1,48 +1,42 @@
-import requests
 import logging
 import asyncio
-import aiohttp
-from time import sleep
-from collections import defaultdict
 from interoperability import validate_data
 from governance import apply_penalty
 from cachetools import TTLCache
+from price_aggregation import PriceAggregator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+PI_ASSET = "PI"
+
 class UniversalPriceOracle:
-    def __init__(self, target_value=314159.00, fetch_interval=60):
+    def __init__(self, target_value=314159.00, fetch_interval=60, buffer_size=1024, max_age=None,
+                 outlier_threshold=3.0, price_sources=None):
         self.target_value = target_value
         self.fetch_interval = fetch_interval
-        self.price_sources = [
+        self.price_sources = price_sources or [
             'https://api.binance.com/api/v3/ticker/price?symbol=PICUSDT',  # Example for Pi Coin on Binance
             'https://api.coinbase.com/v2/prices/PI-USD/spot',  # Example for Pi Coin on Coinbase
             # Add more sources as needed
         ]
-        self.price_data = defaultdict(list)
+        # Bounded per-source and aggregate history; sources silent for three intervals count as stale
+        self.aggregator = PriceAggregator({PI_ASSET: self.price_sources}, buffer_size=buffer_size,
+                                          max_age=max_age or 3 * fetch_interval,
+                                          outlier_threshold=outlier_threshold)
         self.cache = TTLCache(maxsize=100, ttl=300)  # Cache for 5 minutes
 
-    async def fetch_price_from_source(self, session, source):
-        """Fetch price data from a single source asynchronously."""
-        try:
-            async with session.get(source) as response:
-                response.raise_for_status()
-                data = await response.json()
-                price = float(data['price'])  # Adjust based on the API response structure
-                self.price_data[source].append(price)
-                logging.info(f"Fetched price from {source}: {price}")
-        except Exception as e:
-            logging.error(f"Error fetching data from {source}: {e}")
+    @property
+    def price_data(self):
+        """Recent prices per source (bounded by buffer_size)."""
+        return {source.url: source.prices.prices() for source in self.aggregator.sources}
 
     async def fetch_price_data(self):
-        """Fetch price data from all sources asynchronously."""
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.fetch_price_from_source(session, source) for source in self.price_sources]
-            await asyncio.gather(*tasks)
+        """Fetch price data from all sources concurrently over the shared session."""
+        return await self.aggregator.poll()
 
     def validate_prices(self):
-        """Validate the fetched prices against the target value."""
+        """Validate the recent prices of each source against the target value."""
         for source, prices in self.price_data.items():
             if prices:
                 average_price = sum(prices) / len(prices)
@@ -51,26 +45,31 @@ class UniversalPriceOracle:
                     apply_penalty(source)  # Apply penalty for deviation
 
     def aggregate_prices(self):
-        """Aggregate prices from all sources."""
-        all_prices = []
-        for prices in self.price_data.values():
-            all_prices.extend(prices)
-        if all_prices:
-            average_price = sum(all_prices) / len(all_prices)
-            logging.info(f"Aggregated average price: {average_price}")
-            return average_price
-        return None
+        """Latest outlier-filtered aggregate price."""
+        return self.aggregator.latest(PI_ASSET)
 
-    def run(self):
-        """Main loop to continuously fetch and validate prices."""
-        while True:
-            asyncio.run(self.fetch_price_data())
+    def time_weighted_price(self, window=None):
+        """Time-weighted average of the aggregate over `window` seconds (default ten intervals)."""
+        return self.aggregator.twap(PI_ASSET, window or 10 * self.fetch_interval)
+
+    async def run_async(self, iterations=None):
+        """Poll on one event loop with one HTTP session for the lifetime of the oracle."""
+        def on_prices(prices):
             self.validate_prices()
-            aggregated_price = self.aggregate_prices()
+            aggregated_price = prices.get(PI_ASSET)
             if aggregated_price:
                 # Here you can implement further logic, e.g., updating a database or notifying other services
                 logging.info(f"Current aggregated price for Pi Coin: {aggregated_price}")
-            sleep(self.fetch_interval)  # Fetch data every specified interval
+            for source, status in self.aggregator.staleness().items():
+                if status["stale"]:
+                    logging.warning(f"Price source {source} is stale: {status}")
+
+        async with self.aggregator:
+            await self.aggregator.run(self.fetch_interval, iterations, on_prices)
+
+    def run(self, iterations=None):
+        """Main loop to continuously fetch and validate prices."""
+        asyncio.run(self.run_async(iterations))
 
 if __name__ == "__main__":
     oracle = UniversalPriceOracle()
@@ -1,14 +1,18 @@
 import os
 import json
+import asyncio
 import hashlib
 import base64
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from cryptography.fernet import Fernet
 from stellar_sdk import Server, Keypair, TransactionBuilder, Network, Asset, Payment, ManageData
 from src.config import Config  # Import STABLECOIN_VALUE (assumed $314,159.00 for Pi Coin)
 from src.ai_analysis import ComplianceAnalyzer, EmpathyProcessor  # Hypothetical nexus-revoluter modules
 from src.zkp import KYCProver  # Hypothetical zero-knowledge proof module
+from horizon_client import ChannelPool, get_horizon_client
+from wallet_view import WalletView
+from wallet_store import WalletStore
 import requests
 from datetime import datetime
 
@@ -17,36 +21,100 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class PiWallet:
-    def __init__(self, password: str, horizon_url: str = "https://horizon.stellar.org"):
+    def __init__(self, password: str, horizon_url: str = "https://horizon.stellar.org",
+                 channel_secrets: Optional[List[str]] = None, store_path: str = "nexus_wallet.store"):
         self.password = password
         self.addresses: Dict[str, float] = {}  # Stellar public key to Pi Coin balance
-        self.secrets: Dict[str, str] = {}  # Stellar public key to secret seed
+        self.secrets: Dict[str, str] = {}  # Stellar public key to secret seed, decrypted on first use
         self.transactions: List[Dict[str, Any]] = []  # List of transactions
+        self.store = WalletStore(store_path, password)  # Per-record encrypted persistence
         self.server = Server(horizon_url)
         self.network_passphrase = Network.PUBLIC_NETWORK_PASSPHRASE
         self.pi_coin = Asset("PI", os.getenv("PI_COIN_ISSUER", "G..."))  # Replace with actual issuer
+        self.horizon = get_horizon_client(horizon_url, self.network_passphrase)
+        # Channel accounts let several transfers be in flight at once; see create_transactions
+        self.channels = ChannelPool(
+            self.horizon, [Keypair.from_secret(secret) for secret in channel_secrets or []]
+        )
+        self.view = WalletView(self.horizon, self.pi_coin)  # Concurrent, cached balances and history
         self.two_factor_enabled = False
         self.compliance_analyzer = ComplianceAnalyzer()  # ARHN-inspired
         self.empathy_processor = EmpathyProcessor()  # AHCEW-inspired
         self.kyc_prover = KYCProver()  # ADIS-inspired
         self.load_or_create_wallet()
 
+    @property
+    def transactions(self) -> List[Dict[str, Any]]:
+        """Transaction history, decrypted from the store the first time it is needed."""
+        if self._transactions is None:
+            self._transactions = [transaction for _, transaction in self.store.items("transaction")]
+        return self._transactions
+
+    @transactions.setter
+    def transactions(self, transactions: List[Dict[str, Any]]):
+        self._transactions = transactions
+
     def load_or_create_wallet(self):
         """Load existing wallet or create a new one."""
         filename = "nexus_wallet.json"
-        if os.path.exists(filename):
-            self.load_wallet(filename)
+        if self.store.count("address"):
+            self.open_store()
+        elif os.path.exists(filename):
+            self.load_wallet(filename)  # Migrates the legacy file into the store
         else:
             self.create_wallet()
 
+    def open_store(self):
+        """Load address balances from the store; secrets and transactions stay encrypted until used."""
+        self.addresses = dict(self.store.items("address"))
+        self.secrets = {}
+        self.transactions = None
+        logger.info(f"Wallet opened from {self.store.path} with {len(self.addresses)} addresses.")
+
     def create_wallet(self):
         """Create a new Stellar-based wallet."""
-        for i in range(5):  # Generate 5 addresses
-            address, secret = self.generate_address()
+        keypairs = [self.generate_address() for _ in range(5)]  # Generate 5 addresses
+        for address, secret in keypairs:
             self.addresses[address] = 0.0
             self.secrets[address] = secret
+        self.store.put_many("secret", dict(keypairs))
+        self.store.put_many("address", {address: 0.0 for address, _ in keypairs})
         logger.info("New Stellar wallet created with 5 addresses.")
 
+    def add_address(self) -> str:
+        """Generate a new address and persist it without rewriting the rest of the wallet."""
+        address, secret = self.generate_address()
+        self.addresses[address] = 0.0
+        self.secrets[address] = secret
+        self.store.put("secret", address, secret)
+        self.store.put("address", address, 0.0)
+        return address
+
+    def remove_address(self, address: str):
+        """Forget an address and its secret, writing tombstones so they stay gone after a restart."""
+        if address not in self.addresses:
+            raise Exception("Address does not exist.")
+        del self.addresses[address]
+        self.secrets.pop(address, None)
+        self.store.delete("address", address)
+        self.store.delete("secret", address)
+
+    def get_secret(self, address: str) -> str:
+        """Secret seed for an address, decrypting only that record."""
+        if address not in self.secrets:
+            secret = self.store.get("secret", address)
+            if secret is None:
+                raise Exception("Address does not exist.")
+            self.secrets[address] = secret
+        return self.secrets[address]
+
+    def append_transaction(self, transaction: Dict[str, Any], addresses: List[str]):
+        """Record a transaction and the balances it changed, appending just those records."""
+        self.transactions.append(transaction)
+        self.store.put("transaction", transaction["hash"], transaction)
+        self.store.put_many("address", {address: self.addresses[address] for address in addresses
+                                        if address in self.addresses})
+
     def generate_address(self) -> tuple[str, str]:
         """Generate a new Stellar keypair."""
         keypair = Keypair.random()
@@ -82,16 +150,20 @@ class PiWallet:
         balance = self.get_balance(address)
         return balance * Config.STABLECOIN_VALUE  # Assumed $314,159.00
 
-    def create_transaction(self, from_address: str, to_address: str, amount: float, fee: float = 0.0, require_2fa: bool = False, memo: str = "nexus-revoluter") -> bool:
-        """Create a Pi Coin transaction on Stellar with compliance and empathetic UX."""
-        if require_2fa and not self.verify_2fa():
-            raise Exception("2FA verification failed.")
-        
+    def check_transaction(self, from_address: str, to_address: str, amount: float, pending: float = 0.0,
+                          balance: Optional[float] = None) -> str:
+        """Validate a transfer and run compliance checks; returns the empathetic feedback to attach.
+
+        `pending` is the amount already committed from `from_address` by transfers not yet submitted.
+        `balance` is the sender's already fetched balance; without it the balance is read from Horizon.
+        """
         if from_address not in self.addresses:
             raise Exception("From address does not exist.")
         if to_address not in self.addresses and not Keypair.from_public_key(to_address):
             raise Exception("To address is invalid.")
-        if self.get_balance(from_address) < amount:
+        if balance is None:
+            balance = self.get_balance(from_address)
+        if balance < pending + amount:
             raise Exception("Insufficient Pi Coin balance.")
 
         # Autonomous compliance check (ARHN-inspired)
@@ -103,10 +175,39 @@ class PiWallet:
         user_context = {"from_address": from_address, "amount": amount}
         feedback = self.empathy_processor.generate_feedback(user_context)
         logger.info(f"Empathetic feedback: {feedback}")
+        return feedback
+
+    def record_transaction(self, from_address: str, to_address: str, amount: float, fee: float, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a submitted transfer locally and update cached balances."""
+        transaction = {
+            "from": from_address,
+            "to": to_address,
+            "amount": amount,
+            "fee": fee,
+            "hash": response["hash"],
+            "timestamp": datetime.utcnow().isoformat(),
+            "status": "confirmed",
+            "stellar_id": response["id"]
+        }
+        self.addresses[from_address] -= amount
+        if to_address in self.addresses:
+            self.addresses[to_address] += amount
+        self.append_transaction(transaction, [from_address, to_address])
+        if "ledger" in response:
+            self.view.note_ledger(from_address, response["ledger"])
+            self.view.note_ledger(to_address, response["ledger"])
+        logger.info(f"Transaction created: {transaction}")
+        return transaction
+
+    def create_transaction(self, from_address: str, to_address: str, amount: float, fee: float = 0.0, require_2fa: bool = False, memo: str = "nexus-revoluter") -> bool:
+        """Create a Pi Coin transaction on Stellar with compliance and empathetic UX."""
+        if require_2fa and not self.verify_2fa():
+            raise Exception("2FA verification failed.")
+        feedback = self.check_transaction(from_address, to_address, amount)
 
         try:
             # Stellar transaction
-            source_keypair = Keypair.from_secret(self.secrets[from_address])
+            source_keypair = Keypair.from_secret(self.get_secret(from_address))
             source_account = self.server.load_account(from_address)
             tx = (
                 TransactionBuilder(
@@ -127,28 +228,76 @@ class PiWallet:
             )
             tx.sign(source_keypair)
             response = self.server.submit_transaction(tx)
-
-            # Update local state
-            transaction = {
-                "from": from_address,
-                "to": to_address,
-                "amount": amount,
-                "fee": fee,
-                "hash": response["hash"],
-                "timestamp": datetime.utcnow().isoformat(),
-                "status": "confirmed",
-                "stellar_id": response["id"]
-            }
-            self.transactions.append(transaction)
-            self.addresses[from_address] -= amount
-            if to_address in self.addresses:
-                self.addresses[to_address] += amount
-            logger.info(f"Transaction created: {transaction}")
+            self.record_transaction(from_address, to_address, amount, fee, response)
             return True
         except Exception as e:
             logger.error(f"Transaction failed: {str(e)}")
             raise Exception(f"Transaction failed: {str(e)}")
 
+    async def create_transactions(self, transfers: List[Dict[str, Any]], memo: str = "nexus-revoluter") -> List[Any]:
+        """Submit many transfers concurrently.
+
+        Each transfer is a dict with from_address, to_address, amount and an
+        optional fee. With channel accounts configured, each in-flight
+        transaction uses its own channel as source, so up to one transfer per
+        channel is pending at once; otherwise transfers from the same address
+        are submitted one after another. Returns the recorded transaction for
+        each transfer, or the exception that rejected it.
+
+        Sender balances are fetched once per address, concurrently through
+        the async Horizon client, before any transfer is checked.
+        """
+        sources = list(dict.fromkeys(transfer["from_address"] for transfer in transfers
+                                     if transfer["from_address"] in self.addresses))
+        balances = await self.view.balances(sources, refresh=True)
+        for address, balance in balances.items():
+            if balance is None:
+                balances[address] = self.addresses.get(address, 0.0)
+            else:
+                self.addresses[address] = balance
+        pending: Dict[str, float] = {}
+        checked = []
+        for transfer in transfers:
+            try:
+                feedback = self.check_transaction(transfer["from_address"], transfer["to_address"], transfer["amount"],
+                                                  pending.get(transfer["from_address"], 0.0),
+                                                  balances.get(transfer["from_address"], 0.0))
+                pending[transfer["from_address"]] = pending.get(transfer["from_address"], 0.0) + transfer["amount"]
+                checked.append((transfer, feedback))
+            except Exception as e:
+                checked.append((transfer, e))
+
+        async def submit(transfer: Dict[str, Any], feedback: str) -> Dict[str, Any]:
+            from_address = transfer["from_address"]
+            source_keypair = Keypair.from_secret(self.get_secret(from_address))
+            operation_source = from_address if len(self.channels) else None
+
+            def build(builder: TransactionBuilder):
+                builder.append_payment_op(
+                    destination=transfer["to_address"],
+                    asset=self.pi_coin,
+                    amount=str(transfer["amount"]),
+                    source=operation_source
+                ).append_manage_data_op(
+                    data_name="nexus_transaction",
+                    data_value=json.dumps({"memo": memo, "feedback": feedback}).encode(),
+                    source=operation_source
+                )
+
+            if len(self.channels):
+                response = await self.channels.submit(source_keypair, build)
+            else:
+                response = await self.horizon.submit(source_keypair, build)
+            return self.record_transaction(from_address, transfer["to_address"], transfer["amount"],
+                                           transfer.get("fee", 0.0), response)
+
+        accepted = [index for index, (_, result) in enumerate(checked) if not isinstance(result, Exception)]
+        submitted = await asyncio.gather(*(submit(*checked[index]) for index in accepted), return_exceptions=True)
+        results = [result for _, result in checked]
+        for index, outcome in zip(accepted, submitted):
+            results[index] = outcome
+        return results
+
     def get_transactions(self) -> List[Dict[str, Any]]:
         """Get the list of transactions, including Stellar records."""
         stellar_txs = []
@@ -170,11 +319,25 @@ class PiWallet:
                 logger.warning(f"Failed to fetch Stellar transactions for {address}: {str(e)}")
         return self.transactions + stellar_txs
 
+    async def fetch_balances(self, refresh: bool = False) -> Dict[str, float]:
+        """Pi Coin balances for every address, fetched concurrently and served from cache when fresh."""
+        balances = await self.view.balances(self.addresses, refresh)
+        for address, balance in balances.items():
+            if balance is None:
+                balances[address] = self.addresses.get(address, 0.0)
+            else:
+                self.addresses[address] = balance
+        return balances
+
+    async def fetch_transactions(self) -> List[Dict[str, Any]]:
+        """Local transactions plus Stellar payments, paging only what arrived since the last call."""
+        return self.transactions + await self.view.transactions(self.addresses)
+
     def save_wallet(self, filename: str):
         """Save the wallet to a file with quantum-resistant encryption."""
         wallet_data = {
             "addresses": self.addresses,
-            "secrets": self.secrets,
+            "secrets": {address: self.get_secret(address) for address in self.addresses},
             "transactions": self.transactions
         }
         encrypted_data = self.encrypt_data(json.dumps(wallet_data))
@@ -193,6 +356,13 @@ class PiWallet:
             self.addresses = wallet_data.get("addresses", {})
             self.secrets = wallet_data.get("secrets", {})
             self.transactions = wallet_data.get("transactions", [])
+        for address, _ in self.store.items("address"):
+            if address not in self.addresses:
+                self.store.delete("address", address)
+                self.store.delete("secret", address)
+        self.store.put_many("secret", self.secrets)
+        self.store.put_many("address", self.addresses)
+        self.store.put_many("transaction", {transaction["hash"]: transaction for transaction in self.transactions})
         logger.info(f"Wallet loaded from {filename}")
 
     def encrypt_data(self, data: str) -> bytes:
@@ -225,7 +395,7 @@ class PiWallet:
         try:
             # Create multi-signature account (simplified for one source account)
             primary_address = from_addresses[0]
-            source_keypair = Keypair.from_secret(self.secrets[primary_address])
+            source_keypair = Keypair.from_secret(self.get_secret(primary_address))
             source_account = self.server.load_account(primary_address)
             tx = (
                 TransactionBuilder(
@@ -258,11 +428,11 @@ class PiWallet:
                 "required_signatures": required_signatures,
                 "stellar_id": response["id"]
             }
-            self.transactions.append(transaction)
             for addr in from_addresses:
                 self.addresses[addr] -= amount / len(from_addresses)
             if to_address in self.addresses:
                 self.addresses[to_address] += amount
+            self.append_transaction(transaction, from_addresses + [to_address])
             logger.info(f"Multi-signature transaction created: {transaction}")
             return True
         except Exception as e:
@@ -316,7 +486,7 @@ class PiWallet:
     def log_transaction(self, transaction: Dict[str, Any]):
         """Log transaction details to Stellar for transparency."""
         try:
-            source_keypair = Keypair.from_secret(self.secrets[transaction["from"]])
+            source_keypair = Keypair.from_secret(self.get_secret(transaction["from"]))
             source_account = self.server.load_account(transaction["from"])
             tx = (
                 TransactionBuilder(
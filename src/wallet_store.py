@@ -0,0 +1,157 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from cryptography.fernet import Fernet
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+_TOMBSTONE = "-"
+
+class WalletStore:
+    """Append-only log of individually encrypted wallet records.
+
+    Each line is `<kind> <record id> <Fernet token>`. The record id is an
+    HMAC of the record key, so addresses are not stored in the clear, and
+    the index of record id -> file offset is rebuilt on open without
+    decrypting anything. Writing a record appends one line, and reading one
+    decrypts only that line. Superseded and deleted records are dropped by
+    compact(), which runs automatically once they outnumber live ones.
+    """
+
+    def __init__(self, path: str, password: str, compact_ratio: float = 0.5, min_compact_records: int = 1000):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.min_compact_records = min_compact_records
+        digest = hashlib.sha256(password.encode()).digest()
+        self.fernet = Fernet(base64.urlsafe_b64encode(digest))
+        self.index_key = hashlib.sha256(b"wallet-store-index" + digest).digest()
+        self.index: Dict[Tuple[str, str], Tuple[int, int]] = {}  # (kind, record id) -> (offset, length)
+        self.total_records = 0
+        self.lock = Lock()
+        self._load_index()
+
+    def record_id(self, key: str) -> str:
+        return hmac.new(self.index_key, key.encode(), hashlib.sha256).hexdigest()
+
+    def _load_index(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                parts = line.split(b" ", 2)
+                if len(parts) != 3 or not line.endswith(b"\n"):
+                    logging.warning(f"Ignoring truncated record at offset {offset} in {self.path}")
+                    break
+                kind, record_id, token = (part.decode() for part in parts)
+                if token.strip() == _TOMBSTONE:
+                    self.index.pop((kind, record_id), None)
+                else:
+                    self.index[(kind, record_id)] = (offset, len(line))
+                self.total_records += 1
+                offset += len(line)
+        # Drop a partially written tail so new records start on a line boundary
+        if offset != os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _append(self, lines: list) -> int:
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        return offset
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Encrypt and append one record, replacing any earlier value for the key."""
+        self.put_many(kind, {key: value})
+
+    def put_many(self, kind: str, items: Dict[str, Any]) -> None:
+        """Append several records of one kind in a single write."""
+        if not items:
+            return
+        entries = []
+        for key, value in items.items():
+            token = self.fernet.encrypt(json.dumps({"key": key, "value": value}).encode())
+            record_id = self.record_id(key)
+            entries.append((record_id, f"{kind} {record_id} ".encode() + token + b"\n"))
+        with self.lock:
+            offset = self._append([line for _, line in entries])
+            for record_id, line in entries:
+                self.index[(kind, record_id)] = (offset, len(line))
+                offset += len(line)
+            self.total_records += len(entries)
+        self._maybe_compact()
+
+    def delete(self, kind: str, key: str) -> None:
+        record_id = self.record_id(key)
+        with self.lock:
+            if (kind, record_id) not in self.index:
+                return
+            self._append([f"{kind} {record_id} {_TOMBSTONE}\n".encode()])
+            del self.index[(kind, record_id)]
+            self.total_records += 1
+        self._maybe_compact()
+
+    def _read(self, f, location: Tuple[int, int]) -> Dict[str, Any]:
+        offset, length = location
+        f.seek(offset)
+        token = f.read(length).split(b" ", 2)[2].strip()
+        return json.loads(self.fernet.decrypt(token))
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """Decrypt a single record, or return the default if it is absent."""
+        with self.lock:
+            location = self.index.get((kind, self.record_id(key)))
+            if location is None:
+                return default
+            with open(self.path, "rb") as f:
+                return self._read(f, location)["value"]
+
+    def __contains__(self, item: Tuple[str, str]) -> bool:
+        kind, key = item
+        return (kind, self.record_id(key)) in self.index
+
+    def count(self, kind: str) -> int:
+        return sum(1 for record_kind, _ in self.index if record_kind == kind)
+
+    def items(self, kind: str) -> List[Tuple[str, Any]]:
+        """Decrypt every live record of one kind, in the order they were last written."""
+        with self.lock:
+            locations = sorted(location for (record_kind, _), location in self.index.items() if record_kind == kind)
+            if not locations:
+                return []
+            with open(self.path, "rb") as f:
+                records = [self._read(f, location) for location in locations]
+        return [(record["key"], record["value"]) for record in records]
+
+    def _maybe_compact(self) -> None:
+        dead = self.total_records - len(self.index)
+        if self.total_records >= self.min_compact_records and dead > self.compact_ratio * self.total_records:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with only live records. Tokens are copied as-is, nothing is re-encrypted."""
+        with self.lock:
+            temp_path = f"{self.path}.compact"
+            new_index = {}
+            offset = 0
+            with open(self.path, "rb") as source, open(temp_path, "wb") as target:
+                for index_key, (old_offset, length) in sorted(self.index.items(), key=lambda item: item[1]):
+                    source.seek(old_offset)
+                    target.write(source.read(length))
+                    new_index[index_key] = (offset, length)
+                    offset += length
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_path, self.path)
+            logging.info(f"Compacted {self.path}: {self.total_records} records down to {len(new_index)}")
+            self.index = new_index
+            self.total_records = len(new_index)
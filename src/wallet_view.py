@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from stellar_sdk import Asset
+from stellar_sdk.exceptions import NotFoundError
+from horizon_client import HorizonClient
+from utils import TTLCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class WalletView:
+    """Balances and payment history for many wallet addresses, fetched concurrently and cached.
+
+    Balances are cached for `balance_ttl` seconds together with the ledger
+    the account was last modified in; note_ledger() drops an entry as soon
+    as a newer ledger is known to have touched the account. Payment history
+    is paged forward from a stored cursor per address, so each refresh only
+    fetches payments made since the previous one.
+    """
+
+    def __init__(self, client: HorizonClient, asset: Asset, balance_ttl: float = 15.0, max_concurrency: int = 20,
+                 page_size: int = 200):
+        self.client = client
+        self.asset = asset
+        self.balance_cache = TTLCache(ttl=balance_ttl)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.page_size = page_size
+        self.cursors: Dict[str, str] = {}  # address -> paging token of the newest payment seen
+        self.history: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _is_asset(self, record: dict) -> bool:
+        """Whether a Horizon balance or payment record is for the wallet's asset."""
+        if self.asset.is_native():
+            return record.get("asset_type") == "native"
+        return record.get("asset_code") == self.asset.code and record.get("asset_issuer") == self.asset.issuer
+
+    def _asset_balance(self, balances: List[dict]) -> float:
+        return next((float(balance["balance"]) for balance in balances if self._is_asset(balance)), 0.0)
+
+    async def _fetch_balance(self, address: str) -> Optional[float]:
+        async with self.semaphore:
+            try:
+                account = await self.client.server.accounts().account_id(address).call()
+            except NotFoundError:
+                return 0.0
+            except Exception as e:
+                logging.warning(f"Failed to fetch balance for {address}: {e}")
+                return None
+        balance = self._asset_balance(account["balances"])
+        self.balance_cache.set(address, (balance, account.get("last_modified_ledger", 0)))
+        return balance
+
+    async def balances(self, addresses: Iterable[str], refresh: bool = False) -> Dict[str, Optional[float]]:
+        """Balances for many addresses; cached ones are served locally and the rest fetched concurrently.
+
+        An address whose balance could not be fetched maps to None.
+        """
+        addresses = list(addresses)
+        result = {}
+        missing = []
+        for address in addresses:
+            entry = None if refresh else self.balance_cache.get(address)
+            if entry is None:
+                missing.append(address)
+            else:
+                result[address] = entry[0]
+        fetched = await asyncio.gather(*(self._fetch_balance(address) for address in missing))
+        result.update(zip(missing, fetched))
+        return {address: result[address] for address in addresses}
+
+    async def balance(self, address: str, refresh: bool = False) -> Optional[float]:
+        return (await self.balances([address], refresh))[address]
+
+    def note_ledger(self, address: str, ledger: int) -> None:
+        """Record that `ledger` changed the account; a balance cached from an older ledger is dropped."""
+        entry = self.balance_cache.get(address)
+        if entry is not None and entry[1] < ledger:
+            self.balance_cache.invalidate(address)
+
+    def invalidate(self, address: str) -> None:
+        self.balance_cache.invalidate(address)
+
+    async def _sync_address(self, address: str) -> int:
+        """Page forward from the stored cursor; returns the number of new payments."""
+        new_records = []
+        async with self.semaphore:
+            try:
+                while True:
+                    page = await (
+                        self.client.server.payments().for_account(address)
+                        .cursor(self.cursors.get(address, "0")).order(desc=False).limit(self.page_size).call()
+                    )
+                    records = page["_embedded"]["records"]
+                    if not records:
+                        break
+                    new_records.extend(records)
+                    self.cursors[address] = records[-1]["paging_token"]
+                    if len(records) < self.page_size:
+                        break
+            except NotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"Failed to fetch Stellar transactions for {address}: {e}")
+
+        history = self.history.setdefault(address, [])
+        for payment in new_records:
+            if payment.get("type", "payment") != "payment" or not self._is_asset(payment):
+                continue
+            history.append({
+                "from": payment["from"],
+                "to": payment["to"],
+                "amount": float(payment["amount"]),
+                "hash": payment["transaction_hash"],
+                "timestamp": payment["created_at"],
+                "status": "confirmed",
+                "stellar_id": payment["id"]
+            })
+        if new_records:
+            # The account changed since its balance was cached
+            self.invalidate(address)
+        return len(new_records)
+
+    async def sync_history(self, addresses: Iterable[str]) -> int:
+        """Fetch payments made since the last sync for every address, concurrently."""
+        counts = await asyncio.gather(*(self._sync_address(address) for address in addresses))
+        return sum(counts)
+
+    async def transactions(self, addresses: Iterable[str]) -> List[Dict[str, Any]]:
+        """Payment history across addresses, oldest first, with each payment listed once."""
+        addresses = list(addresses)
+        await self.sync_history(addresses)
+        seen = {}
+        for address in addresses:
+            for payment in self.history.get(address, []):
+                seen.setdefault(payment["stellar_id"], payment)
+        return sorted(seen.values(), key=lambda payment: int(payment["stellar_id"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Cursors and history, so a restarted wallet resumes paging where it left off."""
+        return {"cursors": dict(self.cursors), "history": {address: list(h) for address, h in self.history.items()}}
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        self.cursors = dict(data.get("cursors", {}))
+        self.history = {address: list(h) for address, h in data.get("history", {}).items()}
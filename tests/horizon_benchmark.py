@@ -0,0 +1,65 @@
+# horizon_benchmark.py
+
+import asyncio
+import time
+from stellar_sdk import Asset, Keypair, Network, ServerAsync, TransactionBuilder
+from horizon_client import ChannelPool, HorizonClient, PaymentBatcher
+from mock_horizon import MockHorizon
+
+PAYMENTS = 200
+LATENCY = 0.005  # Simulated round-trip per request, in seconds
+CHANNELS = 10
+
+async def naive_payouts(url, master, recipient):
+    """One fresh connection and one account load per payment, as the payout modules used to do."""
+    for _ in range(PAYMENTS):
+        async with ServerAsync(url) as server:
+            account = await server.load_account(master.public_key)
+            tx = (
+                TransactionBuilder(account, Network.TESTNET_NETWORK_PASSPHRASE, base_fee=100)
+                .append_payment_op(recipient, Asset.native(), "1")
+                .set_timeout(30)
+                .build()
+            )
+            tx.sign(master)
+            await server.submit_transaction(tx, skip_memo_required_check=True)
+
+async def shared_client_payouts(url, master, recipient):
+    """Pooled connections and a cached sequence number."""
+    client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+    for _ in range(PAYMENTS):
+        await client.submit_payment(master, recipient, Asset.native(), "1")
+    await client.close()
+
+async def channel_payouts(url, master, recipient):
+    """Individual payments submitted concurrently, one channel account per in-flight transaction."""
+    client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+    pool = ChannelPool(client)
+    await pool.provision(master, CHANNELS)
+    await asyncio.gather(*(pool.submit_payment(master, recipient, Asset.native(), "1") for _ in range(PAYMENTS)))
+    await client.close()
+
+async def batched_payouts(url, master, recipient):
+    """Payments queued together and sent as transactions of up to 100 operations."""
+    client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+    batcher = PaymentBatcher(client, master)
+    await batcher.pay_many([{"destination": recipient, "asset": Asset.native(), "amount": "1"}] * PAYMENTS)
+    await client.close()
+
+async def main():
+    horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE, latency=LATENCY)
+    url = await horizon.start()
+    master, recipient = Keypair.random(), Keypair.random().public_key
+    horizon.create_account(master.public_key)
+    horizon.create_account(recipient)
+
+    for name, run in (("naive", naive_payouts), ("shared client", shared_client_payouts),
+                      (f"{CHANNELS} channels", channel_payouts), ("batched", batched_payouts)):
+        start = time.perf_counter()
+        await run(url, master, recipient)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {PAYMENTS / elapsed:.1f} payments/s")
+    await horizon.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,11 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import numpy as np
-from ai_analysis import TransactionAnalyzer
+from sklearn.ensemble import IsolationForest
+from ai_analysis import FeaturePipeline, TransactionAnalyzer
 
 class TestTransactionAnalyzer(unittest.TestCase):
     def setUp(self):
@@ -12,7 +15,7 @@ class TestTransactionAnalyzer(unittest.TestCase):
             'transaction_id': range(1, 101),
             'amount': np.random.normal(100, 20, 100).tolist(),
             'transaction_type': np.random.choice(['deposit', 'withdrawal'], 100),
-            'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='H')
+            'timestamp': pd.date_range(start='2023-01-01', periods=100, freq='h')
         })
 
         # Introduce some anomalies
@@ -93,5 +96,63 @@ class TestTransactionAnalyzer(unittest.TestCase):
         self.analyzer.send_alert(anomalies)
         mock_smtp.assert_called_once()  # Check if SMTP was called
 
+class TestFeaturePipeline(unittest.TestCase):
+    def setUp(self):
+        """Build a training frame and an analyzer that scores in small chunks."""
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'transaction_id': range(200),
+            'amount': rng.normal(100, 20, 200),
+            'transaction_type': rng.choice(['deposit', 'withdrawal'], 200),
+            'timestamp': pd.date_range(start='2023-01-01', periods=200, freq='h')
+        })
+        self.analyzer = TransactionAnalyzer(IsolationForest(contamination=0.1, random_state=0), chunk_size=32)
+        self.analyzer.ingest_data(self.data)
+        self.analyzer.train_model()
+
+    def test_scoring_does_not_refit_scaler(self):
+        """Test that scoring new data leaves the fitted scaler unchanged."""
+        mean = self.analyzer.scaler.mean_.copy()
+        shifted = self.data.assign(amount=self.data['amount'] * 10)
+        self.analyzer.detect_anomalies(shifted)
+        np.testing.assert_array_equal(self.analyzer.scaler.mean_, mean)
+
+    def test_category_codes_are_stable(self):
+        """Test that refitting keeps learned codes and unseen types get -1."""
+        pipeline = FeaturePipeline().fit(pd.DataFrame({
+            'amount': [1.0, 2.0], 'transaction_type': ['withdrawal', 'deposit'],
+            'timestamp': ['2023-01-01', '2023-01-02']}))
+        pipeline.fit(pd.DataFrame({
+            'amount': [1.0, 2.0], 'transaction_type': ['deposit', 'transfer'],
+            'timestamp': ['2023-01-01', '2023-01-02']}))
+        self.assertEqual(pipeline.categories, {'withdrawal': 0, 'deposit': 1, 'transfer': 2})
+        codes = pipeline.encode(pd.DataFrame({
+            'amount': [1.0], 'transaction_type': ['refund'], 'timestamp': ['2023-01-01']}))[:, 1]
+        self.assertEqual(codes.tolist(), [-1.0])
+
+    def test_chunked_scoring_matches_whole_frame(self):
+        """Test that chunks and an iterator of frames flag the same transactions."""
+        whole = set(self.analyzer.detect_anomalies()['transaction_id'])
+        frames = (self.data.iloc[start:start + 50] for start in range(0, len(self.data), 50))
+        streamed = self.analyzer.detect_anomalies(frames)
+        self.assertEqual(set(streamed['transaction_id']), whole)
+        self.assertTrue((streamed['anomaly_score'] < 0).all())
+
+    def test_append_data(self):
+        """Test that appended frames are added to the ingested data."""
+        self.analyzer.append_data(self.data.iloc[:10])
+        self.analyzer.append_data(self.data.iloc[10:15])
+        self.assertEqual(len(self.analyzer.transaction_data), 215)
+
+    def test_saved_model_keeps_pipeline(self):
+        """Test that a reloaded analyzer scores with the saved encoders and scaler."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.pkl')
+            self.analyzer.save_model(path)
+            loaded = TransactionAnalyzer()
+            loaded.load_model(path)
+        self.assertEqual(loaded.pipeline.categories, self.analyzer.pipeline.categories)
+        pd.testing.assert_frame_equal(loaded.detect_anomalies(self.data), self.analyzer.detect_anomalies(self.data))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from ai_fraud_detection import AIFraudDetection, transaction_features
+
+def small_model():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(1, 1000, 200), rng.integers(0, 3, 200)])
+    y = (X[:, 0] > 900).astype(int)
+    return RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+
+class TestAIFraudDetection(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Create a detector around a small pre-trained model."""
+        self.detector = AIFraudDetection(model=small_model(), max_batch=64, max_delay=0.01, history_size=100)
+        self.transactions = [{'amount': float(amount), 'transaction_type': 'transfer'}
+                             for amount in np.linspace(1, 1000, 300)]
+
+    def test_batch_matches_single_predictions(self):
+        """Test that vectorized scoring gives the same verdicts as one call per transaction."""
+        single = [self.detector.detect_fraud(transaction) for transaction in self.transactions]
+        self.assertEqual(self.detector.detect_fraud_batch(self.transactions), single)
+        self.assertTrue(any(single))
+
+    def test_history_is_bounded(self):
+        """Test that only the most recent transactions are kept."""
+        self.detector.detect_fraud_batch(self.transactions)
+        self.assertEqual(len(self.detector.transaction_history), 100)
+        self.assertEqual(self.detector.transaction_history[-1], self.transactions[-1])
+
+    async def test_concurrent_scores_are_micro_batched(self):
+        """Test that concurrent score() calls share predictions of at most max_batch rows."""
+        expected = self.detector.model.predict(transaction_features(self.transactions)).astype(bool).tolist()
+        verdicts = await self.detector.score_many(self.transactions)
+        self.assertEqual(verdicts, expected)
+        self.assertEqual(self.detector.batches, 5)
+
+    async def test_deadline_flushes_partial_batch(self):
+        """Test that a lone transaction is scored once max_delay passes."""
+        verdict = await self.detector.score({'amount': 950.0, 'transaction_type': 0})
+        self.assertTrue(verdict)
+        self.assertEqual(self.detector.batches, 1)
+
+    async def test_invalid_transaction_rejects_only_its_caller(self):
+        """Test that an unknown transaction type fails its own score() without failing the batch."""
+        results = await asyncio.gather(
+            self.detector.score({'amount': 950.0, 'transaction_type': 'transfer'}),
+            self.detector.score({'amount': 950.0, 'transaction_type': 'refund'}),
+            self.detector.score({'amount': 10.0, 'transaction_type': 2}),
+            return_exceptions=True)
+        self.assertEqual(results[0], True)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2], False)
+        self.assertEqual(self.detector.batches, 1)
+
+    async def test_start_trains_missing_model_off_loop(self):
+        """Test that start() trains and saves a model when the file is missing."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.pkl')
+            detector = AIFraudDetection(model_path=path)
+            await detector.start()
+            self.assertTrue(os.path.exists(path))
+            self.assertIsInstance(await detector.score({'amount': 10.0, 'transaction_type': 'deposit'}), bool)
+
+if __name__ == "__main__":
+    unittest.main()
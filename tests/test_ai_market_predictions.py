@@ -0,0 +1,82 @@
+import os
+import unittest
+import numpy as np
+from ai_market_predictions import AIMarketPredictions
+from market_backtest import WalkForwardBacktester, evaluate_positions, load_market_csv, sweep, walk_forward_splits
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'market_data.csv')
+SMALL_MODEL = {'n_estimators': 10, 'random_state': 0}
+
+class TestWalkForwardBacktester(unittest.TestCase):
+    def setUp(self):
+        """Load the OHLCV fixture."""
+        self.data = load_market_csv(FIXTURE)
+
+    def test_splits_never_train_on_test_rows(self):
+        """Test that each test window starts after its training window and windows tile the tail."""
+        splits = list(walk_forward_splits(100, 40, 15))
+        for train, test in splits:
+            self.assertEqual(train.stop, test.start)
+            self.assertEqual(train.stop - train.start, 40)
+        self.assertEqual([test.start for _, test in splits], [40, 55, 70, 85])
+        self.assertEqual(splits[-1][1].stop, 100)
+
+    def test_predictions_do_not_see_future_rows(self):
+        """Test that changing later rows leaves earlier predictions unchanged."""
+        before = WalkForwardBacktester(self.data, 200, 20, model_params=SMALL_MODEL).predictions()
+        changed = self.data.copy()
+        changed.iloc[300:] *= 2
+        after = WalkForwardBacktester(changed, 200, 20, model_params=SMALL_MODEL).predictions()
+        np.testing.assert_array_equal(before[:300], after[:300])
+        self.assertTrue(np.isnan(before[:200]).all())
+        self.assertFalse(np.isnan(before[200:-1]).any())
+
+    def test_grid_matches_individual_runs(self):
+        """Test that a vectorized parameter grid gives the same metrics as one run per parameter set."""
+        backtester = WalkForwardBacktester(self.data, 200, 20, model_params=SMALL_MODEL, cost=0.001)
+        thresholds = [{'threshold': t} for t in (-0.01, 0.0, 0.005)]
+        grid = backtester.run({'threshold': thresholds, 'momentum': [{'lookback': 5}, {'lookback': 20}]})
+        self.assertEqual(len(grid), 5)
+        for params in thresholds:
+            single = backtester.run({'threshold': [params]}).iloc[0]
+            row = grid[grid['params'] == params].iloc[0]
+            self.assertAlmostEqual(row['total_return'], single['total_return'])
+
+    def test_evaluate_positions(self):
+        """Test metrics on a hand-computed series."""
+        positions = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 0.0]])
+        returns = np.array([0.1, -0.5, 0.2])
+        metrics = evaluate_positions(positions, returns)
+        self.assertAlmostEqual(metrics['total_return'][0], 1.1 * 0.5 - 1)
+        self.assertAlmostEqual(metrics['max_drawdown'][0], 0.5)
+        self.assertEqual(metrics['trades'].tolist(), [2.0, 0.0])
+        self.assertEqual(metrics['total_return'][1], 0.0)
+
+    def test_sweep_across_processes(self):
+        """Test that a process-parallel sweep matches the sequential one."""
+        configs = [{'train_size': 150, 'model_params': SMALL_MODEL}, {'train_size': 200, 'model_params': SMALL_MODEL}]
+        strategies = {'long_short': [{'threshold': 0.0}, {'threshold': 0.01}]}
+        sequential = sweep(self.data, configs, strategies)
+        parallel = sweep(self.data, configs, strategies, processes=2)
+        self.assertEqual(len(parallel), 4)
+        np.testing.assert_allclose(parallel['total_return'], sequential['total_return'])
+
+class TestAIMarketPredictions(unittest.TestCase):
+    def setUp(self):
+        """Load the fixture through AIMarketPredictions."""
+        self.predictor = AIMarketPredictions()
+        self.predictor.load_market_data(FIXTURE)
+        self.predictor.preprocess_data()
+
+    def test_train_model_holds_out_latest_rows(self):
+        """Test that training reports an RMSE on a chronological hold-out."""
+        self.assertGreater(self.predictor.train_model(), 0)
+
+    def test_backtest_strategy(self):
+        """Test that the single-strategy backtest runs walk-forward and returns the final value."""
+        total = self.predictor.backtest_strategy(1000, model_params=SMALL_MODEL)
+        results = self.predictor.backtester(model_params=SMALL_MODEL).run({'threshold': [{'threshold': 0.0}]})
+        self.assertAlmostEqual(total, 1000 * (1 + results['total_return'].iloc[0]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import os
 import pytest
+from unittest.mock import MagicMock
 from fastapi.testclient import TestClient
+from stellar_sdk import Account
+import api
 from api import app  # Assuming your FastAPI implementation is in a file named api.py
 from wallet import Wallet
 
@@ -110,6 +113,29 @@ def test_create_transaction(login_user):
     assert response.status_code == 200
     assert response.json()["success"] is True
 
+def test_balance_is_fresh_after_transaction(login_user, monkeypatch):
+    """Test that a balance read after a transaction is not served from the view's cache."""
+    headers = {"Authorization": f"Bearer {login_user}"}
+    from_address = client.post("/addresses", headers=headers).json()["address"]
+    to_address = client.post("/addresses", headers=headers).json()["address"]
+    api.wallet.addresses[from_address] = 100.0
+    api.wallet_view.balance_cache.set(from_address, (100.0, 1))
+    assert client.get(f"/balance/{from_address}", headers=headers).json()["pi_balance"] == 100.0
+
+    server = MagicMock()
+    server.load_account.return_value = Account(from_address, 1)
+    server.submit_transaction.return_value = {"id": "tx1", "hash": "abc"}
+    monkeypatch.setattr(api, "stellar_server", server)
+    monkeypatch.setattr(api.wallet, "create_transaction", MagicMock())
+
+    async def fetch_balance(address):
+        return 50.0
+    monkeypatch.setattr(api.wallet_view, "_fetch_balance", fetch_balance)
+
+    transaction_data = {"from_address": from_address, "to_address": to_address, "amount": 50.0}
+    assert client.post("/transactions", json=transaction_data, headers=headers).status_code == 200
+    assert client.get(f"/balance/{from_address}", headers=headers).json()["pi_balance"] == 50.0
+
 def test_create_transaction_insufficient_funds(login_user):
     """Test creating a transaction with insufficient funds."""
     headers = {"Authorization": f"Bearer {login_user}"}
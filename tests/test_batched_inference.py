@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+import numpy as np
+from batched_inference import BatchPredictor, sliding_windows
+
+class CountingModel:
+    """Stands in for a network: the output is each window's mean."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, windows):
+        self.calls.append(len(windows))
+        return windows.mean(axis=(1, 2)).reshape(-1, 1)
+
+class TestSlidingWindows(unittest.TestCase):
+    def test_matches_loop(self):
+        """Test that the strided windows equal the ones built with a Python loop."""
+        data = np.arange(30, dtype=float).reshape(-1, 1)
+        X, y = sliding_windows(data, 10)
+        expected_X = np.array([data[i:i + 10] for i in range(len(data) - 10)])
+        expected_y = np.array([data[i + 10] for i in range(len(data) - 10)])
+        np.testing.assert_array_equal(X, expected_X)
+        np.testing.assert_array_equal(y, expected_y)
+        self.assertEqual(X.shape, (20, 10, 1))
+
+    def test_windows_are_views(self):
+        """Test that no window data is copied."""
+        data = np.random.rand(1000, 1)
+        X, y = sliding_windows(data, 10)
+        self.assertTrue(np.shares_memory(X, data))
+        self.assertTrue(np.shares_memory(y, data))
+
+    def test_too_short(self):
+        """Test that a series no longer than the window is rejected."""
+        with self.assertRaises(ValueError):
+            sliding_windows(np.zeros(10), 10)
+
+class TestBatchPredictor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Create a predictor around a model that records its batch sizes."""
+        self.model = CountingModel()
+        self.predictor = BatchPredictor(self.model, max_batch=8, max_delay=0.01, cache_size=100)
+        self.windows = [np.full((10, 1), float(i)) for i in range(20)]
+
+    async def test_concurrent_requests_share_forward_passes(self):
+        """Test that concurrent predictions are coalesced into batches of at most max_batch."""
+        results = await asyncio.gather(*(self.predictor.predict(window) for window in self.windows))
+        self.assertEqual(results, [float(i) for i in range(20)])
+        self.assertEqual(self.model.calls, [8, 8, 4])
+
+    async def test_identical_windows_are_deduplicated(self):
+        """Test that one window requested many times occupies one row."""
+        results = await asyncio.gather(*(self.predictor.predict(self.windows[3]) for _ in range(5)))
+        self.assertEqual(results, [3.0] * 5)
+        self.assertEqual(self.model.calls, [1])
+
+    def test_cache_skips_model(self):
+        """Test that cached windows are not predicted again until invalidated."""
+        self.predictor.predict_many(self.windows[:4])
+        self.predictor.predict_many(self.windows[2:6])
+        self.assertEqual(self.model.calls, [4, 2])
+        self.predictor.invalidate()
+        self.predictor.predict_many(self.windows[:1])
+        self.assertEqual(self.model.calls, [4, 2, 1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 import json
+import blockchain as blockchain_module
 from blockchain import Blockchain  # Assuming your blockchain code is in blockchain.py
 from flask import Flask
 
@@ -90,5 +91,54 @@ class TestBlockchain(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'chain', response.data)
 
+class TestChainExport(unittest.TestCase):
+
+    def setUp(self):
+        """Point the module's REST API at a chain with a few mined blocks."""
+        blockchain_module.blockchain = self.blockchain = Blockchain()
+        self.blockchain.difficulty = 0
+        for i in range(9):
+            self.blockchain.add_block([{"sender": "Alice", "recipient": "Bob", "amount": i}])
+        self.client = blockchain_module.app.test_client()
+
+    def test_get_blocks_range(self):
+        """Test range retrieval and the continuation index."""
+        blocks, next_cursor = self.blockchain.get_blocks(2, 3)
+        self.assertEqual([block["index"] for block in blocks], [2, 3, 4])
+        self.assertEqual(next_cursor, 5)
+        blocks, next_cursor = self.blockchain.get_blocks(8, 5)
+        self.assertEqual([block["index"] for block in blocks], [8, 9])
+        self.assertIsNone(next_cursor)
+
+    def test_api_blocks_cursor_pagination(self):
+        """Test walking the chain page by page with next_cursor."""
+        indexes, cursor = [], None
+        while True:
+            query = f"?limit=4&cursor={cursor}" if cursor is not None else "?limit=4"
+            page = self.client.get('/blocks' + query).get_json()
+            indexes.extend(block["index"] for block in page["blocks"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(indexes, list(range(10)))
+
+    def test_api_blocks_bad_arguments(self):
+        """Test that malformed ranges are rejected."""
+        self.assertEqual(self.client.get('/blocks?start=-1').status_code, 400)
+        self.assertEqual(self.client.get('/blocks?limit=0').status_code, 400)
+
+    def test_api_export_ndjson(self):
+        """Test that the NDJSON export streams one block per line for a range."""
+        response = self.client.get('/chain/export?start=3&end=6')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)["index"] for line in lines], [3, 4, 5])
+
+    def test_api_full_chain_document(self):
+        """Test that the streamed /chain body is the same document as before."""
+        data = json.loads(self.client.get('/chain').get_data(as_text=True))
+        self.assertEqual(data["length"], 10)
+        self.assertEqual(data["chain"], self.blockchain.get_chain())
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from chain_transport import AsyncChainTransport, CircuitBreaker, CircuitOpenError, ConfirmationWatcher
+from interoperability import CrossChainInteroperability
+from mock_chain_server import MockChainServer
+
+class TestChainTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a local mock chain and point the transport at it."""
+        self.server = MockChainServer(confirmation_delay=0.2)
+        url = await self.server.start()
+        self.apis = {"Ethereum": {"url": url, "api_key": "key"}, "BinanceSmartChain": {"url": url, "api_key": "key"}}
+        self.transport = AsyncChainTransport(self.apis, base_delay=0.01, failure_threshold=3, reset_timeout=60)
+
+    async def asyncTearDown(self):
+        await self.transport.close()
+        await self.server.stop()
+
+    async def test_retry_after_transient_failure(self):
+        """Test that a transient 503 is retried with backoff."""
+        self.server.fail_next(2)
+        response = await self.transport.post("Ethereum", "/send", {"amount": 1, "recipient": "bob"})
+        self.assertEqual(response["status"], "success")
+        self.assertEqual(self.server.request_count, 3)
+
+    async def test_circuit_breaker_opens(self):
+        """Test that repeated failures open the circuit and stop requests."""
+        self.server.fail_next(10)
+        with self.assertRaises(Exception):
+            await self.transport.post("Ethereum", "/send", {"amount": 1, "recipient": "bob"})
+        self.assertEqual(self.transport.breaker("Ethereum").state, "open")
+        with self.assertRaises(CircuitOpenError):
+            await self.transport.post("Ethereum", "/send", {"amount": 1, "recipient": "bob"})
+        self.assertEqual(self.server.request_count, 3)
+
+    async def test_unsupported_chain(self):
+        """Test requesting an unknown chain."""
+        with self.assertRaises(ValueError):
+            await self.transport.get("Solana", "/balance")
+
+    async def test_watcher_batches_confirmations(self):
+        """Test that many pending transactions are confirmed with few status queries."""
+        watcher = ConfirmationWatcher(self.transport, poll_interval=0.05, batch_size=100)
+        transaction_ids = []
+        for _ in range(150):
+            response = await self.transport.post("Ethereum", "/send", {"amount": 1, "recipient": "bob"})
+            transaction_ids.append(response["transaction_id"])
+        results = await watcher.wait_for("Ethereum", transaction_ids, timeout=5)
+        self.assertTrue(all(results.values()))
+        self.assertLess(self.server.status_queries, 40)
+
+    async def test_watcher_timeout(self):
+        """Test that an unconfirmed transaction resolves to False at its deadline."""
+        watcher = ConfirmationWatcher(self.transport, poll_interval=0.05)
+        results = await watcher.wait_for("Ethereum", ["unknown"], timeout=0.1)
+        self.assertEqual(results, {"unknown": False})
+
+    async def test_non_json_client_error_is_not_retried(self):
+        """Test that a plain-text 4xx is returned as an error without retries or circuit failures."""
+        response = await self.transport.get("Ethereum", "/missing")
+        self.assertEqual(response["status"], "error")
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.transport.breaker("Ethereum").failures, 0)
+
+    async def test_watcher_survives_failed_rounds(self):
+        """Test that an unexpected error in one polling round does not stop confirmations."""
+        watcher = ConfirmationWatcher(self.transport, poll_interval=0.05)
+        response = await self.transport.post("Ethereum", "/send", {"amount": 1, "recipient": "bob"})
+        post = self.transport.post
+        calls = []
+
+        async def flaky_post(chain, path, payload):
+            calls.append(path)
+            if len(calls) == 1:
+                return ["not", "a", "status", "response"]
+            return await post(chain, path, payload)
+
+        self.transport.post = flaky_post
+        with self.assertLogs(level="ERROR"):
+            results = await watcher.wait_for("Ethereum", [response["transaction_id"]], timeout=5)
+        self.assertTrue(results[response["transaction_id"]])
+        self.assertGreater(len(calls), 1)
+
+    async def test_closed_watcher_fails_pending_transactions(self):
+        """Test that stopping the watcher fails the transactions it was still watching."""
+        watcher = ConfirmationWatcher(self.transport, poll_interval=0.05)
+        future = watcher.watch("Ethereum", "unknown", timeout=60)
+        await asyncio.sleep(0.1)
+        await watcher.close()
+        with self.assertRaises(Exception):
+            await future
+
+    async def test_interoperability_async_send_and_confirm(self):
+        """Test the async bridge path end to end against the mock chain."""
+        interoperability = CrossChainInteroperability(blockchain_apis=self.apis)
+        interoperability.watcher.poll_interval = 0.05
+        sent = await interoperability.send_asset_async("Ethereum", "BinanceSmartChain", 1.5, "bob")
+        confirmed = await interoperability.confirm_transactions("Ethereum", [sent["transaction_id"]], timeout=5)
+        self.assertTrue(confirmed[sent["transaction_id"]])
+        await interoperability.close()
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_half_open_after_reset_timeout(self):
+        """Test that the breaker lets a trial request through after its cool-down."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+if __name__ == "__main__":
+    unittest.main()
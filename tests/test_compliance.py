@@ -2,7 +2,9 @@ import unittest
 import os
 import json
 import sqlite3
-from compliance import Compliance  # Assuming compliance.py is in the same directory
+import tempfile
+import numpy as np
+from compliance import Compliance, StreamingAnomalyDetector  # Assuming compliance.py is in the same directory
 
 class TestCompliance(unittest.TestCase):
     @classmethod
@@ -14,8 +16,9 @@ class TestCompliance(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Clean up the temporary database after tests."""
-        if os.path.exists(cls.db_name):
-            os.remove(cls.db_name)
+        for filename in (cls.db_name, 'test_compliance.detector'):
+            if os.path.exists(filename):
+                os.remove(filename)
 
     def test_register_user(self):
         """Test user registration."""
@@ -81,5 +84,110 @@ class TestCompliance(unittest.TestCase):
         self.assertTrue(os.path.exists(csv_file))
         os.remove(csv_file)  # Clean up
 
+class TestStreamingMonitoring(unittest.TestCase):
+    def setUp(self):
+        """Set up a compliance database and model file in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.temp_dir.name, 'compliance.db')
+        self.model_path = os.path.join(self.temp_dir.name, 'detector.joblib')
+        self.rng = np.random.default_rng(7)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def insert_transactions(self, compliance, values, user_id='user1'):
+        with compliance.conn:
+            compliance.conn.executemany(
+                'INSERT INTO transactions (user_id, value, timestamp) VALUES (?, ?, ?)',
+                [(user_id, float(value), '2024-01-01T00:00:00') for value in values])
+
+    def test_transactions_are_scored_on_ingest(self):
+        """Test that an outlier is flagged when it is logged, without a monitoring pass."""
+        compliance = Compliance(db_name=self.db_name, refit_every=100)
+        self.insert_transactions(compliance, self.rng.normal(100, 10, 500))
+        compliance.log_transaction('user2', 100)  # Catches up on the bulk insert
+        compliance.log_transaction('user3', 100000)
+        flagged = compliance.conn.execute('SELECT user_id, reason FROM suspicious_transactions').fetchall()
+        self.assertIn(('user3', 'isolation_forest'), flagged)
+        self.assertEqual(compliance.detector.last_transaction_id, 502)
+
+    def test_monitoring_reads_only_new_rows(self):
+        """Test that each pass scores only transactions newer than the previous one."""
+        compliance = Compliance(db_name=self.db_name, refit_every=100)
+        self.insert_transactions(compliance, self.rng.normal(100, 10, 300))
+        compliance.monitor_transactions()
+        self.assertEqual(compliance.score_new_transactions(), 0)
+        self.insert_transactions(compliance, [50000])
+        self.assertEqual(compliance.score_new_transactions(), 1)
+        self.assertEqual(compliance.monitor_transactions(), ['user1'])
+        self.assertEqual(compliance.monitor_transactions(), [])
+        flagged = compliance.conn.execute('SELECT user_id FROM suspicious_transactions').fetchall()
+        self.assertIn(('user1',), flagged)
+
+    def test_default_settings_flag_outliers_during_warm_up(self):
+        """Test that with default settings an outlier after a few hundred transactions is flagged."""
+        for seed in range(5):
+            db_name = os.path.join(self.temp_dir.name, f'warmup{seed}.db')
+            compliance = Compliance(db_name=db_name)
+            rng = np.random.default_rng(seed)
+            self.insert_transactions(compliance, rng.normal(100, 10, 500))
+            compliance.score_new_transactions()
+            compliance.log_transaction('user2', 1e6)
+            flagged = compliance.conn.execute('SELECT user_id, reason FROM suspicious_transactions').fetchall()
+            self.assertIn(('user2', 'isolation_forest'), flagged)
+            compliance.conn.close()
+
+    def test_user_deviation(self):
+        """Test that a value normal globally but unusual for its user is flagged."""
+        detector = StreamingAnomalyDetector(refit_every=50)
+        for value in self.rng.normal(1000, 50, 200):
+            detector.update('whale', value)
+        for value in self.rng.normal(10, 1, 50):
+            detector.update('minnow', value)
+        self.assertEqual(detector.update('minnow', 1000)[2], 'user_deviation')
+
+    def test_detector_state_survives_restart(self):
+        """Test that a restarted monitor resumes from the saved detector state."""
+        compliance = Compliance(db_name=self.db_name, model_path=self.model_path)
+        self.insert_transactions(compliance, self.rng.normal(100, 10, 200))
+        compliance.monitor_transactions()
+        compliance.conn.close()
+
+        restarted = Compliance(db_name=self.db_name, model_path=self.model_path)
+        self.assertEqual(restarted.detector.last_transaction_id, 200)
+        self.assertEqual(len(restarted.detector.window), 200)
+        self.assertEqual(restarted.score_new_transactions(), 0)
+
+    def test_ingest_path_saves_detector_state(self):
+        """Test that log_transaction saves the detector so a restart does not rescore old rows."""
+        compliance = Compliance(db_name=self.db_name, model_path=self.model_path, save_every=10)
+        for value in self.rng.normal(100, 10, 25):
+            compliance.log_transaction('user1', float(value))
+        compliance.conn.close()
+
+        restarted = Compliance(db_name=self.db_name, model_path=self.model_path)
+        self.assertEqual(restarted.detector.last_transaction_id, 20)
+        self.assertEqual(restarted.detector.user_stats['user1'][0], 20)
+        self.assertEqual(restarted.score_new_transactions(), 5)
+        self.assertEqual(restarted.detector.user_stats['user1'][0], 25)
+
+    def test_new_detector_starts_at_latest_row(self):
+        """Test that without saved state history is used to warm up, not rescored, and state is saved by default."""
+        compliance = Compliance(db_name=self.db_name, window_size=100)
+        self.insert_transactions(compliance, self.rng.normal(100, 10, 300))
+        compliance.conn.close()
+
+        restarted = Compliance(db_name=self.db_name, window_size=100)
+        self.assertEqual(restarted.model_path, os.path.join(self.temp_dir.name, 'compliance.detector'))
+        self.assertTrue(os.path.exists(restarted.model_path))
+        self.assertEqual(restarted.detector.last_transaction_id, 300)
+        self.assertEqual(len(restarted.detector.window), 100)
+        self.assertEqual(restarted.detector.user_stats['user1'][0], 100)
+        self.assertIsNotNone(restarted.detector.model)
+        self.assertEqual(restarted.score_new_transactions(), 0)
+        restarted.log_transaction('user2', 1e6)
+        flagged = restarted.conn.execute('SELECT user_id FROM suspicious_transactions').fetchall()
+        self.assertEqual(flagged, [('user2',)])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from contract_events import EventStore
+
+class TestEventStore(unittest.TestCase):
+    def setUp(self):
+        """Create a store with a typed Transfer event."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = EventStore(self.temp_dir.name, tail_size=5, segment_size=4)
+        self.store.define("Token", "Transfer", {"sender": str, "recipient": str, "amount": int},
+                          indexed=["sender", "recipient"])
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def transfer(self, sender, recipient, amount, contract="Token"):
+        return self.store.emit(contract, "Transfer", {"sender": sender, "recipient": recipient, "amount": amount})
+
+    def emit_history(self):
+        for height in range(10):
+            self.store.set_block_height(height)
+            self.transfer("alice", "bob" if height % 2 else "carol", height)
+            self.store.emit("Token", "Approval", {"owner": "alice"}, indexed=["owner"])
+
+    def test_typed_events_are_checked(self):
+        """Test that declared events reject missing and mistyped arguments."""
+        with self.assertRaises(ValueError):
+            self.store.emit("Token", "Transfer", {"sender": "alice"})
+        with self.assertRaises(TypeError):
+            self.transfer("alice", "bob", "10")
+        with self.assertRaises(TypeError):
+            self.store.emit("Token", "Note", {"tags": ["a"]}, indexed=["tags"])
+
+    def test_query_by_topic_since_height(self):
+        """Test "all Transfers to bob since height 5", including events evicted from the tail."""
+        self.emit_history()
+        events = self.store.query("Token", "Transfer", topics={"recipient": "bob"}, from_height=5)
+        self.assertEqual([event.block_height for event in events], [5, 7, 9])
+        events = self.store.query("Token", "Transfer", topics={"recipient": "bob"}, to_height=4)
+        self.assertEqual([event.args["amount"] for event in events], [1, 3])
+
+    def test_query_filters_and_order(self):
+        """Test name-only queries across contracts, limits and newest-first order."""
+        self.emit_history()
+        self.transfer("dave", "erin", 1, contract="OtherToken")
+        self.assertEqual(len(self.store.query(name="Transfer")), 11)
+        self.assertEqual(len(self.store.query("Token")), 20)
+        latest = self.store.query("Token", "Approval", limit=2, reverse=True)
+        self.assertEqual([event.block_height for event in latest], [9, 8])
+
+    def test_reopen_rebuilds_indexes(self):
+        """Test that segments on disk are re-indexed on open."""
+        self.emit_history()
+        self.store.close()
+        reopened = EventStore(self.temp_dir.name, tail_size=5, segment_size=4)
+        self.assertEqual(len(reopened), 20)
+        self.assertEqual(reopened.block_height, 9)
+        events = reopened.query("Token", "Transfer", topics={"sender": "alice"}, from_height=8)
+        self.assertEqual([event.args["recipient"] for event in events], ["carol", "bob"])
+        self.assertEqual(len([name for name in os.listdir(self.temp_dir.name) if name.endswith(".ndjson")]), 5)
+
+    def test_equal_numeric_topics_share_a_posting_list(self):
+        """Test that 1, 1.0 and True match each other in topic filters, but "1" does not."""
+        for value in (1, 1.0, True, "1", 2.5):
+            self.store.emit("Token", "Flag", {"value": value}, indexed=["value"])
+        for value in (1, 1.0, True):
+            events = self.store.query("Token", "Flag", topics={"value": value})
+            self.assertEqual([event.args["value"] for event in events], [1, 1.0, True])
+        self.assertEqual(len(self.store.query("Token", "Flag", topics={"value": "1"})), 1)
+        self.assertEqual(len(self.store.query("Token", "Flag", topics={"value": 2.5})), 1)
+
+    def test_segment_reads_reuse_open_handles(self):
+        """Test that reading evicted events keeps a bounded set of segment handles open."""
+        store = EventStore(os.path.join(self.temp_dir.name, "bounded"), tail_size=1, segment_size=2,
+                           max_open_segments=2)
+        self.addCleanup(store.close)
+        for n in range(10):
+            store.emit("Token", "Tick", {"n": n})
+        self.assertEqual([event.args["n"] for event in store.query("Token")], list(range(10)))
+        self.assertEqual(list(store._readers), [3, 4])
+        reader = store._readers[4]
+        store.get(8)
+        self.assertIs(store._readers[4], reader)
+        store.close()
+        self.assertTrue(reader.closed)
+
+    def test_memory_only_store_is_bounded(self):
+        """Test that without a directory only the tail is kept."""
+        store = EventStore(tail_size=3)
+        for height in range(6):
+            store.set_block_height(height)
+            store.emit("Token", "Tick", {"n": height})
+        self.assertEqual([event.args["n"] for event in store.query("Token")], [3, 4, 5])
+        self.assertEqual([event.args["n"] for event in store.query("Token", from_height=4)], [4, 5])
+        self.assertEqual(store.by_contract["Token"], [3, 4, 5])
+        with self.assertRaises(ValueError):
+            store.set_block_height(2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+from contract_state import ContractState, StateStore
+
+class TestContractState(unittest.TestCase):
+    def test_revert_restores_previous_values(self):
+        """Test that reverting a frame undoes sets and deletes, including nested frames."""
+        state = ContractState({"a": 1, "b": 2})
+        state.begin()
+        state["a"] = 10
+        del state["b"]
+        state.begin()
+        state["c"] = 3
+        state.commit()  # Folds into the outer frame
+        state.revert()
+        self.assertEqual(state.to_dict(), {"a": 1, "b": 2})
+        self.assertEqual(state.dirty, set())
+
+    def test_transaction_context(self):
+        """Test that the transaction block commits on success and reverts on error."""
+        state = ContractState()
+        with state.transaction():
+            state["x"] = 1
+        with self.assertRaises(KeyError):
+            with state.transaction():
+                state["x"] = 2
+                del state["missing"]
+        self.assertEqual(state["x"], 1)
+        self.assertFalse(state.in_transaction)
+
+    def test_take_dirty(self):
+        """Test that only changed keys are reported, with deletes listed separately."""
+        state = ContractState({"a": 1, "b": 2, "c": 3})
+        state["a"] = 5
+        del state["b"]
+        self.assertEqual(state.take_dirty(), ({"a": 5}, ["b"]))
+        self.assertEqual(state.take_dirty(), ({}, []))
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = StateStore(self.temp_dir.name, snapshot_interval=2)
+        self.header = {"contract_name": "Token", "owner": "Alice"}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_journal(self):
+        with open(self.store.journal_path("Token")) as f:
+            return [json.loads(line) for line in f]
+
+    def test_journal_holds_only_changed_keys(self):
+        """Test that saves after the first snapshot append just the dirty keys."""
+        state = ContractState({f"holder{i}": i for i in range(1000)})
+        self.store.save("Token", state, self.header, [])
+        state["holder7"] = 70
+        self.store.save("Token", state, self.header, ["minted"])
+        self.assertEqual(self.read_journal(), [{"sequence": 2, "set": {"holder7": 70}, "delete": [],
+                                                "events": ["minted"]}])
+
+    def test_restart_replays_journal(self):
+        """Test that loading applies journal entries newer than the snapshot."""
+        state = ContractState({"a": 1, "b": 2})
+        self.store.save("Token", state, self.header, [])
+        state["a"] = 3
+        self.store.save("Token", state, self.header, [])
+        del state["b"]
+        self.store.save("Token", state, self.header, ["burned"])
+        state["c"] = 4
+        self.store.save("Token", state, self.header, ["burned"])  # Journal is full, so this one snapshots
+        self.assertFalse(os.path.exists(self.store.journal_path("Token")))
+        state["c"] = 5
+        self.store.save("Token", state, self.header, ["burned"])
+
+        header, loaded, events = StateStore(self.temp_dir.name).load("Token")
+        self.assertEqual(header, self.header)
+        self.assertEqual(loaded.to_dict(), {"a": 3, "c": 5})
+        self.assertEqual(events, ["burned"])
+
+    def test_truncated_journal_tail_is_ignored(self):
+        """Test that a partially written journal entry is dropped on load."""
+        state = ContractState({"a": 1})
+        self.store.save("Token", state, self.header, [])
+        state["a"] = 2
+        self.store.save("Token", state, self.header, [])
+        with open(self.store.journal_path("Token"), "a") as f:
+            f.write('{"sequence": 3, "set": {"a"')
+        store = StateStore(self.temp_dir.name, snapshot_interval=2)
+        _, loaded, _ = store.load("Token")
+        self.assertEqual(loaded["a"], 2)
+        self.assertEqual(len(self.read_journal()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
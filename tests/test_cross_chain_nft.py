@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+from cross_chain_nft import CrossChainNFT, NFTEventLog
+
+class TestCrossChainNFT(unittest.TestCase):
+    def setUp(self):
+        """Set up an NFT manager with an event log in a temporary directory."""
+        self.log_dir = tempfile.mkdtemp()
+        self.nft = CrossChainNFT(event_log_dir=self.log_dir, segment_size=3)
+        self.nft.register_blockchain("Ethereum", "http://localhost:8545")
+
+    def tearDown(self):
+        asyncio.run(self.nft.close())
+        shutil.rmtree(self.log_dir)
+
+    def test_batch_mint_appends_once(self):
+        """Test that a batch mint records one event per NFT and indexes the owner."""
+        nft_ids = self.nft.batch_mint_nfts("Ethereum", "alice", [{"name": str(i)} for i in range(5)])
+        self.assertEqual(len(nft_ids), 5)
+        self.assertEqual(len(self.nft.event_log), 5)
+        self.assertEqual(self.nft.get_nfts_by_owner("alice"), set(nft_ids))
+
+    def test_batch_mint_unregistered_chain(self):
+        """Test minting on an unregistered chain."""
+        self.assertEqual(self.nft.batch_mint_nfts("Solana", "alice", [{}]), [])
+        self.assertFalse(self.nft.mint_nft("Solana", "alice", {}))
+
+    def test_batch_transfer_is_atomic(self):
+        """Test that a batch with an unknown NFT transfers nothing."""
+        nft_ids = self.nft.batch_mint_nfts("Ethereum", "alice", [{}, {}])
+        self.assertFalse(self.nft.batch_transfer_nfts(nft_ids + ["missing"], "bob"))
+        self.assertEqual(self.nft.get_nfts_by_owner("bob"), set())
+        self.assertTrue(self.nft.batch_transfer_nfts(nft_ids, "bob"))
+        self.assertEqual(self.nft.get_nfts_by_owner("bob"), set(nft_ids))
+        self.assertEqual(self.nft.get_nfts_by_owner("alice"), set())
+
+    def test_event_log_segments_and_replay(self):
+        """Test that the log rotates segments and rebuilds its index on reopen."""
+        nft_ids = self.nft.batch_mint_nfts("Ethereum", "alice", [{} for _ in range(7)])
+        self.nft.transfer_nft(nft_ids[0], "bob")
+        self.nft.save_event_log()
+        self.nft.event_log.close()
+
+        reopened = NFTEventLog(self.log_dir, segment_size=3)
+        self.assertEqual(len(reopened), 8)
+        self.assertEqual(reopened.segment_number, 2)
+        self.assertEqual(reopened.nfts_for_owner("bob"), {nft_ids[0]})
+        self.assertEqual([event["nft_id"] for event in reopened.read(offset=6, limit=1)], [nft_ids[6]])
+        reopened.append({"event": "mint", "nft_id": "x", "owner": "carol"})
+        reopened.close()
+        self.assertEqual(len(NFTEventLog(self.log_dir, segment_size=3)), 9)
+
+    def test_replay_rebuilds_nfts_and_truncates_torn_tail(self):
+        """Test that reopening restores NFT records and drops a half-written last event."""
+        nft_ids = self.nft.batch_mint_nfts("Ethereum", "alice", [{"name": "a"}, {"name": "b"}])
+        self.nft.transfer_nft(nft_ids[1], "bob")
+        self.nft.set_royalties(nft_ids[0], 10)
+        self.nft.event_log.close()
+        path = self.nft.event_log._segments()[-1]
+        with open(path, 'a') as f:
+            f.write('{"event": "mint", "nft_id": "torn"')
+
+        with self.assertLogs(level='WARNING'):
+            reopened = CrossChainNFT(event_log_dir=self.log_dir, segment_size=3)
+        self.addCleanup(lambda: asyncio.run(reopened.close()))
+        self.assertEqual(len(reopened.event_log), 4)
+        self.assertEqual(reopened.get_nft_metadata(nft_ids[1]), {"name": "b"})
+        self.assertEqual(reopened.nfts[nft_ids[1]]["owner"], "bob")
+        self.assertEqual(reopened.get_royalties(nft_ids[0]), 10)
+        self.assertNotIn("torn", reopened.nfts)
+        with open(path) as f:
+            self.assertTrue(f.read().endswith("\n"))
+        reopened.transfer_nft(nft_ids[0], "carol")
+        self.assertEqual(reopened.get_nfts_by_owner("carol"), {nft_ids[0]})
+
+    def test_without_directory_events_stay_in_memory(self):
+        """Test that no event directory is created unless one is given."""
+        with tempfile.TemporaryDirectory() as cwd:
+            previous = os.getcwd()
+            os.chdir(cwd)
+            try:
+                nft = CrossChainNFT()
+                nft.register_blockchain("Ethereum", "http://localhost:8545")
+                nft_id = nft.mint_nft("Ethereum", "alice", {})
+                nft.save_event_log()
+                asyncio.run(nft.close())
+                self.assertEqual(os.listdir(cwd), [])
+            finally:
+                os.chdir(previous)
+        self.assertEqual([event["nft_id"] for event in nft.event_log.read()], [nft_id])
+
+    def test_in_memory_log_keeps_recent_events_and_all_nfts(self):
+        """Test that without a directory old events are dropped but every NFT is still tracked."""
+        nft = CrossChainNFT(max_events=3)
+        self.addCleanup(lambda: asyncio.run(nft.close()))
+        nft.register_blockchain("Ethereum", "http://localhost:8545")
+        nft_ids = nft.batch_mint_nfts("Ethereum", "alice", [{"name": str(i)} for i in range(5)])
+        nft.transfer_nft(nft_ids[0], "bob")
+        self.assertEqual(len(nft.event_log), 6)
+        self.assertEqual(len(nft.event_log.events), 3)
+        self.assertEqual([event["nft_id"] for event in nft.event_log.read()], nft_ids[3:] + nft_ids[:1])
+        self.assertEqual([event["nft_id"] for event in nft.event_log.read(offset=4, limit=1)], [nft_ids[4]])
+        self.assertEqual(nft.get_nfts_by_owner("alice"), set(nft_ids[1:]))
+        self.assertEqual(nft.get_nfts_by_owner("bob"), {nft_ids[0]})
+
+    def test_save_event_log_filename_is_deprecated(self):
+        """Test that the old filename argument still writes a JSON copy of the log, with a warning."""
+        nft_ids = self.nft.batch_mint_nfts("Ethereum", "alice", [{}, {}])
+        filename = os.path.join(self.log_dir, "event_log.json")
+        with self.assertWarns(DeprecationWarning):
+            self.nft.save_event_log(filename=filename)
+        with open(filename) as f:
+            self.assertEqual([event["nft_id"] for event in json.load(f)], nft_ids)
+
+    def test_fetch_many_uses_cache(self):
+        """Test that concurrent remote lookups are cached."""
+        client = self.nft.chain_client
+        client.cache.set(("http://localhost:8545", "cached"), {"nft_id": "cached"})
+        client._get_session = AsyncMock(side_effect=AssertionError("network should not be used"))
+        results = asyncio.run(self.nft.fetch_many_nft_data("Ethereum", ["cached"]))
+        self.assertEqual(results, {"cached": {"nft_id": "cached"}})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import unittest
+from event_emitter import EventEmitter
+
+class TestEventEmitter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.emitter = EventEmitter(max_queue=100)
+
+    async def asyncTearDown(self):
+        await self.emitter.close()
+
+    async def test_priority_order_and_removal(self):
+        """Test that higher priorities are queued first and removed listeners stop receiving."""
+        received = []
+        low = lambda data: received.append(("low", data))
+        high = lambda data: received.append(("high", data))
+        self.emitter.on("stake", low, priority=0)
+        self.emitter.on("stake", high, priority=5)
+        self.assertEqual([sub.listener for sub in self.emitter.subscribers("stake")], [high, low])
+        await self.emitter.emit("stake", 1)
+        await self.emitter.drain()
+        self.emitter.remove_listener("stake", low)
+        await self.emitter.emit("stake", 2)
+        await self.emitter.drain()
+        self.assertEqual(received, [("high", 1), ("low", 1), ("high", 2)])
+
+    async def test_slow_listener_does_not_block_others(self):
+        """Test that a dropping slow consumer neither stalls the emitter nor a fast consumer."""
+        fast, slow = [], []
+
+        async def slow_listener(data):
+            await asyncio.sleep(0.01)
+            slow.append(data)
+
+        self.emitter.on("tx", fast.append)
+        self.emitter.on("tx", slow_listener, max_queue=10, overflow="drop_oldest")
+        started = time.perf_counter()
+        for i in range(1000):
+            await self.emitter.emit("tx", i)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(fast), 1000)
+        metrics = self.emitter.metrics()["tx"]
+        self.assertGreater(metrics["dropped"], 900)
+        self.assertEqual(metrics["lag"], metrics["enqueued"] - metrics["delivered"] - metrics["dropped"])
+
+    async def test_block_applies_backpressure(self):
+        """Test that a blocking queue holds the emitter until the listener catches up."""
+        release = asyncio.Event()
+        received = []
+
+        async def gated(data):
+            await release.wait()
+            received.append(data)
+
+        self.emitter.on("tx", gated, max_queue=2, overflow="block")
+        for i in range(3):  # One in delivery, two queued
+            await self.emitter.emit("tx", i)
+        blocked = asyncio.ensure_future(self.emitter.emit("tx", 3))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+        self.assertEqual(self.emitter.metrics()["tx"]["lag"], 3)
+        release.set()
+        await blocked
+        await self.emitter.drain()
+        self.assertEqual(received, [0, 1, 2, 3])
+
+    async def test_coalesce_and_batches(self):
+        """Test that coalescing keeps the latest update per key and batches are delivered as lists."""
+        batches = []
+        self.emitter.on("balance", batches.append, overflow="coalesce", batch_size=10,
+                        coalesce_key=lambda data: data["user"])
+        for amount in range(5):
+            for user in ("alice", "bob"):
+                await self.emitter.emit("balance", {"user": user, "amount": amount})
+        await self.emitter.drain()
+        self.assertEqual(batches, [[{"user": "alice", "amount": 4}, {"user": "bob", "amount": 4}]])
+        self.assertEqual(self.emitter.metrics()["balance"]["dropped"], 8)
+
+    async def test_wildcard_topics(self):
+        """Test that wildcard subscriptions receive (topic, data) pairs for every matching topic."""
+        received = []
+        self.emitter.on("stake.*", received.append, with_topic=True)
+        await self.emitter.emit("stake.added", 1)
+        await self.emitter.emit("stake.removed", 2)
+        await self.emitter.emit("transfer", 3)
+        await self.emitter.drain()
+        self.assertEqual(received, [("stake.added", 1), ("stake.removed", 2)])
+
+if __name__ == "__main__":
+    unittest.main()
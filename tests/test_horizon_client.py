@@ -0,0 +1,230 @@
+import asyncio
+import unittest
+from threading import Thread
+from stellar_sdk import Asset, Keypair, Network
+from horizon_client import ChannelPool, HorizonClient, PaymentBatcher, PaymentError, get_horizon_client
+from mock_horizon import MockHorizon
+
+class TestHorizonClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a mock Horizon with a funded master account."""
+        self.horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE)
+        url = await self.horizon.start()
+        self.master = Keypair.random()
+        self.recipient = Keypair.random().public_key
+        self.horizon.create_account(self.master.public_key, sequence=100)
+        self.horizon.create_account(self.recipient)
+        self.client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, base_delay=0.01,
+                                    skip_memo_required_check=True)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.horizon.stop()
+
+    async def test_sequence_is_cached_between_submits(self):
+        """Test that the source account is loaded once for many payments."""
+        for _ in range(5):
+            response = await self.client.submit_payment(self.master, self.recipient, Asset.native(), "1")
+            self.assertTrue(response["successful"])
+        self.assertEqual(self.horizon.account_loads, 1)
+        self.assertEqual(self.horizon.accounts[self.master.public_key]["sequence"], 105)
+        self.assertEqual(self.horizon.balance(self.recipient), 10005)
+
+    async def test_resync_on_bad_sequence(self):
+        """Test that a stale cached sequence is resynced and the payment retried."""
+        await self.client.submit_payment(self.master, self.recipient, Asset.native(), "1")
+        self.horizon.accounts[self.master.public_key]["sequence"] += 3  # Another process submitted
+        response = await self.client.submit_payment(self.master, self.recipient, Asset.native(), "1")
+        self.assertTrue(response["successful"])
+        self.assertEqual(self.horizon.account_loads, 2)
+        self.assertEqual(len(self.horizon.payments), 2)
+
+    async def test_timeout_retries_same_envelope(self):
+        """Test that a transport failure resubmits the same transaction."""
+        self.horizon.fail_next(1)
+        await self.client.load_account(self.master.public_key)
+        response = await self.client.submit_payment(self.master, self.recipient, Asset.native(), "1")
+        self.assertTrue(response["successful"])
+        self.assertEqual(len(self.horizon.payments), 1)
+        self.assertEqual(self.horizon.submissions, 1)
+
+    async def test_other_errors_are_raised(self):
+        """Test that non-sequence failures surface to the caller."""
+        stranger = Keypair.random()
+        self.client.sequences.put(await self.client.load_account(self.master.public_key))
+        with self.assertRaises(Exception):
+            await self.client.submit_payment(stranger, self.recipient, Asset.native(), "1")
+
+    async def test_shared_client_registry(self):
+        """Test that modules share one client per Horizon URL."""
+        self.assertIs(get_horizon_client(self.horizon.url), get_horizon_client(self.horizon.url))
+        with self.assertRaises(ValueError):
+            get_horizon_client(self.horizon.url, pool_size=5)
+
+class TestPaymentBatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a mock Horizon with a funded master account and some recipients."""
+        self.horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE)
+        url = await self.horizon.start()
+        self.master = Keypair.random()
+        self.recipients = [Keypair.random().public_key for _ in range(250)]
+        self.horizon.create_account(self.master.public_key)
+        for recipient in self.recipients:
+            self.horizon.create_account(recipient, balance="0")
+        self.client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+        self.batcher = PaymentBatcher(self.client, self.master, max_delay=0.05)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.horizon.stop()
+
+    async def test_fan_out_is_batched(self):
+        """Test that 250 payments go out in three transactions."""
+        payments = [{"destination": r, "asset": Asset.native(), "amount": "1"} for r in self.recipients]
+        results = await self.batcher.pay_many(payments)
+        self.assertEqual(self.horizon.submissions, 3)
+        self.assertEqual(len({result["hash"] for result in results}), 3)
+        self.assertEqual([result["operation_index"] for result in results[:3]], [0, 1, 2])
+        self.assertTrue(all(self.horizon.balance(r) == 1 for r in self.recipients))
+
+    async def test_deadline_flushes_partial_batch(self):
+        """Test that a lone payment is sent once the deadline passes."""
+        result = await asyncio.wait_for(self.batcher.pay(self.recipients[0], Asset.native(), "5"), timeout=1)
+        self.assertEqual(result["operation_count"], 1)
+        self.assertEqual(self.horizon.balance(self.recipients[0]), 5)
+
+    async def test_failed_operation_rejects_only_its_caller(self):
+        """Test that a bad destination fails its own payment and the rest are resubmitted."""
+        missing = Keypair.random().public_key
+        payments = [{"destination": r, "asset": Asset.native(), "amount": "1"} for r in self.recipients[:4]]
+        payments.insert(2, {"destination": missing, "asset": Asset.native(), "amount": "1"})
+        results = await self.batcher.pay_many(payments)
+        self.assertIsInstance(results[2], PaymentError)
+        self.assertEqual(results[2].code, "op_no_destination")
+        self.assertEqual(sum(isinstance(result, dict) for result in results), 4)
+        self.assertEqual(self.horizon.submissions, 2)
+        self.assertEqual(len(self.horizon.payments), 4)
+
+class TestChannelPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a slow mock Horizon and provision four channel accounts."""
+        self.horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE, latency=0.02)
+        url = await self.horizon.start()
+        self.master = Keypair.random()
+        self.recipient = Keypair.random().public_key
+        self.horizon.create_account(self.master.public_key)
+        self.horizon.create_account(self.recipient, balance="0")
+        self.client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+        self.pool = ChannelPool(self.client)
+        await self.pool.provision(self.master, 4)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.horizon.stop()
+
+    async def test_provision_creates_accounts(self):
+        """Test that channels are created on the network and added to the pool."""
+        self.assertEqual(len(self.pool), 4)
+        self.assertTrue(all(channel.public_key in self.horizon.accounts for channel in self.pool.channels))
+
+    async def test_parallel_submission_through_channels(self):
+        """Test that concurrent payments use different channels while the master pays."""
+        master_sequence = self.horizon.accounts[self.master.public_key]["sequence"]
+        responses = await asyncio.gather(*(
+            self.pool.submit_payment(self.master, self.recipient, Asset.native(), "1") for _ in range(8)
+        ))
+        self.assertEqual(len({response["source_account"] for response in responses}), 4)
+        self.assertEqual(self.horizon.accounts[self.master.public_key]["sequence"], master_sequence)
+        self.assertTrue(all(payment[0] == self.master.public_key for payment in self.horizon.payments))
+        self.assertEqual(self.horizon.balance(self.recipient), 8)
+        self.assertEqual(self.pool.leased, 0)
+
+    async def test_channel_released_after_failure(self):
+        """Test that a failed transaction returns its channel to the pool."""
+        with self.assertRaises(Exception):
+            await self.pool.submit_payment(self.master, Keypair.random().public_key, Asset.native(), "1")
+        self.assertEqual(self.pool.leased, 0)
+
+class TestSharedAcrossEventLoops(unittest.TestCase):
+    def setUp(self):
+        """Serve a mock Horizon from its own thread so clients can be used from several event loops."""
+        self.server_loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.server_loop.run_forever, daemon=True)
+        self.thread.start()
+        self.horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE)
+        self.url = asyncio.run_coroutine_threadsafe(self.horizon.start(), self.server_loop).result()
+        self.master = Keypair.random()
+        self.recipient = Keypair.random().public_key
+        self.horizon.create_account(self.master.public_key)
+        self.horizon.create_account(self.recipient)
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.horizon.stop(), self.server_loop).result()
+        self.server_loop.call_soon_threadsafe(self.server_loop.stop)
+        self.thread.join()
+        self.server_loop.close()
+
+    def test_client_and_batcher_serve_successive_event_loops(self):
+        """Test that one client and batcher keep working after the loop that first used them closes."""
+        client = HorizonClient(self.url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+        batcher = PaymentBatcher(client, self.master, max_delay=0.01)
+
+        async def pay():
+            try:
+                return await batcher.pay(self.recipient, Asset.native(), "1")
+            finally:
+                await client.close()
+
+        for _ in range(2):
+            self.assertTrue(asyncio.run(pay())["successful"])
+        self.assertEqual(len(self.horizon.payments), 2)
+
+    def test_concurrent_event_loops_never_reuse_a_sequence(self):
+        """Test that two threads submitting through one client get distinct sequence numbers."""
+        client = HorizonClient(self.url, Network.TESTNET_NETWORK_PASSPHRASE, retries=20, base_delay=0.001,
+                               skip_memo_required_check=True)
+        errors = []
+
+        async def pay_five():
+            try:
+                for _ in range(5):
+                    await client.submit_payment(self.master, self.recipient, Asset.native(), "1")
+            finally:
+                await client.close()
+
+        def run():
+            try:
+                asyncio.run(pay_five())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.horizon.payments), 10)
+        self.assertEqual(self.horizon.accounts[self.master.public_key]["sequence"], 10)
+
+    def test_channel_pool_serves_successive_event_loops(self):
+        """Test that a channel pool can be waited on from a second event loop."""
+        client = HorizonClient(self.url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+        pool = ChannelPool(client)
+
+        async def pay_four():
+            try:
+                if not len(pool):
+                    await pool.provision(self.master, 2)
+                return await asyncio.gather(*(
+                    pool.submit_payment(self.master, self.recipient, Asset.native(), "1") for _ in range(4)
+                ))
+            finally:
+                await client.close()
+
+        for _ in range(2):
+            self.assertTrue(all(response["successful"] for response in asyncio.run(pay_four())))
+        self.assertEqual(len(self.horizon.payments), 8)
+
+if __name__ == "__main__":
+    unittest.main()
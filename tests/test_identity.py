@@ -1,5 +1,7 @@
+import time
 import unittest
-from identity import DecentralizedIdentity
+from unittest.mock import patch
+from identity import DecentralizedIdentity, LocalIPFSClient
 
 class TestDecentralizedIdentity(unittest.TestCase):
     def setUp(self):
@@ -70,5 +72,80 @@ class TestDecentralizedIdentity(unittest.TestCase):
             self.did_system.revoke_credential(self.user_id, "nonexistent_id")
         self.assertTrue("Identity does not exist." in str(context.exception))
 
+class TestCredentialVerificationCache(unittest.TestCase):
+    def setUp(self):
+        """Set up an identity system backed by the local IPFS stand-in."""
+        self.ipfs_client = LocalIPFSClient()
+        self.did_system = DecentralizedIdentity(ipfs_client=self.ipfs_client, pin_batch_size=10)
+        self.user_id = "user123"
+        self.did_system.create_identity(self.user_id)
+
+    def test_verification_result_is_cached(self):
+        """Test that repeated verification is served from the cache."""
+        credential = self.did_system.issue_credential(self.user_id, {"role": "admin"})
+        self.assertTrue(self.did_system.verify_credential(credential["credential_id"]))
+        self.assertEqual(len(self.did_system.verification_cache), 1)
+        self.assertTrue(self.did_system.verify_credential(credential["credential_id"]))
+        self.assertEqual(len(self.did_system.verification_cache), 1)
+
+    def test_revocation_invalidates_cached_result(self):
+        """Test that a cached result is not reused after revocation."""
+        credential = self.did_system.issue_credential(self.user_id, {"role": "admin"})
+        self.assertTrue(self.did_system.verify_credential(credential["credential_id"]))
+        self.did_system.revoke_credential(self.user_id, credential["credential_id"])
+        self.assertFalse(self.did_system.verify_credential(credential["credential_id"]))
+
+    def test_verify_many(self):
+        """Test verifying a batch of credentials, including an unknown one."""
+        ids = [self.did_system.issue_credential(self.user_id, {"index": i})["credential_id"] for i in range(5)]
+        results = self.did_system.verify_many(ids + ["nonexistent_id"])
+        self.assertTrue(all(results[credential_id] for credential_id in ids))
+        self.assertFalse(results["nonexistent_id"])
+
+    def test_deferred_pinning(self):
+        """Test that credentials are pinned to IPFS when flushed."""
+        credential = self.did_system.issue_credential(self.user_id, {"role": "admin"})
+        self.assertIsNone(credential["ipfs_hash"])
+        self.assertEqual(self.did_system.flush_pins(), 1)
+        stored = self.ipfs_client.get_json(credential["ipfs_hash"])
+        self.assertEqual(stored["credential_id"], credential["credential_id"])
+
+    def test_deadline_flushes_partial_batch(self):
+        """Test that a partly filled batch is pinned once the pin delay has passed."""
+        did_system = DecentralizedIdentity(ipfs_client=self.ipfs_client, pin_batch_size=10, pin_delay=0.05)
+        did_system.create_identity(self.user_id)
+        credential = did_system.issue_credential(self.user_id, {"role": "admin"})
+        deadline = time.monotonic() + 2
+        while credential["ipfs_hash"] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(credential["ipfs_hash"])
+        self.assertEqual(did_system.pending_pins, [])
+
+    def test_failed_pins_are_retried_then_requeued(self):
+        """Test that a transient IPFS failure is retried and a persistent one is queued again."""
+        did_system = DecentralizedIdentity(ipfs_client=self.ipfs_client, pin_batch_size=10, pin_base_delay=0.001)
+        did_system.create_identity(self.user_id)
+        credential = did_system.issue_credential(self.user_id, {"role": "admin"})
+        with patch.object(self.ipfs_client, "add_json", side_effect=[ConnectionError("down"), "QmHash"]) as add_json:
+            self.assertEqual(did_system.flush_pins(), 1)
+            self.assertEqual(add_json.call_count, 2)
+        self.assertEqual(credential["ipfs_hash"], "QmHash")
+
+        credential = did_system.issue_credential(self.user_id, {"role": "user"})
+        with patch.object(self.ipfs_client, "add_json", side_effect=ConnectionError("down")) as add_json:
+            self.assertEqual(did_system.flush_pins(), 0)
+            self.assertEqual(add_json.call_count, did_system.pin_retries)
+        self.assertEqual(did_system.pending_pins, [credential])
+        self.assertEqual(did_system.flush_pins(), 1)
+
+    def test_cache_eviction(self):
+        """Test that the verification cache stays within its bound."""
+        did_system = DecentralizedIdentity(ipfs_client=self.ipfs_client, cache_size=2)
+        did_system.create_identity(self.user_id)
+        ids = [did_system.issue_credential(self.user_id, {"index": i})["credential_id"] for i in range(3)]
+        for credential_id in ids:
+            self.assertTrue(did_system.verify_credential(credential_id))
+        self.assertEqual(len(did_system.verification_cache), 2)
+
 if __name__ == "__main__":
     unittest.main()
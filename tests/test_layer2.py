@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from layer2 import PaymentChannel
+from stellar_sdk import Keypair
+import time
+from layer2 import Layer2Network, PaymentChannel, Watchtower
 
 class TestPaymentChannel(unittest.TestCase):
     def setUp(self):
@@ -64,5 +66,174 @@ class TestPaymentChannel(unittest.TestCase):
         self.channel.dispute_resolution(timeout=1)
         self.assertFalse(self.channel.is_open)  # Ensure the channel is closed after timeout
 
+class TestLayer2Network(unittest.TestCase):
+    def setUp(self):
+        """Set up a small network: Alice - Bob - Carol - Dave, plus a thin Alice - Carol channel."""
+        self.settled = []
+        self.network = Layer2Network(settle=self.settled.append, max_settlement_batch=10)
+        self.ab = self.network.open_channel("Alice", "Bob", 100.0)
+        self.bc = self.network.open_channel("Bob", "Carol", 100.0)
+        self.cd = self.network.open_channel("Carol", "Dave", 100.0)
+        self.ac = self.network.open_channel("Alice", "Carol", 5.0)
+
+    def test_multi_hop_payment(self):
+        """Test that a payment is forwarded over the fewest hops with enough capacity."""
+        result = self.network.pay("Alice", "Dave", 20.0)
+        self.assertEqual(result["route"], [self.ab.channel_id, self.bc.channel_id, self.cd.channel_id])
+        self.assertEqual((self.ab.balance_a, self.ab.balance_b), (80.0, 20.0))
+        self.assertEqual((self.cd.balance_a, self.cd.balance_b), (80.0, 20.0))
+        self.assertEqual(self.ab.htlcs, {})
+
+    def test_small_payment_takes_shorter_route(self):
+        """Test that the direct thin channel is used when it can carry the amount."""
+        result = self.network.pay("Alice", "Dave", 5.0)
+        self.assertEqual(result["hops"], 2)
+        self.assertEqual(self.ac.balance_a, 0.0)
+
+    def test_no_route(self):
+        """Test that a payment larger than every path's capacity is refused without locking funds."""
+        with self.assertRaises(ValueError):
+            self.network.pay("Alice", "Dave", 150.0)
+        self.assertEqual(self.ab.balance_a, 100.0)
+
+    def test_closed_hop_unlocks_earlier_hops(self):
+        """Test that a hop closed after routing releases the HTLCs already added on the route."""
+        with patch.object(self.cd, "add_htlc", side_effect=Exception("Channel is closed.")):
+            with self.assertRaises(ValueError):
+                self.network.pay("Alice", "Dave", 20.0)
+        for channel in (self.ab, self.bc):
+            self.assertEqual(channel.htlcs, {})
+            self.assertEqual(channel.balance_a, 100.0)
+
+    def test_wrong_preimage_is_rejected(self):
+        """Test that a hashlocked amount is only released by its preimage, and refunded on failure."""
+        self.ab.add_htlc("00" * 32, 10.0, "Alice", expiry=0)
+        self.assertEqual(self.ab.balance_a, 90.0)
+        with self.assertRaises(ValueError):
+            self.ab.settle_htlc("00" * 32, b"guess")
+        self.ab.fail_htlc("00" * 32)
+        self.assertEqual(self.ab.balance_a, 100.0)
+
+    def test_history_is_compacted_to_signed_state(self):
+        """Test that the channel keeps only its latest signed state."""
+        alice, bob = Keypair.random(), Keypair.random()
+        channel = PaymentChannel("Alice", "Bob", 100.0, signers={"Alice": alice, "Bob": bob})
+        for _ in range(500):
+            channel.make_payment(1.0, "Alice")
+            channel.make_payment(1.0, "Bob")
+        state = channel.signed_state()
+        self.assertEqual(state["nonce"], 1000)
+        self.assertFalse(hasattr(channel, "transaction_history"))
+        bob.verify(channel.state_digest(), bytes.fromhex(state["signatures"]["Bob"]))
+
+    def test_batched_settlement(self):
+        """Test that closed channels are settled together with payouts netted per party."""
+        self.network.pay("Alice", "Dave", 20.0)
+        for channel in (self.ab, self.bc, self.cd):
+            self.network.close_channel(channel.channel_id)
+        self.assertEqual(self.settled, [])
+        batch = self.network.settle()
+        self.assertEqual(self.settled, [batch])
+        self.assertEqual(len(batch["channels"]), 3)
+        self.assertEqual(batch["payouts"], {"Alice": 80.0, "Bob": 100.0, "Carol": 100.0, "Dave": 20.0})
+        self.assertIsNone(self.network.find_route("Alice", "Dave", 1.0))
+
+class TestWatchtower(unittest.TestCase):
+    def setUp(self):
+        """Set up a watchtower driven by a fake clock."""
+        self.now = 0.0
+        self.watchtower = Watchtower(clock=lambda: self.now)
+
+    def test_deadlines_fire_in_order(self):
+        """Test that only expired deadlines fire, earliest first."""
+        fired = []
+        for i in (3, 1, 2):
+            self.watchtower.watch(i, i * 10, lambda i=i: fired.append(i))
+        self.now = 25
+        self.assertEqual(self.watchtower.run_due(), 2)
+        self.assertEqual(fired, [1, 2])
+        self.assertEqual(len(self.watchtower), 1)
+
+    def test_cancel_and_replace(self):
+        """Test that cancelled deadlines never fire and re-watching a key moves its deadline."""
+        fired = []
+        for i in range(1000):
+            self.watchtower.watch(i, 10, lambda i=i: fired.append(i))
+        for i in range(999):
+            self.assertTrue(self.watchtower.cancel(i))
+        self.assertFalse(self.watchtower.cancel(0))
+        self.watchtower.watch(999, 100, lambda: fired.append("moved"))
+        self.now = 50
+        self.watchtower.run_due()
+        self.assertEqual(fired, [])
+        self.assertLess(len(self.watchtower.heap), 1000)
+        self.now = 100
+        self.watchtower.run_due()
+        self.assertEqual(fired, ["moved"])
+
+    def test_channel_dispute(self):
+        """Test that a dispute returns immediately and closes the channel only if unresolved."""
+        resolved = PaymentChannel("Alice", "Bob", 100.0)
+        unresolved = PaymentChannel("Carol", "Dave", 100.0)
+        for channel in (resolved, unresolved):
+            channel.dispute_resolution(timeout=30, watchtower=self.watchtower)
+        self.assertTrue(resolved.resolve_dispute())
+        self.now = 31
+        self.watchtower.run_due()
+        self.assertTrue(resolved.is_open)
+        self.assertFalse(unresolved.is_open)
+
+    def test_deadline_waits_for_pending_htlcs(self):
+        """Test that an expired deadline with pending HTLCs keeps its watch and closes once they expire."""
+        settled = []
+        network = Layer2Network(settle=settled.append, max_settlement_batch=1, watchtower=self.watchtower)
+        channel = network.open_channel("Alice", "Bob", 100.0, timeout=30)
+        channel.add_htlc("00" * 32, 10.0, "Alice", expiry=60)
+        channel.add_htlc("11" * 32, 10.0, "Alice", expiry=90)
+        self.now = 31
+        self.watchtower.run_due()
+        self.assertTrue(channel.is_open)
+        with self.assertRaises(Exception):
+            network.close_channel(channel.channel_id)
+        self.assertEqual(len(self.watchtower), 1)
+        self.now = 89
+        self.watchtower.run_due()
+        self.assertTrue(channel.is_open)
+        self.now = 90
+        self.watchtower.run_due()
+        self.assertFalse(channel.is_open)
+        self.assertEqual(settled[0]["channels"][0]["final_balance_a"], 100.0)
+
+    def test_channel_dispute_waits_for_pending_htlcs(self):
+        """Test that a standalone channel's dispute deadline moves to its last HTLC expiry."""
+        channel = PaymentChannel("Alice", "Bob", 100.0)
+        channel.add_htlc("00" * 32, 10.0, "Alice", expiry=50)
+        channel.dispute_resolution(timeout=30, watchtower=self.watchtower)
+        self.now = 31
+        self.watchtower.run_due()
+        self.assertTrue(channel.is_open)
+        self.now = 50
+        self.watchtower.run_due()
+        self.assertFalse(channel.is_open)
+        self.assertEqual(channel.balance_a, 100.0)
+
+    def test_background_thread_closes_network_channels(self):
+        """Test that the started watchtower settles timed-out channels through the network."""
+        watchtower = Watchtower().start()
+        self.addCleanup(watchtower.stop)
+        settled = []
+        network = Layer2Network(settle=settled.append, max_settlement_batch=2, watchtower=watchtower)
+        channels = [network.open_channel("Alice", f"Peer{i}", 10.0) for i in range(3)]
+        for channel in channels[:2]:
+            network.open_dispute(channel.channel_id, timeout=0.05)
+        network.open_dispute(channels[2].channel_id, timeout=0.05)
+        network.resolve_dispute(channels[2].channel_id)
+        deadline = time.time() + 2
+        while not settled and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(settled), 1)
+        self.assertEqual(len(settled[0]["channels"]), 2)
+        self.assertEqual(list(network.channels), [channels[2].channel_id])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from model_lifecycle import ModelLifecycle
+
+FEATURES = ['inflation_rate', 'interest_rate', 'demand']
+
+def economic_data(start, rows, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed + start)
+    data = pd.DataFrame({
+        'inflation_rate': rng.normal(2.5 + shift, 0.3, rows),
+        'interest_rate': rng.normal(1.6, 0.1, rows),
+        'demand': rng.normal(120, 15, rows),
+    })
+    data['price'] = 314000 + 40 * data['inflation_rate'] + data['demand']
+    return data
+
+class TestModelLifecycle(unittest.TestCase):
+    def setUp(self):
+        """Create a lifecycle with a controllable clock."""
+        self.now = 0.0
+        self.lifecycle = ModelLifecycle(RandomForestRegressor(n_estimators=20, random_state=0), FEATURES, 'price',
+                                        retrain_interval=600, window_size=300, warm_start_estimators=5,
+                                        max_estimators=30, clock=lambda: self.now)
+        self.data = economic_data(0, 200)
+
+    def test_unchanged_data_reuses_model(self):
+        """Test that an unchanged dataset neither refits nor rescales."""
+        self.assertEqual(self.lifecycle.update(self.data)["retrain"], "full")
+        model, mean = self.lifecycle.model, self.lifecycle.scaler.mean_.copy()
+        self.now += 3600
+        self.assertEqual(self.lifecycle.update(self.data)["retrain"], "skipped")
+        self.assertIs(self.lifecycle.model, model)
+        np.testing.assert_array_equal(self.lifecycle.scaler.mean_, mean)
+
+    def test_scheduled_retrain_appends_trees(self):
+        """Test that new rows after the interval add estimators to the existing forest."""
+        self.lifecycle.update(self.data)
+        grown = pd.concat([self.data, economic_data(200, 20)], ignore_index=True)
+        self.now += 60
+        self.assertEqual(self.lifecycle.update(grown)["retrain"], "skipped")
+        self.now += 600
+        self.assertEqual(self.lifecycle.update(grown)["retrain"], "warm")
+        self.assertEqual(len(self.lifecycle.model.estimators_), 25)
+        self.assertEqual(self.lifecycle.new_rows, 0)
+
+    def test_estimator_cap_forces_full_refit(self):
+        """Test that warm starts stop at max_estimators and a full refit resets the forest."""
+        self.lifecycle.update(self.data)
+        kinds = []
+        for cycle in range(3):
+            self.now += 600
+            kinds.append(self.lifecycle.update(economic_data(300 + 10 * cycle, 10))["retrain"])
+        self.assertEqual(kinds, ["warm", "warm", "full"])
+        self.assertEqual(len(self.lifecycle.model.estimators_), 20)
+
+    def test_drift_triggers_full_refit(self):
+        """Test that shifted features retrain immediately, before the interval."""
+        self.lifecycle.update(self.data)
+        self.now += 1
+        result = self.lifecycle.update(economic_data(500, 50, shift=5.0))
+        self.assertEqual(result["retrain"], "full")
+        self.assertEqual(self.lifecycle.stats["drift_events"], 1)
+
+    def test_error_drift_after_baseline(self):
+        """Test that a jump in out-of-sample error is flagged once enough rows set the baseline."""
+        self.lifecycle.update(self.data)
+        for cycle in range(3):
+            self.lifecycle.observe(economic_data(300 + 20 * cycle, 20))
+        self.assertEqual(self.lifecycle.stats["drift_events"], 0)
+        broken = economic_data(500, 20)
+        broken['price'] += 500
+        self.lifecycle.observe(broken)
+        self.assertTrue(self.lifecycle.drift)
+
+    def test_window_is_bounded(self):
+        """Test that the training window and its row hashes stay within window_size."""
+        for start in range(0, 1000, 200):
+            self.lifecycle.observe(economic_data(start, 200))
+        self.assertEqual(len(self.lifecycle.window), 300)
+        self.assertEqual(len(self.lifecycle.seen_set), 300)
+
+if __name__ == "__main__":
+    unittest.main()
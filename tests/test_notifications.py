@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from mock_smtp_server import MockSMTPServer
+from notifications import DispatchError, NotificationService, compile_template
+
+class TestNotificationService(unittest.TestCase):
+    def setUp(self):
+        """Set up a notification service pointed at a local SMTP stand-in."""
+        self.smtp = MockSMTPServer().start()
+        email_config = {
+            'from_email': 'alerts@example.com',
+            'email_password': 'secret',
+            'smtp_server': self.smtp.host,
+            'smtp_port': self.smtp.port,
+            'use_tls': False
+        }
+        sms_config = {'account_sid': 'AC123', 'auth_token': 'token', 'from_number': '+1234567890'}
+        self.service = NotificationService(email_config, sms_config, max_workers=4, smtp_pool_size=4,
+                                           rate_limits={'email': 1000})
+        self.service.get_user_contact_info = lambda user_id: {'email': f'{user_id}@example.com', 'phone': '+1'}
+
+    def tearDown(self):
+        self.service.close()
+        self.smtp.stop()
+
+    def test_connections_are_reused(self):
+        """Test that many emails share a small number of logged-in connections."""
+        for i in range(10):
+            user_id = f'user{i}'
+            self.service.set_user_preferences(user_id, {'preferred_channels': ['email']})
+            self.service.queue_notification(user_id, 'email', 'Block finalized')
+        asyncio.run(self.service.process_notifications())
+        self.assertEqual(len(self.smtp.messages), 10)
+        self.assertLessEqual(self.smtp.login_count, 4)
+        self.assertLessEqual(self.smtp.connection_count, 4)
+
+    def test_notifications_coalesce_into_digest(self):
+        """Test that several notifications for one user become a single email."""
+        self.service.set_user_preferences('user1', {'preferred_channels': ['email']})
+        for i in range(3):
+            self.service.queue_notification('user1', 'email', f'Alert {i}')
+        asyncio.run(self.service.process_notifications())
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertIn('Alert 2', self.smtp.messages[0]['data'])
+        self.assertIn('3 new notifications', self.smtp.messages[0]['data'])
+        self.assertEqual(self.service.notifications, [])
+
+    def test_disabled_channel_is_skipped(self):
+        """Test that notifications on a disabled channel are not sent."""
+        self.service.set_user_preferences('user1', {'preferred_channels': ['sms']})
+        self.service.queue_notification('user1', 'email', 'Alert')
+        asyncio.run(self.service.process_notifications())
+        self.assertEqual(self.smtp.messages, [])
+
+    def test_service_survives_separate_event_loops(self):
+        """Test that rate-limited dispatch works across successive asyncio.run calls."""
+        self.service.set_user_preferences('user1', {'preferred_channels': ['email']})
+        for run in range(2):
+            self.service.queue_notification('user1', 'email', f'Run {run}')
+            asyncio.run(self.service.process_notifications())
+        self.assertEqual(len(self.smtp.messages), 2)
+        self.assertEqual(self.service.notifications, [])
+
+    def test_failed_digests_are_requeued(self):
+        """Test that notifications whose send failed go back on the queue and sent ones do not."""
+        self.service.set_user_preferences('user1', {'preferred_channels': ['email']})
+        self.service.set_user_preferences('user2', {'preferred_channels': ['email']})
+        self.service.queue_notification('user1', 'email', 'Delivered')
+        asyncio.run(self.service.process_notifications())
+        self.smtp.stop()
+        self.service.smtp_pool.close()  # Drop idle connections so the next send must reconnect to the dead port
+        self.service.queue_notification('user2', 'email', 'Alert')
+        with self.assertRaises(DispatchError):
+            asyncio.run(self.service.process_notifications())
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertEqual(self.service.notifications, [{'user_id': 'user2', 'type': 'email', 'message': 'Alert'}])
+
+    def test_render_template_is_cached(self):
+        """Test that templates are compiled once and rendered per context."""
+        template = "Hello {{ user_name }}"
+        self.assertEqual(self.service.render_template(template, {'user_name': 'A'}), "Hello A")
+        self.assertEqual(self.service.render_template(template, {'user_name': 'B'}), "Hello B")
+        self.assertIs(compile_template(template), compile_template(template))
+
+if __name__ == "__main__":
+    unittest.main()
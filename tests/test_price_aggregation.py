@@ -0,0 +1,131 @@
+import unittest
+from aiohttp import web
+from price_aggregation import PriceAggregator, PriceRing
+
+class StubFeeds:
+    """Local price feeds whose quotes the tests set directly."""
+
+    def __init__(self):
+        self.prices = {}
+        self.requests = 0
+
+    async def handle(self, request):
+        self.requests += 1
+        name = request.match_info["name"]
+        if name not in self.prices:
+            return web.json_response({"error": "down"}, status=503)
+        if name.startswith("coinbase"):
+            return web.json_response({"data": {"amount": str(self.prices[name])}})
+        return web.json_response({"price": str(self.prices[name])})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+class TestPriceAggregator(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start stub feeds and an aggregator on a fake clock."""
+        self.feeds = StubFeeds()
+        url = await self.feeds.start()
+        self.now = 1000.0
+        self.names = ["binance", "coinbase", "kraken", "okx"]
+        self.aggregator = PriceAggregator({"PI": [url + name for name in self.names]}, buffer_size=8,
+                                          max_age=30, clock=lambda: self.now)
+        await self.aggregator.start()
+
+    async def asyncTearDown(self):
+        await self.aggregator.close()
+        await self.feeds.stop()
+
+    def quote(self, **prices):
+        self.feeds.prices.update(prices)
+
+    async def test_outlier_source_is_rejected(self):
+        """Test that a source far from the cross-source median is excluded from the aggregate."""
+        self.quote(binance=100.0, coinbase=101.0, kraken=99.0, okx=500.0)
+        prices = await self.aggregator.poll()
+        self.assertEqual(prices["PI"], 100.0)
+        self.assertEqual(sum(self.aggregator.rejected.values()), 1)
+
+    async def test_stale_sources_are_excluded(self):
+        """Test that a source that stopped answering drops out once its price is too old."""
+        self.quote(binance=100.0, coinbase=100.0, kraken=100.0, okx=100.0)
+        await self.aggregator.poll()
+        del self.feeds.prices["okx"]
+        self.quote(binance=110.0, coinbase=110.0, kraken=110.0)
+        self.now += 60
+        self.assertEqual((await self.aggregator.poll())["PI"], 110.0)
+        okx = next(status for url, status in self.aggregator.staleness().items() if url.endswith("okx"))
+        self.assertTrue(okx["stale"])
+        self.assertEqual(okx["failures"], 1)
+
+    async def test_buffers_are_bounded_and_session_reused(self):
+        """Test that history stays within buffer_size and every poll shares one session."""
+        session = self.aggregator.session
+        for i in range(20):
+            self.quote(binance=100.0 + i, coinbase=100.0 + i, kraken=100.0 + i, okx=100.0 + i)
+            await self.aggregator.poll()
+            self.now += 1
+        self.assertIs(self.aggregator.session, session)
+        self.assertEqual(self.feeds.requests, 80)
+        self.assertTrue(all(len(prices) == 8 for prices in
+                            [source.prices for source in self.aggregator.sources]))
+        self.assertEqual(len(self.aggregator.aggregates["PI"]), 8)
+
+    async def test_two_sources_checked_against_history(self):
+        """Test that with fewer than three sources a jump is checked against recent aggregates."""
+        aggregator = PriceAggregator({"PI": [source.url for source in self.aggregator.sources[:2]]},
+                                     clock=lambda: self.now)
+        async with aggregator:
+            for _ in range(5):
+                self.quote(binance=100.0, coinbase=100.5)
+                await aggregator.poll()
+                self.now += 1
+            self.quote(binance=100.2, coinbase=900.0)
+            self.assertEqual((await aggregator.poll())["PI"], 100.2)
+
+    async def test_few_sources_follow_level_shift(self):
+        """Test that a sustained move reported by every source is followed, not rejected forever."""
+        for count in (1, 2):
+            aggregator = PriceAggregator({"PI": [source.url for source in self.aggregator.sources[:count]]},
+                                         clock=lambda: self.now)
+            async with aggregator:
+                for _ in range(5):
+                    self.quote(binance=100.0, coinbase=100.0)
+                    await aggregator.poll()
+                    self.now += 1
+                for _ in range(5):
+                    self.quote(binance=101.0, coinbase=101.0)
+                    self.assertEqual((await aggregator.poll())["PI"], 101.0)
+                    self.now += 1
+            self.assertEqual(aggregator.rejected, {})
+            self.assertGreater(sum(aggregator.flagged.values()), 0)
+
+    async def test_run_iterations(self):
+        """Test that run() polls the requested number of times on the current loop."""
+        self.quote(binance=100.0, coinbase=100.0, kraken=100.0, okx=100.0)
+        seen = []
+        await self.aggregator.run(0, iterations=3, on_prices=seen.append)
+        self.assertEqual(seen, [{"PI": 100.0}] * 3)
+
+class TestPriceRing(unittest.TestCase):
+    def test_twap(self):
+        """Test that each price is weighted by how long it held within the window."""
+        ring = PriceRing(10)
+        ring.append(0, 10.0)
+        ring.append(50, 20.0)
+        ring.append(90, 40.0)
+        # Window [20, 100]: 10.0 for 30s, 20.0 for 40s, 40.0 for 10s
+        self.assertAlmostEqual(ring.twap(80, 100), (10 * 30 + 20 * 40 + 40 * 10) / 80)
+        self.assertIsNone(PriceRing(3).twap(10, 100))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from typing import Optional
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from response_cache import InMemoryCacheBackend, ResponseCache, paginate
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        """Build a small app whose endpoints count how often they are computed."""
+        self.cache = ResponseCache(InMemoryCacheBackend(), default_ttl=60)
+        self.items = [{"id": str(i), "amount": i} for i in range(5)]
+        self.computed = 0
+        app = FastAPI()
+
+        def compute():
+            self.computed += 1
+            return list(self.items)
+
+        @app.get("/items")
+        async def items(request: Request, user: str, cursor: Optional[str] = None, limit: int = 2):
+            return await self.cache.respond(request, ResponseCache.key("items", user), compute,
+                                            tags=["items"], cursor=cursor, limit=limit,
+                                            item_key=lambda item: item["id"])
+
+        @app.post("/items")
+        async def add_item():
+            self.items.append({"id": str(len(self.items)), "amount": len(self.items)})
+            await self.cache.invalidate("items")
+            return {"success": True}
+
+        self.client = TestClient(app)
+
+    def test_repeated_requests_are_served_from_cache(self):
+        """Test that identical requests compute the body once."""
+        first = self.client.get("/items", params={"user": "alice"})
+        second = self.client.get("/items", params={"user": "alice"})
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_cache_is_keyed_by_principal(self):
+        """Test that different users get separate entries."""
+        self.client.get("/items", params={"user": "alice"})
+        self.client.get("/items", params={"user": "bob"})
+        self.assertEqual(self.computed, 2)
+
+    def test_if_none_match_returns_304(self):
+        """Test ETag revalidation."""
+        first = self.client.get("/items", params={"user": "alice"})
+        etag = first.headers["ETag"]
+        second = self.client.get("/items", params={"user": "alice"}, headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b"")
+
+    def test_invalidation_changes_etag(self):
+        """Test that an event invalidates cached entries and the old ETag no longer matches."""
+        etag = self.client.get("/items", params={"user": "alice", "limit": 10}).headers["ETag"]
+        self.client.post("/items")
+        response = self.client.get("/items", params={"user": "alice", "limit": 10},
+                                   headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(self.computed, 2)
+
+    def test_cursor_pagination(self):
+        """Test walking every page with the next cursor."""
+        seen, cursor = [], None
+        while True:
+            params = {"user": "alice", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get("/items", params=params)
+            seen.extend(item["id"] for item in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual(seen, ["0", "1", "2", "3", "4"])
+        self.assertEqual(self.computed, 1)
+
+    def test_bad_cursor(self):
+        """Test that an unknown cursor is rejected."""
+        response = self.client.get("/items", params={"user": "alice", "cursor": "bm9wZQ"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_survives_appends(self):
+        """Test that items appended mid-walk do not shift later pages."""
+        items = [{"id": i} for i in range(4)]
+        page, cursor = paginate(items, None, 2, lambda item: item["id"])
+        items.insert(0, {"id": -1})
+        page, _ = paginate(items, cursor, 2, lambda item: item["id"])
+        self.assertEqual([item["id"] for item in page], [2, 3])
+
+class TestInvalidationRaces(unittest.IsolatedAsyncioTestCase):
+    async def test_tag_sets_are_pruned(self):
+        """Test that evicted keys do not accumulate in tag sets."""
+        backend = InMemoryCacheBackend(max_size=10)
+        for i in range(1000):
+            await backend.set(f"key{i}", {"body": i}, ttl=60, tags=["items", f"item:{i}"])
+        self.assertLessEqual(len(backend.tags["items"]), 20)
+        self.assertLessEqual(len(backend.tags), 21)
+        await backend.invalidate_tags(["items"])
+        self.assertEqual(backend.tags, {})
+        self.assertIsNone(await backend.get("key999"))
+
+    async def test_body_computed_across_invalidation_is_not_cached(self):
+        """Test that a body whose tag is invalidated mid-compute is returned but not stored."""
+        cache = ResponseCache(InMemoryCacheBackend(), default_ttl=60)
+        calls = []
+
+        async def compute():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                await cache.invalidate("items")
+            return len(calls)
+
+        first = await cache.get_or_compute("key", compute, tags=["items"])
+        second = await cache.get_or_compute("key", compute, tags=["items"])
+        third = await cache.get_or_compute("key", compute, tags=["items"])
+        self.assertEqual([first["body"], second["body"], third["body"]], [1, 2, 2])
+
+if __name__ == "__main__":
+    unittest.main()
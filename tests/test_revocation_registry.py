@@ -0,0 +1,71 @@
+import unittest
+from revocation_registry import BloomFilter, RevocationRegistry, StatusList
+
+class TestRevocationRegistry(unittest.TestCase):
+    def setUp(self):
+        """Set up an issuer registry with a few allocated credentials."""
+        self.registry = RevocationRegistry(size=64)
+        self.indices = {credential_id: self.registry.allocate(credential_id) for credential_id in ("a", "b", "c")}
+
+    def test_allocate_is_stable(self):
+        """Test that a credential keeps its status index."""
+        self.assertEqual(self.registry.allocate("b"), self.indices["b"])
+        self.assertEqual(self.registry.next_index, 3)
+
+    def test_revoke(self):
+        """Test revoking a credential by ID and by index."""
+        self.assertEqual(self.registry.revoke("b"), 1)
+        self.assertTrue(self.registry.is_revoked("b"))
+        self.assertTrue(self.registry.is_revoked(status_index=self.indices["b"]))
+        self.assertFalse(self.registry.is_revoked("a"))
+        self.assertEqual(self.registry.revoke("b"), 1)
+
+    def test_snapshot_and_delta_sync(self):
+        """Test that a verifier syncs from a snapshot and subsequent deltas."""
+        self.registry.revoke("a")
+        verifier = RevocationRegistry.from_snapshot(self.registry.snapshot())
+        self.assertTrue(verifier.is_revoked(status_index=self.indices["a"]))
+
+        self.registry.revoke("c")
+        delta = self.registry.delta_since(verifier.version)
+        self.assertEqual(delta["indices"], [self.indices["c"]])
+        verifier.apply_delta(delta)
+        self.assertEqual(verifier.version, self.registry.version)
+        self.assertTrue(verifier.is_revoked("c"))
+        self.assertFalse(verifier.is_revoked(status_index=self.indices["b"]))
+
+    def test_delta_requires_snapshot_when_log_truncated(self):
+        """Test that an old version falls back to a snapshot."""
+        registry = RevocationRegistry(max_delta_log=1)
+        registry.revoke("x")
+        registry.revoke("y")
+        self.assertIsNone(registry.delta_since(0))
+        self.assertEqual(registry.delta_since(1)["credential_ids"], ["y"])
+
+    def test_apply_out_of_order_delta(self):
+        """Test that a delta from the wrong version is rejected."""
+        self.registry.revoke("a")
+        self.registry.revoke("b")
+        verifier = RevocationRegistry()
+        with self.assertRaises(Exception):
+            verifier.apply_delta(self.registry.delta_since(1))
+
+    def test_status_list_grows_and_compresses(self):
+        """Test that the bitmap grows on demand and round-trips through encoding."""
+        status_list = StatusList(8)
+        status_list.set(100000)
+        decoded = StatusList.decode(status_list.encode())
+        self.assertTrue(decoded.is_set(100000))
+        self.assertFalse(decoded.is_set(99999))
+        self.assertLess(len(status_list.encode()), len(status_list.bits))
+
+    def test_bloom_filter(self):
+        """Test bloom filter membership and serialization."""
+        bloom = BloomFilter(capacity=1000)
+        bloom.add("revoked")
+        restored = BloomFilter.from_dict(bloom.to_dict())
+        self.assertIn("revoked", restored)
+        self.assertNotIn("valid", restored)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import json
 import os
+from typing import Any, Dict
+from contract_gas import OutOfGas
 from smart_contracts import SmartContract, SmartContractManager, ExpiringSmartContract
 
 class TestSmartContract(unittest.TestCase):
@@ -82,8 +84,9 @@ class TestSmartContract(unittest.TestCase):
         self.contract.add_function("set_value", set_value, roles=[self.owner])
         self.contract.call_function("set_value", self.owner, "event_key", "event_value")
 
-        events = self.contract.get_events()
-        self.assertIn("State updated: event_key = event_value", events, "Event should be logged correctly.")
+        events = self.contract.get_events("StateUpdated", topics={"key": "event_key"})
+        self.assertEqual(len(events), 1, "Event should be logged correctly.")
+        self.assertEqual(events[0].args, {"key": "event_key", "value": "event_value"})
 
     def test_batch_set_state(self):
         """Test batch state updates."""
@@ -98,5 +101,118 @@ class TestSmartContract(unittest.TestCase):
         self.assertEqual(self.contract.get_state("key1"), "value1", "State for key1 should be updated correctly.")
         self.assertEqual(self.contract.get_state("key2"), "value2", "State for key2 should be updated correctly.")
 
+    def test_failed_call_is_rolled_back(self):
+        """Test that a function that raises leaves no partial writes or events behind."""
+        def transfer(contract: SmartContract, amount: int):
+            contract.set_state("alice", contract.get_state("alice") - amount)
+            if amount > 10:
+                raise ValueError("Insufficient funds")
+            contract.set_state("bob", contract.get_state("bob") + amount)
+
+        self.contract.set_state("alice", 10)
+        self.contract.set_state("bob", 0)
+        self.contract.add_function("transfer", transfer)
+        events = list(self.contract.get_events())
+
+        with self.assertRaises(ValueError):
+            self.contract.call_function("transfer", self.owner, 20)
+        self.assertEqual(self.contract.get_state("alice"), 10, "Partial writes should be reverted.")
+        self.assertEqual(self.contract.get_events(), events, "Events from the failed call should be dropped.")
+
+        self.contract.call_function("transfer", self.owner, 4)
+        self.assertEqual((self.contract.get_state("alice"), self.contract.get_state("bob")), (6, 4))
+
+    def test_runaway_call_runs_out_of_gas(self):
+        """Test that a call looping without touching state is aborted and rolled back."""
+        def spin(contract: SmartContract):
+            contract.set_state("started", True)
+            while True:
+                try:
+                    pass
+                except Exception:
+                    pass  # Contract code cannot swallow the gas check
+
+        contract = self.manager.deploy_contract("Spinner", self.owner, gas_limit=20000)
+        contract.add_function("spin", spin)
+        with self.assertRaises(OutOfGas):
+            contract.call_function("spin", self.owner)
+        self.assertIsNone(contract.get_state("started"), "Writes before running out should be reverted.")
+        self.assertEqual(contract.get_events(), [])
+
+    def test_swallowed_gas_exhaustion_is_rolled_back(self):
+        """Test that a call catching BaseException still fails with OutOfGas and keeps no writes."""
+        def swallow(contract: SmartContract):
+            contract.set_state("started", True)
+            try:
+                for _ in range(100000):
+                    pass
+            except BaseException:
+                pass
+            for _ in range(100000):
+                pass
+            return "finished"
+
+        contract = self.manager.deploy_contract("Swallower", self.owner, gas_limit=20000)
+        contract.add_function("swallow", swallow)
+        with self.assertRaises(OutOfGas):
+            contract.call_function("swallow", self.owner)
+        self.assertIsNone(contract.get_state("started"))
+        self.assertFalse(contract.state.in_transaction)
+        self.assertEqual(contract.get_events(), [])
+        self.assertLess(contract.last_gas_used, 30000, "Tracing should resume after the swallowed exception.")
+
+    def test_generator_resumes_are_not_charged_as_calls(self):
+        """Test that iterating a generator is charged one call, and library functions none."""
+        def total(contract: SmartContract, count: int):
+            def values():
+                for i in range(count):
+                    yield i
+            return sum(values()) + len(json.dumps([1, 2, 3]))
+
+        self.contract.add_function("total", total)
+        self.contract.call_function("total", self.owner, 1)
+        calls = self.contract.gas_report()["total"]["operations"]["call"]
+        self.assertEqual(self.contract.call_function("total", self.owner, 100), 4959)
+        self.assertEqual(self.contract.gas_report()["total"]["operations"]["call"], 2 * calls)
+
+    def test_out_of_gas_keeps_no_writes_or_events(self):
+        """Test that running out near the end of a call never keeps part of its writes or events."""
+        def write_five(contract: SmartContract):
+            for i in range(5):
+                contract.set_state(f"key{i}", i)
+
+        self.contract.add_function("write_five", write_five)
+        self.contract.call_function("write_five", self.owner)
+        needed = self.contract.last_gas_used
+        for gas_limit in range(needed - 2000, needed + 1, 100):
+            contract = self.manager.deploy_contract(f"Writer{gas_limit}", self.owner, gas_limit=gas_limit)
+            contract.add_function("write_five", write_five)
+            try:
+                contract.call_function("write_five", self.owner)
+                expected = 5
+            except OutOfGas:
+                expected = 0
+            self.assertEqual(len(contract.state), expected)
+            self.assertEqual(len(contract.get_events()), expected)
+
+    def test_gas_profile(self):
+        """Test that state operations are metered and reported per function."""
+        def touch(contract: SmartContract, count: int):
+            for i in range(count):
+                contract.set_state(f"key{i}", contract.get_state(f"key{i}"))
+
+        self.contract.add_function("touch", touch)
+        self.contract.call_function("touch", self.owner, 2)
+        small = self.contract.last_gas_used
+        self.contract.call_function("touch", self.owner, 4)
+        self.assertGreater(self.contract.last_gas_used, small + 2 * 5000)
+
+        profile = self.contract.gas_report()["touch"]
+        self.assertEqual(profile["calls"], 2)
+        self.assertEqual(profile["operations"]["write"], 6)
+        self.assertEqual(profile["operations"]["read"], 6)
+        self.assertEqual(profile["operations"]["event"], 6)
+        self.assertEqual(profile["max_gas"], self.contract.last_gas_used)
+
 if __name__ == "__main__":
     unittest.main()
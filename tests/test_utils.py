@@ -2,7 +2,7 @@ import os
 import pytest
 import json
 import logging
-from utils import setup_logging, AppException, load_config, validate_input, save_to_json, load_from_json
+from utils import setup_logging, AppException, load_config, validate_input, save_to_json, load_from_json, TTLCache
 
 # Test data
 TEST_CONFIG_FILE = "test_config.json"
@@ -86,6 +86,26 @@ def test_load_from_json_file_not_found():
     assert excinfo.value.status_code == 404
     assert "File 'non_existent_file.json' not found." in str(excinfo.value)
 
+def test_ttl_cache_expiry():
+    """Test that cache entries expire after their TTL."""
+    cache = TTLCache(ttl=60)
+    cache.set("fresh", 1)
+    cache.set("stale", 2, ttl=0)
+    assert cache.get("fresh") == 1
+    assert cache.get("stale") is None
+    assert "stale" not in cache
+
+def test_ttl_cache_eviction():
+    """Test that the cache evicts least recently used entries when full."""
+    cache = TTLCache(ttl=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
 def teardown_module(module):
     """Teardown for the entire module."""
     if os.path.exists(TEST_CONFIG_FILE):
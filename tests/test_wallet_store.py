@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from cryptography.fernet import InvalidToken
+from wallet_store import WalletStore
+
+class TestWalletStore(unittest.TestCase):
+    def setUp(self):
+        """Create a store in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "wallet.store")
+        self.store = WalletStore(self.path, "StrongPassword123!", min_compact_records=10)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_and_get(self):
+        """Test that records round-trip and keys are not written in the clear."""
+        self.store.put("secret", "GADDRESS1", "SSECRET1")
+        self.assertEqual(self.store.get("secret", "GADDRESS1"), "SSECRET1")
+        self.assertIsNone(self.store.get("secret", "GMISSING"))
+        with open(self.path, "rb") as f:
+            contents = f.read()
+        self.assertNotIn(b"GADDRESS1", contents)
+        self.assertNotIn(b"SSECRET1", contents)
+
+    def test_adding_a_record_appends_only(self):
+        """Test that a new record leaves existing bytes untouched."""
+        self.store.put_many("address", {f"G{i}": 0.0 for i in range(5)})
+        with open(self.path, "rb") as f:
+            before = f.read()
+        self.store.put("address", "GNEW", 1.5)
+        with open(self.path, "rb") as f:
+            after = f.read()
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(after.count(b"\n"), 6)
+
+    def test_reopen_uses_latest_value(self):
+        """Test that the index is rebuilt on open and later writes win."""
+        self.store.put("address", "G1", 1.0)
+        self.store.put("address", "G1", 2.0)
+        self.store.put("address", "G2", 3.0)
+        self.store.delete("address", "G2")
+        reopened = WalletStore(self.path, "StrongPassword123!")
+        self.assertEqual(reopened.items("address"), [("G1", 2.0)])
+        self.assertNotIn(("address", "G2"), reopened)
+
+    def test_removed_address_stays_removed_after_reopen(self):
+        """Test that deleting an address and its secret survives a restart, as PiWallet.remove_address does."""
+        self.store.put_many("secret", {"G1": "SSECRET1", "G2": "SSECRET2"})
+        self.store.put_many("address", {"G1": 1.0, "G2": 2.0})
+        self.store.delete("address", "G2")
+        self.store.delete("secret", "G2")
+        reopened = WalletStore(self.path, "StrongPassword123!")
+        self.assertEqual(reopened.items("address"), [("G1", 1.0)])
+        self.assertIsNone(reopened.get("secret", "G2"))
+        self.assertEqual(reopened.get("secret", "G1"), "SSECRET1")
+        reopened.compact()
+        self.assertEqual(WalletStore(self.path, "StrongPassword123!").count("address"), 1)
+
+    def test_truncated_tail_is_ignored(self):
+        """Test that a partially written record is dropped on open."""
+        self.store.put("address", "G1", 1.0)
+        with open(self.path, "ab") as f:
+            f.write(b"address abc gAAAA")
+        reopened = WalletStore(self.path, "StrongPassword123!")
+        self.assertEqual(reopened.get("address", "G1"), 1.0)
+        reopened.put("address", "G2", 2.0)
+        self.assertEqual(WalletStore(self.path, "StrongPassword123!").get("address", "G2"), 2.0)
+
+    def test_compaction(self):
+        """Test that superseded records are compacted away automatically."""
+        for value in range(20):
+            self.store.put("address", "G1", float(value))
+        self.store.put("secret", "G1", "SSECRET1")
+        self.assertLess(self.store.total_records, 20)
+        self.store.compact()
+        reopened = WalletStore(self.path, "StrongPassword123!")
+        self.assertEqual(reopened.get("address", "G1"), 19.0)
+        self.assertEqual(reopened.get("secret", "G1"), "SSECRET1")
+        self.assertEqual(reopened.total_records, 2)
+
+    def test_wrong_password(self):
+        """Test that records cannot be read with a different password."""
+        self.store.put("secret", "G1", "SSECRET1")
+        other = WalletStore(self.path, "WrongPassword456!")
+        self.assertIsNone(other.get("secret", "G1"))
+        with self.assertRaises(InvalidToken):
+            other.items("secret")
+
+if __name__ == "__main__":
+    unittest.main()
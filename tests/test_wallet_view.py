@@ -0,0 +1,74 @@
+import unittest
+from stellar_sdk import Asset, Keypair, Network
+from horizon_client import HorizonClient
+from mock_horizon import MockHorizon
+from wallet_view import WalletView
+
+class TestWalletView(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Start a mock Horizon with an issuer and a wallet of funded addresses."""
+        self.horizon = MockHorizon(Network.TESTNET_NETWORK_PASSPHRASE, latency=0.01)
+        url = await self.horizon.start()
+        self.issuer = Keypair.random()
+        self.pi = Asset("PI", self.issuer.public_key)
+        self.horizon.create_account(self.issuer.public_key)
+        self.addresses = [Keypair.random().public_key for _ in range(50)]
+        for address in self.addresses:
+            self.horizon.create_account(address)
+        self.client = HorizonClient(url, Network.TESTNET_NETWORK_PASSPHRASE, skip_memo_required_check=True)
+        self.view = WalletView(self.client, self.pi, page_size=2)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.horizon.stop()
+
+    async def pay(self, address, amount):
+        return await self.client.submit_payment(self.issuer, address, self.pi, str(amount))
+
+    async def test_balances_fetched_concurrently_and_cached(self):
+        """Test that a refresh fetches each address once and then serves from cache."""
+        await self.pay(self.addresses[0], 7)
+        balances = await self.view.balances(self.addresses)
+        self.assertEqual(balances[self.addresses[0]], 7.0)
+        self.assertEqual(balances[self.addresses[1]], 0.0)
+        loads = self.horizon.account_loads
+        await self.view.balances(self.addresses)
+        self.assertEqual(self.horizon.account_loads, loads)
+
+    async def test_newer_ledger_invalidates_balance(self):
+        """Test that a balance cached before a newer ledger is refetched."""
+        address = self.addresses[0]
+        self.assertEqual(await self.view.balance(address), 0.0)
+        response = await self.pay(address, 3)
+        self.view.note_ledger(address, response["ledger"])
+        self.assertEqual(await self.view.balance(address), 3.0)
+        self.view.note_ledger(address, response["ledger"])  # Cache is already at this ledger
+        loads = self.horizon.account_loads
+        await self.view.balance(address)
+        self.assertEqual(self.horizon.account_loads, loads)
+
+    async def test_history_pages_from_cursor(self):
+        """Test that history is fetched incrementally and merged across addresses."""
+        address = self.addresses[0]
+        for amount in (1, 2, 3):
+            await self.pay(address, amount)
+        history = await self.view.transactions([address])
+        self.assertEqual([payment["amount"] for payment in history], [1.0, 2.0, 3.0])
+
+        queries = self.horizon.payment_queries
+        await self.pay(address, 4)
+        history = await self.view.transactions([address])
+        self.assertEqual([payment["amount"] for payment in history], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(self.horizon.payment_queries - queries, 1)
+
+    async def test_history_state_round_trip(self):
+        """Test that saved cursors resume paging without refetching old payments."""
+        await self.pay(self.addresses[0], 1)
+        await self.view.transactions(self.addresses[:1])
+        restored = WalletView(self.client, self.pi)
+        restored.load_dict(self.view.to_dict())
+        self.assertEqual(await restored.sync_history(self.addresses[:1]), 0)
+        self.assertEqual(len(await restored.transactions(self.addresses[:1])), 1)
+
+if __name__ == "__main__":
+    unittest.main()